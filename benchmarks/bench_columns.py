@@ -0,0 +1,87 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from listing_columns import NULL_INT, read_columns, write_listing_files
+from listing_model import PROPERTY_LISTING_FILES, load_listings
+
+# ---------- JSON VS COLUMNAR SNAPSHOT LOAD ----------
+# Loads every region's property listings from the pretty-printed JSON files and
+# from one memory-mapped columnar snapshot, runs the same query on both (median
+# price per area) and checks they agree, then reports load time, query time, peak
+# Python heap and on-disk size.
+#
+#   python -m benchmarks.bench_columns --repeat 5
+
+
+def json_query(listings):
+    by_area = {}
+    for listing in listings:
+        if listing.price_egp is not None:
+            by_area.setdefault(listing.area, []).append(listing.price_egp)
+    return {area: float(np.median(prices)) for area, prices in by_area.items()}
+
+
+def columns_query(snapshot):
+    area, price = np.asarray(snapshot["area"]), np.asarray(snapshot["price_egp"])
+    valid = price != NULL_INT
+    dictionary = snapshot.dictionary("area")
+    result = {}
+    for code in np.unique(area[valid]).tolist():
+        name = dictionary[code] if code >= 0 else None
+        result[name] = float(np.median(price[valid & (area == code)]))
+    return result
+
+
+def measure(fn, repeat):
+    best, peak, value = None, 0, None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = elapsed if best is None else min(best, elapsed)
+    return value, best, peak
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs columnar snapshot load and query")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_dir = os.path.join(tmp, "property_listings.columns")
+        write_listing_files(PROPERTY_LISTING_FILES, snapshot_dir)
+
+        def from_json():
+            listings = [listing for path in PROPERTY_LISTING_FILES for listing in load_listings(path)]
+            return listings, json_query(listings)
+
+        def from_columns():
+            snapshot = read_columns(snapshot_dir)
+            return snapshot, columns_query(snapshot)
+
+        (listings, json_result), json_s, json_peak = measure(from_json, args.repeat)
+        (snapshot, col_result), col_s, col_peak = measure(from_columns, args.repeat)
+        if json_result != col_result or len(listings) != len(snapshot):
+            print("MISMATCH between JSON and columnar results")
+            raise SystemExit(1)
+
+        json_bytes = sum(os.path.getsize(path) for path in PROPERTY_LISTING_FILES)
+        print(f"{len(snapshot)} rows, {len(col_result)} areas")
+        print(f"json     load+query {json_s * 1000:8.1f} ms  peak heap {json_peak / 1e6:6.2f} MB  disk {json_bytes / 1e3:7.0f} KB")
+        print(f"columns  load+query {col_s * 1000:8.1f} ms  peak heap {col_peak / 1e6:6.2f} MB  disk {dir_size(snapshot_dir) / 1e3:7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import tempfile
+
+from detail_crawler import fetch_details
+from fixture_server import start_detail_stub_server
+from listing_model import COMPOUND_LISTING_FILES, PROPERTY_LISTING_FILES
+
+# ---------- DETAIL CRAWL AGAINST THE LOCAL STUB ----------
+# Crawls the detail pages of the checked-in listings from an aiohttp stub that
+# adds `--latency` per response and fails the first request of every 10th page
+# with a 503. Runs one page at a time, then concurrently, then again with the
+# ETag cache warm, and checks every page was parsed and the warm run was all 304s.
+#
+#   python -m benchmarks.bench_details --limit 1000 --latency 0.05
+
+
+def load_records(limit):
+    records = []
+    for path in COMPOUND_LISTING_FILES + PROPERTY_LISTING_FILES:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.load(f))
+    return records[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async detail crawler throughput against a local stub")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub seconds per response")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--serial-sample", type=int, default=100, help="pages for the one-at-a-time run")
+    args = parser.parse_args()
+
+    records = load_records(args.limit)
+    urls = [record["Detail Page URL"] for record in records]
+    stop, origin, stats = start_detail_stub_server(records, fail_every=10, latency=args.latency)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, "cache")
+            runs = [
+                ("serial", urls[:args.serial_sample], dict(concurrency=1, cache_dir=None)),
+                ("concurrent", urls, dict(concurrency=args.concurrency, cache_dir=cache_dir)),
+                ("cached", urls, dict(concurrency=args.concurrency, cache_dir=cache_dir)),
+            ]
+            for name, run_urls, options in runs:
+                metrics = {}
+                details = fetch_details(run_urls, rate=0, backoff=0.01, origin=origin, metrics=metrics, **options)
+                parsed = sum(1 for found in details.values() if "Land Area" in found)
+                if parsed != len(set(run_urls)):
+                    print(f"{name}: only {parsed} of {len(set(run_urls))} pages parsed")
+                    raise SystemExit(1)
+                if name == "cached" and metrics["not_modified"] != parsed:
+                    print(f"cached: {metrics['not_modified']} of {parsed} pages were 304s")
+                    raise SystemExit(1)
+                rate = len(run_urls) / metrics["elapsed_s"] if metrics["elapsed_s"] else float("inf")
+                print(f"{name:10} {len(run_urls):5} pages {metrics['elapsed_s']:7.2f} s {rate:8.1f} pages/s  {metrics}")
+    finally:
+        stop()
+    print(f"stub: {stats}")
+
+
+if __name__ == "__main__":
+    main()
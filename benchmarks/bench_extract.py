@@ -0,0 +1,96 @@
+import argparse
+import time
+
+from card_extract import extract_cards, extract_compound_card, extract_property_card
+from card_fixtures import (
+    card_selector_for,
+    load_listing_records,
+    render_cards,
+    render_cards_page,
+)
+from listing_model import COMPOUND_LISTING_FILES, PROPERTY_LISTING_FILES
+
+# ---------- EXTRACTION SCALING BENCHMARK ----------
+# Renders the checked-in listings into card markup and times extraction at growing
+# card counts. The card-scoped engine should show a flat per-card cost; the legacy
+# page-wide lookups (find_next/find_previous over one big soup) are run alongside
+# for comparison.
+#
+#   python -m benchmarks.bench_extract --category property --sizes 250,500,1000,2000
+
+
+def legacy_extract(page_html, category):
+    # The pre-streaming loop: parse the whole page once, then resolve summary/footer/
+    # area by walking the document from each card.
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_html, "html.parser")
+    container = soup.select_one("div.cards-container")
+    records = []
+    seen = set()
+    for card in container.select(card_selector_for(category)):
+        href = card.get("href")
+        if href in seen:
+            continue
+        seen.add(href)
+        if category == "property":
+            area = card.find_previous("div", class_="area")
+            footer = card.find_next("div", class_="card-footer")
+            records.append((
+                area.get_text(strip=True) if area else None,
+                footer.find("div", class_="price-container") if footer else None,
+                card.find_all("p", class_="tag"),
+            ))
+        else:
+            summary = card.find_next("h2")
+            footer = card.find_next("div", class_="card-footer")
+            records.append((
+                summary.get_text(strip=True) if summary else None,
+                footer.find_all("div", class_="sc-a18c0201-0 HytCg") if footer else [],
+            ))
+    return records
+
+
+def scoped_extract(fragments, category):
+    extract_card = extract_property_card if category == "property" else extract_compound_card
+    return extract_cards(fragments, card_selector_for(category), extract_card, set(), {})
+
+
+def best_of(repeat, fn, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Card extraction scaling benchmark")
+    parser.add_argument("--category", choices=["property", "compound"], default="property")
+    parser.add_argument("--sizes", default="250,500,1000,2000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    files = PROPERTY_LISTING_FILES if args.category == "property" else COMPOUND_LISTING_FILES
+    records = load_listing_records(files)
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    print(f"{'cards':>7} {'scoped ms':>10} {'us/card':>8} {'legacy ms':>10} {'us/card':>8}")
+    for size in sizes:
+        # Cycle the saved listings when asking for more cards than are checked in
+        sample = [records[i % len(records)] for i in range(size)]
+        sample = [dict(record, **{"Detail Page URL": f'{record["Detail Page URL"]}-{i}'}) for i, record in enumerate(sample)]
+        fragments = render_cards(sample, args.category)
+        scoped = best_of(args.repeat, scoped_extract, fragments, args.category)
+        line = f"{size:>7} {scoped * 1000:>10.1f} {scoped / size * 1e6:>8.1f}"
+        if not args.skip_legacy:
+            page = render_cards_page(sample, args.category)
+            legacy = best_of(args.repeat, legacy_extract, page, args.category)
+            line += f" {legacy * 1000:>10.1f} {legacy / size * 1e6:>8.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
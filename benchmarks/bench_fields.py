@@ -0,0 +1,159 @@
+import argparse
+import multiprocessing
+import resource
+import time
+
+from card_extract import HTML_PARSERS, extract_cards, extract_compound_card, extract_property_card, get_html_parser
+from card_fixtures import card_selector_for
+from benchmarks.replay_extract import fixture_sets
+from benchmarks.bench_parsers import FIXTURES_DIR
+
+# ---------- EXTRACTION BENCHMARK: CARDS/S, PEAK RSS, PER-FIELD COST ----------
+# For every fixture set (see replay_extract.py) and parser backend, in a fresh
+# child process each: throughput over all batches, the child's peak RSS, and where
+# the time goes. Extraction time is split into parsing the batch, scanning each
+# card subtree, and the per-field lookups; a field's cost is the time spent in
+# parser calls on that field's block (and on nodes found inside it).
+#
+#   python -m benchmarks.bench_fields
+#   python -m benchmarks.bench_fields --parsers lxml,selectolax --repeat 5
+
+# Blocks collected by scan_card -> the record fields read from them
+BLOCK_FIELDS = {
+    "property": {
+        "area": "Area", "name": "Property Type/Project Name", "details": "BUA/Beds/Bathrooms",
+        "down_payment": "Down Payment", "price": "Price", "tags": "Sale Type",
+    },
+    "compound": {
+        "area": "Area", "name": "Project Name", "summary": "Summary/Developer Name",
+        "property_types": "Property Types", "price_blocks": "Developer/Resale Start Price",
+    },
+}
+EXTRACTORS = {"property": extract_property_card, "compound": extract_compound_card}
+
+
+class FieldTimer:
+    """Parser proxy charging the time of every node operation to the block it is on."""
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.name = parser.name
+        self.owner = {}   # id(node) -> block name, for the current card
+        self.costs = {}   # block name -> seconds
+        self.parse_s = 0.0
+        self.extract_s = 0.0
+
+    def parse_fragments(self, html):
+        start = time.perf_counter()
+        nodes = self.parser.parse_fragments(html)
+        self.parse_s += time.perf_counter() - start
+        return nodes
+
+    def iter_elements(self, node):
+        return self.parser.iter_elements(node)
+
+    def attr(self, node, name):
+        return self.parser.attr(node, name)
+
+    def own(self, found):
+        self.owner = {}
+        for block, value in found.items():
+            if block == "links":
+                continue
+            for node in value if isinstance(value, list) else (value,):
+                self.owner[id(node)] = block
+
+    def _timed(self, block, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.costs[block] = self.costs.get(block, 0.0) + time.perf_counter() - start
+        return result
+
+    def text(self, node, separator="", strip=True):
+        return self._timed(self.owner.get(id(node), "other"), self.parser.text, node, separator, strip)
+
+    def find(self, node, tag, cls):
+        block = self.owner.get(id(node), "other")
+        found = self._timed(block, self.parser.find, node, tag, cls)
+        if found is not None:
+            self.owner[id(found)] = block
+        return found
+
+    def find_all(self, node, tag):
+        block = self.owner.get(id(node), "other")
+        found = self._timed(block, self.parser.find_all, node, tag)
+        for child in found:
+            self.owner[id(child)] = block
+        return found
+
+
+def peak_rss_mb():
+    # VmHWM is this process's own high-water mark; ru_maxrss is the fallback
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_one(task):
+    batches, category, parser_name, repeat = task
+    timer = FieldTimer(get_html_parser(parser_name))
+    extract_card = EXTRACTORS[category]
+
+    def timed_extract(parser, href, found, context):
+        start = time.perf_counter()
+        timer.own(found)
+        record = extract_card(parser, href, found, context)
+        timer.extract_s += time.perf_counter() - start
+        return record
+
+    # Plain runs for throughput, then one instrumented run for the breakdown
+    selector = card_selector_for(category)
+    best = float("inf")
+    for _ in range(repeat):
+        seen, context = set(), {}
+        start = time.perf_counter()
+        records = sum(len(extract_cards(b, selector, extract_card, seen, context, timer.parser)) for b in batches)
+        best = min(best, time.perf_counter() - start)
+    seen, context = set(), {}
+    start = time.perf_counter()
+    for fragments in batches:
+        extract_cards(fragments, selector, timed_extract, seen, context, timer)
+    total = time.perf_counter() - start
+    fields = {BLOCK_FIELDS[category].get(block, block): cost for block, cost in timer.costs.items()}
+    fields["(other)"] = timer.extract_s - sum(timer.costs.values())
+    return {
+        "records": records,
+        "seconds": best,
+        "peak_rss_mb": peak_rss_mb(),
+        "parse": timer.parse_s / total,
+        "scan": (total - timer.parse_s - timer.extract_s) / total,
+        "fields_us": {field: cost / records * 1e6 for field, cost in sorted(fields.items(), key=lambda item: -item[1])},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction throughput, peak RSS and per-field cost")
+    parser.add_argument("--parsers", default=",".join(HTML_PARSERS))
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    for label, category, batches, _, _ in fixture_sets(args.fixtures_dir):
+        cards = sum(len(batch) for batch in batches)
+        for name in args.parsers.split(","):
+            # A fresh interpreter per run, so each peak RSS is that backend's alone
+            with context.Pool(1) as pool:
+                result = pool.apply(run_one, ((batches, category, name, args.repeat),))
+            print(f"{label:<28} {name:<11} {cards / result['seconds']:>8.0f} cards/s  "
+                  f"peak RSS {result['peak_rss_mb']:6.1f} MB  parse {result['parse']:4.0%}  scan {result['scan']:4.0%}")
+            print("    per card: " + ", ".join(f"{field} {us:.1f}us" for field, us in result["fields_us"].items()))
+
+
+if __name__ == "__main__":
+    main()
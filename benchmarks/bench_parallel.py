@@ -0,0 +1,81 @@
+import argparse
+import os
+import time
+
+from card_extract import extract_cards, extract_compound_card, extract_property_card, get_html_parser
+from card_fixtures import card_selector_for
+from parallel_extract import ParallelExtractor
+from benchmarks.replay_extract import fixture_sets
+from benchmarks.bench_parsers import FIXTURES_DIR
+
+# ---------- MULTIPROCESS EXTRACTION: PARITY + SCALING ----------
+# Replays every fixture set through in-process extract_cards and through a
+# ParallelExtractor per worker count. Each parallel run has to give the same
+# records, in the same order, with the same `seen` and carried context; then
+# cards/s and the speedup over in-process are reported. Pool startup is not timed.
+#
+#   python -m benchmarks.bench_parallel
+#   python -m benchmarks.bench_parallel --workers 1,2,4,8 --window 4 --parser lxml
+
+EXTRACTORS = {"property": extract_property_card, "compound": extract_compound_card}
+
+
+def run_serial(batches, category, parser):
+    seen, context, errors = set(), {}, {}
+    records = [r for b in batches for r in extract_cards(b, card_selector_for(category), EXTRACTORS[category], seen, context, parser, errors)]
+    return records, seen, context, errors
+
+
+def run_parallel(extractor, batches, category, window):
+    seen, context, errors = set(), {}, {}
+    batches_out = extractor.iter_extracted(batches, card_selector_for(category), EXTRACTORS[category], seen, context, errors, window)
+    records = [r for batch in batches_out for r in batch]
+    return records, seen, context, errors
+
+
+def best_of(repeat, fn, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Multiprocess card extraction parity and scaling")
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, 4, cores})))
+    parser.add_argument("--window", type=int, default=2, help="batches in flight")
+    parser.add_argument("--parser", default=None, help="HTML parser backend (default: NAWY_HTML_PARSER or bs4)")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    html_parser = get_html_parser(args.parser)
+    sets = list(fixture_sets(args.fixtures_dir))
+    print(f"{cores} cores, parser {html_parser.name}")
+    failed = False
+    baseline = {}
+    for label, category, batches, _, _ in sets:
+        cards = sum(len(batch) for batch in batches)
+        seconds, reference = best_of(args.repeat, run_serial, batches, category, html_parser)
+        baseline[label] = (seconds, reference)
+        print(f"{label:<28} in-process  {cards / seconds:>8.0f} cards/s")
+    for workers in (int(n) for n in args.workers.split(",")):
+        with ParallelExtractor(workers, html_parser) as extractor:
+            # Warm the workers (spawn + imports) before timing
+            extractor.extract(sets[0][2][0], card_selector_for(sets[0][1]), EXTRACTORS[sets[0][1]], set(), {})
+            for label, category, batches, _, _ in sets:
+                cards = sum(len(batch) for batch in batches)
+                serial_s, reference = baseline[label]
+                seconds, result = best_of(args.repeat, run_parallel, extractor, batches, category, args.window)
+                parity = result == reference
+                failed = failed or not parity
+                print(f"{label:<28} {workers:>2} workers {cards / seconds:>8.0f} cards/s  "
+                      f"x{serial_s / seconds:4.2f}  parity={'ok' if parity else 'MISMATCH'}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import os
+import time
+
+from card_extract import HTML_PARSERS, extract_cards, extract_compound_card, extract_property_card, get_html_parser
+from card_fixtures import (
+    card_selector_for,
+    load_fixture_batches,
+    load_listing_records,
+    save_fixture_batches,
+)
+from listing_model import COMPOUND_LISTING_FILES, PROPERTY_LISTING_FILES
+
+# ---------- PARSER BACKEND PARITY + THROUGHPUT ----------
+# Runs every HTML parser backend over the saved scroll-batch fixtures, checks that
+# they all produce exactly the records the bs4 backend does, then reports cards/sec.
+# Fixtures are rendered from the checked-in listing files on first use. That every
+# backend gives back the checked-in records themselves is tested in
+# tests/test_parser_backends.py.
+#
+#   python -m benchmarks.bench_parsers --parsers bs4,lxml,selectolax
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def run_backend(parser, batches, category):
+    extract_card = extract_property_card if category == "property" else extract_compound_card
+    seen, context, records = set(), {}, []
+    for fragments in batches:
+        records.extend(extract_cards(fragments, card_selector_for(category), extract_card, seen, context, parser))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML parser backend parity and throughput")
+    parser.add_argument("--parsers", default=",".join(HTML_PARSERS))
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for category, files in (("property", PROPERTY_LISTING_FILES), ("compound", COMPOUND_LISTING_FILES)):
+        batches = load_fixture_batches(args.fixtures_dir, category)
+        if not batches:
+            save_fixture_batches(args.fixtures_dir, category, load_listing_records(files))
+            batches = load_fixture_batches(args.fixtures_dir, category)
+        cards = sum(len(batch) for batch in batches)
+
+        reference = run_backend(get_html_parser("bs4"), batches, category)
+        for name in args.parsers.split(","):
+            backend = get_html_parser(name)
+            records = run_backend(backend, batches, category)
+            parity = records == reference
+            failed = failed or not parity
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                run_backend(backend, batches, category)
+                best = min(best, time.perf_counter() - start)
+            print(f"{category:<9} {name:<11} {cards / best:>9.0f} cards/s  parity={'ok' if parity else 'MISMATCH'}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
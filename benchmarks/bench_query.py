@@ -0,0 +1,122 @@
+import argparse
+import time
+
+import numpy as np
+
+from listing_columns import COLUMN_LAYOUTS, NULL_CODE, encode_columns
+from listing_model import PROPERTY_LISTING_FILES, load_listings, region_of
+from listing_query import ListingIndex
+
+# ---------- LISTING SEARCH LATENCY ----------
+# Builds a synthetic property dataset (1M rows by default) by resampling the
+# checked-in listings with prices/BUA jittered +-20%, indexes it, checks every
+# query against a brute-force numpy scan, then reports p50/p99 latency per query.
+#
+#   python -m benchmarks.bench_query --rows 1000000 --runs 200
+
+QUERIES = {
+    "apartments_ras_el_hekma_under_15m_2plus_beds_cheapest": dict(
+        where={"area": "Ras El Hekma", "property_type": "Apartment"},
+        ranges={"price_egp": (None, 15_000_000), "beds": (2, None)},
+        order_by="price_egp",
+    ),
+    "chalets_north_coast_biggest": dict(
+        where={"property_type": "Chalet"}, order_by="bua_m2", descending=True,
+    ),
+    "any_under_5m_cheapest": dict(ranges={"price_egp": (None, 5_000_000)}, order_by="price_egp"),
+    "3_beds_150_200m2_lowest_monthly": dict(
+        ranges={"beds": (3, 3), "bua_m2": (150, 200)}, order_by="monthly_egp",
+    ),
+    "villas_or_twinhouses_in_project": dict(
+        where={"property_type": ["Villa", "Twinhouse"], "project": "Mountain View iCity October"},
+        order_by="price_egp", descending=True,
+    ),
+    "all_most_expensive": dict(order_by="price_egp", descending=True),
+}
+
+
+def synthetic_arrays(rows, seed=0):
+    sources = [(region_of(path), load_listings(path)) for path in PROPERTY_LISTING_FILES]
+    category, base, dictionaries = encode_columns(sources)
+    rng = np.random.default_rng(seed)
+    pick = rng.integers(0, len(base["url.offsets"]) - 1, rows)
+    arrays = {}
+    for name, kind in COLUMN_LAYOUTS[category]:
+        if kind == "text":
+            continue
+        column = base[name][pick]
+        if name in ("price_egp", "bua_m2", "monthly_egp"):
+            jitter = rng.uniform(0.8, 1.2, rows)
+            missing = np.isnan(column) if kind == "float64" else column < 0
+            column = np.where(missing, column, (column * jitter).astype(column.dtype))
+        arrays[name] = column
+    urls = [f"/synthetic/{i}".encode() for i in range(rows)]
+    arrays["url"] = np.frombuffer(b"".join(urls), dtype=np.uint8)
+    arrays["url.offsets"] = np.concatenate([[0], np.cumsum([len(u) for u in urls])]).astype(np.int64)
+    return category, arrays, dictionaries
+
+
+def brute_force(index, where=None, ranges=None, order_by=None, descending=False, limit=20):
+    keep = np.ones(index.rows, dtype=bool)
+    for field, wanted in (where or {}).items():
+        wanted = [wanted] if isinstance(wanted, str) else wanted
+        dictionary = index.dictionaries[field]
+        codes = [i for i, value in enumerate(dictionary) if value in wanted]
+        keep &= np.isin(np.asarray(index._arrays[field]), codes) & (np.asarray(index._arrays[field]) != NULL_CODE)
+    for field, (low, high) in (ranges or {}).items():
+        values = index.numeric[field]
+        keep &= ~np.isnan(values)
+        if low is not None:
+            keep &= values >= low
+        if high is not None:
+            keep &= values <= high
+    ids = np.flatnonzero(keep)
+    if order_by is None:
+        return None
+    values = index.numeric[order_by][ids]
+    ids, values = ids[~np.isnan(values)], values[~np.isnan(values)]
+    order = np.lexsort((ids, values))
+    if descending:
+        order = order[::-1]
+    return ids[order[:limit]].tolist()
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listing search latency on a synthetic dataset")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    category, arrays, dictionaries = synthetic_arrays(args.rows)
+    generated = time.perf_counter()
+    index = ListingIndex(category, arrays, dictionaries)
+    built = time.perf_counter()
+    print(f"{args.rows} rows: generate {generated - started:.2f}s, index build {built - generated:.2f}s")
+
+    failed = False
+    for name, query in QUERIES.items():
+        expected = brute_force(index, limit=args.limit, **query)
+        got = index.search_ids(limit=args.limit, **query)
+        if expected is not None and got != expected:
+            print(f"MISMATCH {name}: {got[:5]} != {expected[:5]}")
+            failed = True
+            continue
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            index.search_ids(limit=args.limit, **query)
+            samples.append(time.perf_counter() - start)
+        matches = index.count(query.get("where"), query.get("ranges"))
+        print(f"{name:55s} {matches:8d} matches  p50 {percentile_ms(samples, 50):7.3f} ms  p99 {percentile_ms(samples, 99):7.3f} ms")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
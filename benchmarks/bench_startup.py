@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# ---------- IMPORT-TIME BUDGET ----------
+# Imports each library module in a fresh interpreter, several times, and fails if
+# the median import time is over its budget or if importing it dragged in a heavy
+# dependency (LangChain, Selenium, numpy, ...) that should only load on use.
+# Interpreter startup itself is not counted.
+#
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --runs 15 --top 10   # with the slowest imports per module
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median milliseconds per module; generous enough for a cold CI box
+IMPORT_BUDGET_MS = {
+    "compound_scrape_agent": 100,
+    "scrape_scheduler": 150,
+    "card_extract": 50,
+    "http_backend": 100,
+    "detail_crawler": 200,
+    "response_cache": 100,
+    "listing_model": 100,
+    "listing_dedup": 50,
+    "listing_diff": 50,
+    "listing_store": 100,
+    "price_history": 100,
+    "instrument": 50,
+    "parallel_extract": 50,
+}
+LAZY_DEPENDENCIES = (
+    "langchain", "langchain_openai", "dotenv", "openai", "selenium", "webdriver_manager",
+    "requests", "aiohttp", "bs4", "lxml", "selectolax", "numpy",
+)
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": sorted({{m.split(".")[0] for m in sys.modules}})}}))
+"""
+
+
+def measure(module, runs):
+    times, loaded = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["ms"])
+        loaded.update(result["loaded"])
+    return statistics.median(times), sorted(loaded.intersection(LAZY_DEPENDENCIES))
+
+
+def import_times(code):
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines()[1:]:
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].strip()))
+    return rows
+
+
+def slowest_imports(module, top):
+    # Leaves out what the bare interpreter imports at startup
+    startup = {name for _, name in import_times("pass")}
+    rows = [(us, name) for us, name in import_times(f"import {module}") if name not in startup]
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module import time against a budget")
+    parser.add_argument("modules", nargs="*", help=f"default: {', '.join(IMPORT_BUDGET_MS)}")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=0, help="also list this many slowest imports per module")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules or IMPORT_BUDGET_MS:
+        budget = IMPORT_BUDGET_MS.get(module, 100)
+        median, heavy = measure(module, args.runs)
+        ok = median <= budget and not heavy
+        failed = failed or not ok
+        print(f"{module:<24} {median:7.1f} ms  budget {budget:4d} ms  {'ok' if ok else 'OVER'}"
+              f"{'  loads ' + ', '.join(heavy) if heavy else ''}")
+        for cumulative_us, name in slowest_imports(module, args.top) if args.top else ():
+            print(f"    {cumulative_us / 1000:7.1f} ms  {name}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
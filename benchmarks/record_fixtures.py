@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import tempfile
+
+from card_fixtures import save_recorded_batches, save_recorded_expected
+from compound_scrape_agent import NAWY_SEARCH_URL, SCRAPE_JOBS, scrape_nawy, search_url
+from response_cache import CARDS, ResponseCache
+
+# ---------- FIXTURE RECORDER ----------
+# Saves the cards-container markup a real browser rendered for a job, one file per
+# scroll batch, under benchmarks/fixtures/recorded/<job>/. The scroll batches come
+# from a response cache: either one a previous crawl recorded into (--cache), or a
+# fresh browser crawl of the first --max-cards cards recorded into a throwaway one.
+# A fresh crawl also saves the listing file it wrote as expected.json, the baseline
+# benchmarks/replay_extract.py holds every extractor to on this real markup.
+# The recorded/ directory is checked in, but holds no recordings yet: this needs
+# Chrome and access to nawy.com. Commit what it writes.
+#
+#   python -m benchmarks.record_fixtures properties_east compounds_west --max-cards 500
+#   python -m benchmarks.record_fixtures properties_north --cache nawy_responses.db
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def cached_batches(cache, url):
+    return [cache.get_cards(url, position, stale=True) for position in cache.positions(CARDS, url)]
+
+
+def record_job(job, fixtures_dir, base_url=NAWY_SEARCH_URL, max_cards=500, cache=None):
+    url = search_url(SCRAPE_JOBS[job], base_url)
+    expected = None
+    if cache is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(os.path.join(tmp, "responses.db"))
+            try:
+                scrape_nawy(job, base_url=base_url, min_cards=max_cards, output_dir=tmp, backend="browser", resume=False, cache=cache)
+                batches = cached_batches(cache, url)
+                output = os.path.join(tmp, SCRAPE_JOBS[job]["output"])
+                if os.path.exists(output):
+                    with open(output, encoding="utf-8") as f:
+                        expected = json.load(f)
+            finally:
+                cache.close()
+    else:
+        batches = cached_batches(cache, url)
+    if not batches:
+        return [], 0
+    paths = save_recorded_batches(fixtures_dir, job, batches)
+    if expected is not None:
+        save_recorded_expected(fixtures_dir, job, expected)
+    return paths, sum(len(batch) for batch in batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record rendered card batches as replayable fixtures")
+    parser.add_argument("jobs", nargs="+", help=f"jobs to record: {', '.join(SCRAPE_JOBS)}")
+    parser.add_argument("--max-cards", type=int, default=500, help="cards to scroll to per job on a live crawl")
+    parser.add_argument("--base-url", default=NAWY_SEARCH_URL)
+    parser.add_argument("--cache", help="export from this response cache instead of crawling")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.cache, ttl=None) if args.cache else None
+    for job in args.jobs:
+        paths, cards = record_job(job, args.fixtures_dir, args.base_url, args.max_cards, cache)
+        if not paths:
+            print(f"{job}: nothing recorded")
+            continue
+        print(f"{job}: {cards} cards in {len(paths)} batches -> {os.path.dirname(paths[0])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import json
+
+from card_extract import HTML_PARSERS, get_html_parser
+from card_fixtures import (
+    golden_records,
+    load_fixture_batches,
+    load_listing_records,
+    load_recorded_batches,
+    load_recorded_expected,
+    recorded_jobs,
+    save_fixture_batches,
+)
+from listing_model import COMPOUND_LISTING_FILES, PROPERTY_LISTING_FILES
+from benchmarks.bench_parsers import FIXTURES_DIR, run_backend
+
+# ---------- OFFLINE REPLAY HARNESS ----------
+# Runs the compound and property extractors, on every HTML parser backend, over
+#   - the rendered fixtures (benchmarks/fixtures/<category>_*.html), and
+#   - the recorded fixtures (benchmarks/fixtures/recorded/<job>/, real browser
+#     markup checked in by record_fixtures.py),
+# and compares every extracted record field by field with golden records: for
+# rendered fixtures those of the checked-in listing files, for recorded ones the
+# records the recording crawl wrote (expected.json), falling back to the listing
+# files by URL for batches exported from a cache. Exits 1 on any mismatch.
+#
+# Rendered fixtures are card_fixtures' markup for the very records they are
+# compared with, so they only show that every parser backend reads back what the
+# renderer wrote; they say nothing about nawy.com's markup. Only recorded fixtures
+# do, and none are checked in yet (see record_fixtures.py); the harness says so.
+#
+#   python -m benchmarks.replay_extract
+#   python -m benchmarks.replay_extract --parsers lxml --show 5
+
+CATEGORY_FILES = {"property": PROPERTY_LISTING_FILES, "compound": COMPOUND_LISTING_FILES}
+
+# (url, field) pairs where the checked-in record does not match what the current
+# extractor derives from the same card. Marsa Baghush's Summary is "Discover Shehab
+# Mazhar's Properties in Sidi Heneish ...", from which DEVELOPER_RE, like the
+# original per-region scrapers it replaced, takes "shehab mazhar". The checked-in
+# "shehab mazhar's properties" cannot come from that summary with any pattern
+# that stops at the possessive, so the record was not written by this code; the
+# checked-in data is left as scraped rather than edited to fit.
+KNOWN_GOLDEN_DIFFS = {
+    ("https://www.nawy.com/compound/789-marsa-baghush", "Developer Name"),
+}
+
+
+def fixture_sets(fixtures_dir):
+    # (label, category, batches, golden records, compare by position)
+    for category, files in CATEGORY_FILES.items():
+        batches = load_fixture_batches(fixtures_dir, category)
+        if not batches:
+            save_fixture_batches(fixtures_dir, category, load_listing_records(files))
+            batches = load_fixture_batches(fixtures_dir, category)
+        yield f"rendered/{category}", category, batches, golden_records(load_listing_records(files)), True
+    jobs = recorded_jobs(fixtures_dir)
+    if not jobs:
+        print(f"no recorded fixtures under {fixtures_dir}/recorded/: only rendered markup is checked")
+    for job in jobs:
+        from compound_scrape_agent import SCRAPE_JOBS
+        spec = SCRAPE_JOBS[job]
+        batches = load_recorded_batches(fixtures_dir, job)
+        expected = load_recorded_expected(fixtures_dir, job)
+        if expected is not None:
+            yield f"recorded/{job}", spec["category"], batches, expected, True
+        else:
+            # Live order and listings the checked-in file may not have: match by URL
+            yield f"recorded/{job}", spec["category"], batches, load_listing_records([spec["output"]]), False
+
+
+def compare(records, golden, by_position):
+    # -> (field -> [(url, extracted, golden)], missing in golden, count difference)
+    mismatches = {}
+    missing = 0
+    if by_position:
+        pairs = zip(records, golden)
+        extra = len(records) - len(golden)
+    else:
+        by_url = {record["Detail Page URL"]: record for record in golden}
+        pairs = [(record, by_url.get(record["Detail Page URL"])) for record in records]
+        missing = sum(1 for _, expected in pairs if expected is None)
+        extra = 0
+    for record, expected in pairs:
+        if expected is None:
+            continue
+        url = record["Detail Page URL"]
+        for field in dict.fromkeys([*record, *expected]):
+            if record.get(field) != expected.get(field) and (url, field) not in KNOWN_GOLDEN_DIFFS:
+                mismatches.setdefault(field, []).append((url, record.get(field), expected.get(field)))
+    return mismatches, missing, extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay fixtures through every extractor and diff against golden records")
+    parser.add_argument("--parsers", default=",".join(HTML_PARSERS))
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--show", type=int, default=3, help="example mismatches to print per field")
+    args = parser.parse_args()
+
+    failed = False
+    for label, category, batches, golden, by_position in fixture_sets(args.fixtures_dir):
+        cards = sum(len(batch) for batch in batches)
+        for name in args.parsers.split(","):
+            records = run_backend(get_html_parser(name), batches, category)
+            mismatches, missing, extra = compare(records, golden, by_position)
+            ok = not mismatches and not extra
+            failed = failed or not ok
+            summary = {field: len(rows) for field, rows in mismatches.items()}
+            print(f"{label:<28} {name:<11} {cards:>5} cards {len(records):>5} records  "
+                  f"{'ok' if ok else 'MISMATCH'} {json.dumps(summary) if summary else ''}"
+                  f"{f' count off by {extra}' if extra else ''}{f' ({missing} not in golden)' if missing else ''}")
+            for field, rows in mismatches.items():
+                for url, got, expected in rows[:args.show]:
+                    print(f"    {field}: {url}\n      got      {got!r}\n      expected {expected!r}")
+
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from urllib.parse import urlparse
+
+from compound_scrape_agent import SCRAPE_JOBS, scrape_nawy, search_url
+from fixture_server import start_replay_server
+from http_backend import recording_name, record_search_responses, with_page
+
+# ---------- HTTP BACKEND REPLAY ----------
+# Runs scrape_nawy(backend="http") against search responses served locally by
+# fixture_server.start_replay_server, one directory per job, and compares the
+# listing file it writes with the job's expected.json. Exits 1 on any difference.
+#
+#   benchmarks/fixtures/http/synthetic/<job>/  __NEXT_DATA__ pages built (--build)
+#       from records of the checked-in listing files by inverting
+#       http_backend.property_item_to_record / compound_item_to_record, in the
+#       layout http_backend.PROPERTY_PATHS / COMPOUND_PATHS assume. They only show
+#       the mapping and paging agree with themselves, not that nawy.com serves
+#       that layout.
+#   benchmarks/fixtures/http/recorded/<job>/   live responses (--record, through
+#       http_backend.record_search_responses). Their expected.json is the job's
+#       listing file from a browser crawl, so a match is what makes the http
+#       backend equivalent to the browser path. None are checked in yet: recording
+#       needs access to nawy.com.
+#
+#   python -m benchmarks.replay_http
+#   python -m benchmarks.replay_http --build
+#   python -m benchmarks.replay_http --record properties_west --expected property_listings_west.json
+
+HTTP_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "http")
+FIXTURE_KINDS = ("synthetic", "recorded")
+PAGE_SIZE = 12
+
+# job -> (listing file the records come from, how many)
+BUILD_JOBS = {
+    "properties_west": ("property_listings_west.json", 30),
+    "compounds_west": ("compounds_west.json", 24),
+}
+
+PAGE_TEMPLATE = '<!DOCTYPE html><html><head><title>Nawy</title></head><body><div id="__next"></div>' \
+                '<script id="__NEXT_DATA__" type="application/json">{}</script></body></html>'
+DOWN_PAYMENT_RE = re.compile(r"(?:([\d,]+) EGP Monthly)?(?: / )?(?:(\d+) Years)?")
+
+
+def _amount(text):
+    # Leading number of "16,911,000 EGP", "183m2", "3Beds"
+    match = re.match(r"[\d,]+", text or "")
+    return int(match.group().replace(",", "")) if match else None
+
+
+def _id_slug(segment):
+    id_, _, slug = segment.partition("-")
+    return int(id_), slug
+
+
+def property_item(record):
+    # The inverse of http_backend.property_item_to_record; None when the record's
+    # fields are in a format that mapping does not produce
+    match = re.fullmatch(r"https://www\.nawy\.com/compound/([^/]+)/property/([^/]+)", record["Detail Page URL"])
+    payment = DOWN_PAYMENT_RE.fullmatch(record["Down Payment"] or "")
+    if not match or not payment or not record["Down Payment"] or _amount(record["Price"]) is None:
+        return None
+    compound_id, compound_slug = _id_slug(match.group(1))
+    id_, slug = _id_slug(match.group(2))
+    item = {
+        "id": id_, "slug": slug,
+        "compound": {"id": compound_id, "slug": compound_slug, "name": record["Project Name"]},
+        "property_type": {"name": record["Property Type"]},
+        "min_unit_area": _amount(record["BUA"]),
+        "number_of_bedrooms": _amount(record["Beds"]),
+        "number_of_bathrooms": _amount(record["Bathrooms"]),
+        "min_price": _amount(record["Price"]),
+        "sale_type": "resale" if record["Sale Type"] == "Resale" else "developer",
+    }
+    if record["Area"] != "N/A":
+        item["compound"]["area"] = {"name": record["Area"]}
+    if payment.group(1):
+        item["min_installments"] = _amount(payment.group(1))
+    if payment.group(2):
+        item["max_installment_years"] = int(payment.group(2))
+    return item
+
+
+def compound_item(record):
+    match = re.fullmatch(r"https://www\.nawy\.com/compound/([^/]+)", record["Detail Page URL"])
+    if not match or record["Developer Name"] == "N/A":
+        return None
+    id_, slug = _id_slug(match.group(1))
+    item = {
+        "id": id_, "slug": slug, "name": record["Project Name"],
+        "area": {"name": record["Area"]},
+        "developer": {"name": record["Developer Name"]},
+        "summary": record["Summary"],
+        "property_types": [{"name": name} for name in record["Property Types"]],
+    }
+    for key, field in (("developer_start_price", "Developer Start Price"), ("resale_start_price", "Resale Start Price")):
+        if _amount(record[field]) is not None:
+            item[key] = _amount(record[field])
+    return item
+
+
+ITEM_BUILDERS = {"property": property_item, "compound": compound_item}
+
+
+def write_page(out_dir, url, page, items):
+    state = {
+        "props": {"pageProps": {
+            "filters": {"areas": [{"id": 1, "name": "New Cairo"}], "developers": [{"id": 2, "name": "Sodic"}]},
+            "results": {"total": len(items), "page": page, "data": items},
+        }},
+        "page": "/search", "buildId": "fixture",
+    }
+    parts = urlparse(with_page(url, page))
+    with open(os.path.join(out_dir, recording_name(parts.path, parts.query)), "w", encoding="utf-8") as f:
+        f.write(PAGE_TEMPLATE.format(json.dumps(state, ensure_ascii=False)))
+
+
+def build_job(job, fixtures_dir):
+    source, limit = BUILD_JOBS[job]
+    spec = SCRAPE_JOBS[job]
+    build_item = ITEM_BUILDERS[spec["category"]]
+    with open(source, encoding="utf-8") as f:
+        records = json.load(f)
+    # Monthly-only down payments first, so the small sample always covers them
+    records.sort(key=lambda r: not re.fullmatch(r"[\d,]+ EGP Monthly", r.get("Down Payment") or ""))
+    kept, items = [], []
+    for record in records:
+        item = build_item(record)
+        if item is not None:
+            kept.append(record)
+            items.append(item)
+        if len(kept) == limit:
+            break
+
+    out_dir = os.path.join(fixtures_dir, job)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+    url = search_url(spec, "/search")
+    pages = [items[i:i + PAGE_SIZE] for i in range(0, len(items), PAGE_SIZE)]
+    # Past the last page the search answers with an empty result list
+    for page, page_items in enumerate(pages + [[]], 1):
+        write_page(out_dir, url, page, page_items)
+    with open(os.path.join(out_dir, "expected.json"), "w", encoding="utf-8") as f:
+        json.dump(kept, f, ensure_ascii=False, indent=2)
+    return len(kept), len(pages) + 1
+
+
+def replay_job(job, job_dir):
+    server, base_url = start_replay_server(job_dir)
+    out_dir = tempfile.mkdtemp(prefix="nawy-replay-")
+    try:
+        result = json.loads(scrape_nawy(job, base_url=base_url, output_dir=out_dir, backend="http", resume=False))
+        if "error" in result:
+            return result["error"], None, None
+        with open(os.path.join(out_dir, SCRAPE_JOBS[job]["output"]), encoding="utf-8") as f:
+            records = json.load(f)
+    finally:
+        server.shutdown()
+        shutil.rmtree(out_dir, ignore_errors=True)
+    expected_path = os.path.join(job_dir, "expected.json")
+    if not os.path.exists(expected_path):
+        return None, records, None
+    with open(expected_path, encoding="utf-8") as f:
+        return None, records, json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="http backend against locally served search responses")
+    parser.add_argument("jobs", nargs="*", help="default: every job under the fixtures directory")
+    parser.add_argument("--fixtures-dir", default=HTTP_FIXTURES_DIR)
+    parser.add_argument("--build", action="store_true", help=f"rebuild the synthetic pages for {', '.join(BUILD_JOBS)}")
+    parser.add_argument("--record", action="store_true", help="record the jobs' live search responses instead")
+    parser.add_argument("--max-pages", type=int, default=5, help="pages per job with --record")
+    parser.add_argument("--expected", help="with --record: the browser crawl's listing file to compare with")
+    args = parser.parse_args()
+
+    if args.build:
+        for job in args.jobs or BUILD_JOBS:
+            records, pages = build_job(job, os.path.join(args.fixtures_dir, "synthetic"))
+            print(f"{job:<20} {records} records on {pages} pages")
+        return
+    if args.record:
+        for job in args.jobs:
+            job_dir = os.path.join(args.fixtures_dir, "recorded", job)
+            shutil.rmtree(job_dir, ignore_errors=True)
+            saved = record_search_responses(search_url(SCRAPE_JOBS[job]), job_dir, max_pages=args.max_pages)
+            if args.expected:
+                shutil.copyfile(args.expected, os.path.join(job_dir, "expected.json"))
+            print(f"{job:<20} {len(saved)} pages recorded")
+        return
+
+    runs = []
+    for kind in FIXTURE_KINDS:
+        kind_dir = os.path.join(args.fixtures_dir, kind)
+        present = sorted(os.listdir(kind_dir)) if os.path.isdir(kind_dir) else []
+        runs += [(kind, job, os.path.join(kind_dir, job)) for job in present if not args.jobs or job in args.jobs]
+    if not any(kind == "recorded" for kind, _, _ in runs):
+        print("no recorded search responses: the http backend is only checked against synthetic pages")
+    failed = False
+    for kind, job, job_dir in runs:
+        error, records, expected = replay_job(job, job_dir)
+        if error:
+            ok, detail = False, error
+        elif expected is None:
+            ok, detail = bool(records), f"{len(records)} records (no expected.json)"
+        else:
+            ok = records == expected
+            bad = [r["Detail Page URL"] for r, e in zip(records, expected) if r != e]
+            detail = f"{len(records)}/{len(expected)} records" + (f", first mismatch {bad[0]}" if bad else "")
+        failed = failed or not ok
+        print(f"{kind + '/' + job:<30} {'ok' if ok else 'MISMATCH'}  {detail}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+import os
+import re
+from html import unescape
+from itertools import islice
+
+from instrument import count, span
+
+# ---------- CARD-SCOPED EXTRACTION ----------
+# Every lookup is resolved inside the card's own subtree (the wrapper element the
+# scroll loop ships for each card), in one walk over that subtree. Nothing here
+# calls find_next/find_previous, so a card never scans into the rest of the page
+# and extraction cost is linear in the number of cards.
+
+COMPOUND_CARD_SELECTOR = "a[href*='/compound/']"
+PROPERTY_CARD_SELECTOR = "a[href*='/property/']"
+
+DEVELOPER_RE = re.compile(r'discover\s+(.*?)\'')
+PRICE_EGP_RE = re.compile(r"\s*EGP")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+# ---------- HTML PARSER BACKENDS ----------
+# The extractors only need a handful of node operations, so each backend wraps its
+# native tree behind the same small interface:
+#   parse_fragments(html)        -> top-level elements of a batch of card wrappers
+#   iter_elements(node)          -> (element, tag, classes) for node and its subtree
+#   attr(node, name)             -> attribute value or None
+#   text(node, separator, strip) -> BeautifulSoup get_text() semantics
+#   find(node, tag, cls)         -> first matching descendant or None
+#   find_all(node, tag)          -> all descendants with that tag
+# Pick one with NAWY_HTML_PARSER=bs4|lxml|selectolax (default bs4). All three give
+# the same records.
+
+class Bs4Parser:
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse_fragments(self, html):
+        return [node for node in self._soup(html, "html.parser").children if node.name is not None]
+
+    def iter_elements(self, node):
+        yield node, node.name, node.get("class") or ()
+        for child in node.descendants:
+            if child.name is not None:
+                yield child, child.name, child.get("class") or ()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def text(self, node, separator="", strip=True):
+        return node.get_text(separator=separator, strip=strip)
+
+    def find(self, node, tag, cls):
+        return node.find(tag, class_=cls)
+
+    def find_all(self, node, tag):
+        return node.find_all(tag)
+
+
+class LxmlParser:
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._element = etree.Element
+
+    def parse_fragments(self, html):
+        return list(self._html.fragment_fromstring(html, create_parent="div"))
+
+    def iter_elements(self, node):
+        for el in node.iter(self._element):
+            yield el, el.tag, el.get("class", "").split()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def _strings(self, node, strip):
+        # Text and tail text of elements only; comment/PI text is skipped like bs4 does
+        if node.text:
+            yield node.text.strip() if strip else node.text
+        for child in node:
+            if isinstance(child.tag, str):
+                yield from self._strings(child, strip)
+            if child.tail:
+                yield child.tail.strip() if strip else child.tail
+
+    def text(self, node, separator="", strip=True):
+        strings = self._strings(node, strip)
+        return separator.join(s for s in strings if s) if strip else separator.join(strings)
+
+    def find(self, node, tag, cls):
+        for el in node.iterdescendants(tag):
+            if cls in el.get("class", "").split():
+                return el
+        return None
+
+    def find_all(self, node, tag):
+        return list(node.iterdescendants(tag))
+
+
+class SelectolaxParser:
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse_fragments(self, html):
+        return list(self._parser(html).body.iter())
+
+    def iter_elements(self, node):
+        for el in node.traverse():
+            tag = el.tag
+            if tag[0] not in "-_":
+                classes = el.attributes.get("class")
+                yield el, tag, classes.split() if classes else ()
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def text(self, node, separator="", strip=True):
+        strings = [el.text_content for el in node.traverse(include_text=True) if el.tag == "-text"]
+        if strip:
+            strings = [s.strip() for s in strings]
+            return separator.join(s for s in strings if s)
+        return separator.join(strings)
+
+    # node.css() matches the node itself too, bs4's find/find_all only look below it
+    def find(self, node, tag, cls):
+        for el in islice(node.traverse(), 1, None):
+            if el.tag == tag:
+                classes = el.attributes.get("class")
+                if classes and cls in classes.split():
+                    return el
+        return None
+
+    def find_all(self, node, tag):
+        return [el for el in islice(node.traverse(), 1, None) if el.tag == tag]
+
+
+HTML_PARSERS = {
+    "bs4": Bs4Parser,
+    "lxml": LxmlParser,
+    "selectolax": SelectolaxParser,
+}
+_parser_cache = {}
+
+
+def get_html_parser(name=None):
+    name = name or os.getenv("NAWY_HTML_PARSER") or "bs4"
+    if name not in HTML_PARSERS:
+        raise ValueError(f"Unknown HTML parser {name!r}, expected one of {sorted(HTML_PARSERS)}")
+    if name not in _parser_cache:
+        _parser_cache[name] = HTML_PARSERS[name]()
+    return _parser_cache[name]
+
+
+def card_link_marker(card_selector):
+    # "a[href*='/property/']" -> "/property/"
+    return card_selector.split("*=", 1)[1].strip("'\"]")
+
+
+def scan_card(parser, scope, link_marker):
+    # Single pass over the card subtree collecting every block the extractors need.
+    # Singular blocks keep their first occurrence, repeated ones are collected in order.
+    found = {"links": [], "property_types": [], "tags": [], "price_blocks": []}
+    for node, tag, classes in parser.iter_elements(scope):
+        if tag == "a":
+            href = parser.attr(node, "href")
+            if href and link_marker in href:
+                found["links"].append((href, node))
+        elif tag == "h2":
+            found.setdefault("summary", node)
+            continue
+        if not classes:
+            continue
+        if "area" in classes:
+            found.setdefault("area", node)
+        if "name" in classes:
+            found.setdefault("name", node)
+        if tag == "div":
+            if "card-footer" in classes:
+                found.setdefault("footer", node)
+            elif "down-payment-container" in classes:
+                found.setdefault("down_payment", node)
+            elif "price-container" in classes:
+                found.setdefault("price", node)
+            elif "HytCg" in classes and "sc-a18c0201-0" in classes:
+                found["price_blocks"].append(node)
+            elif "fkOmQT" in classes and "sc-234f71bd-1" in classes:
+                found.setdefault("details", node)
+        elif tag == "span" and "property-type" in classes:
+            found["property_types"].append(node)
+        elif tag == "p" and "tag" in classes:
+            found["tags"].append(node)
+    return found
+
+
+class CardFieldError(Exception):
+    """An extractor failed on one field of a card; ``field`` is the record field."""
+
+    def __init__(self, field, cause):
+        super().__init__(f"{field}: {type(cause).__name__}: {cause}")
+        self.field = field
+
+
+def card_error_key(e):
+    # What a failed card is counted under: the field it failed on, or the exception
+    # type for a failure outside any field
+    return e.field if isinstance(e, CardFieldError) else type(e).__name__
+
+
+def extract_compound_card(parser, href, found, context):
+    field = "Area"
+    try:
+        area_div = found.get("area")
+        area = parser.text(area_div) if area_div is not None else None
+        field = "Project Name"
+        name_div = found.get("name")
+        name = parser.text(name_div) if name_div is not None else None
+        field = "Summary"
+        summary_h2 = found.get("summary")
+        summary = parser.text(summary_h2) if summary_h2 is not None else None
+
+        field = "Property Types"
+        property_types = [parser.text(pt) for pt in found["property_types"]]
+
+        # Developer Start Price & Resale Start Price
+        field = "Developer Start Price"
+        dev_price = resale_price = None
+        for block in found["price_blocks"]:
+            price_text = parser.find(block, "div", "price-text")
+            price_value = parser.find(block, "span", "price")
+            if price_text is not None and price_value is not None:
+                label = parser.text(price_text, strip=False)
+                if "Developer Start Price" in label:
+                    dev_price = parser.text(price_value)
+                elif "Resale Start Price" in label:
+                    resale_price = parser.text(price_value)
+
+        # Extract developer name from summary
+        field = "Developer Name"
+        developer_name = "N/A"
+        if summary:
+            match = DEVELOPER_RE.search(summary.lower())
+            if match:
+                developer_name = match.group(1).strip()
+    except Exception as e:
+        raise CardFieldError(field, e) from e
+
+    return {
+        "Area": area or "N/A",
+        "Project Name": name or "N/A",
+        "Developer Name": developer_name,
+        "Summary": summary or "N/A",
+        "Property Types": property_types,
+        "Developer Start Price": dev_price or "N/A",
+        "Resale Start Price": resale_price or "N/A",
+        "Land Area": "",
+        "Detail Page URL": f"https://www.nawy.com{href}"
+    }
+
+
+def extract_property_card(parser, href, found, context):
+    # Area is carried over from the previous card when a card has none, which is
+    # what the old page-wide find_previous lookup ended up returning.
+    field = "Area"
+    try:
+        area_div = found.get("area")
+        if area_div is not None:
+            context["area"] = parser.text(area_div)
+        area_text = context.get("area") or "N/A"
+
+        field = "Property Type"
+        name_div = found.get("name")
+        name_text = parser.text(name_div) if name_div is not None else "N/A"
+        if "," in name_text:
+            property_type, project_name = [x.strip() for x in name_text.split(",", 1)]
+        else:
+            property_type, project_name = name_text, "N/A"
+
+        # BUA, Beds, Bathrooms
+        field = "BUA"
+        bua = beds = baths = "N/A"
+        details = found.get("details")
+        if details is not None:
+            spans = parser.find_all(details, "div")
+            if len(spans) >= 3:
+                bua = parser.text(spans[0])
+                beds = parser.text(spans[1])
+                baths = parser.text(spans[2])
+
+        field = "Down Payment"
+        down_payment = None
+        dp_container = found.get("down_payment")
+        if dp_container is not None:
+            down_payment = parser.text(dp_container, separator=" ")
+
+        field = "Price"
+        price = "N/A"
+        price_container = found.get("price")
+        if price_container is not None:
+            price_span = parser.find(price_container, "span", "price")
+            if price_span is not None:
+                price = parser.text(price_span, separator=" ")
+                price = PRICE_EGP_RE.sub(" EGP", price)
+                price = WHITESPACE_RE.sub(" ", price).strip()
+
+        field = "Sale Type"
+        sale_type = "Developer Sale"
+        for tag in found["tags"]:
+            if "resale" in parser.text(tag).lower():
+                sale_type = "Resale"
+                break
+    except Exception as e:
+        raise CardFieldError(field, e) from e
+
+    return {
+        "Area": area_text,
+        "Property Type": property_type,
+        "Project Name": project_name,
+        "BUA": bua,
+        "Beds": beds,
+        "Bathrooms": baths,
+        "Down Payment": down_payment,
+        "Price": price,
+        "Sale Type": sale_type,
+        "Detail Page URL": f"https://www.nawy.com{href}"
+    }
+
+
+def iter_card_scopes(parser, root, link_marker):
+    # Yields (href, scanned blocks) per listing. A wrapper holding a single listing
+    # is the scope; if it somehow holds several, each link is scanned on its own.
+    found = scan_card(parser, root, link_marker)
+    hrefs = {href for href, _ in found["links"]}
+    if len(hrefs) == 1:
+        yield hrefs.pop(), found
+    else:
+        for href, link in found["links"]:
+            yield href, scan_card(parser, link, link_marker)
+
+
+def drop_captured_fragments(fragments, card_selector, captured):
+    # Cheap pre-parse filter for resumed crawls: a fragment whose card link is
+    # already captured is dropped on a regex match instead of being parsed again.
+    if not captured:
+        return fragments
+    href_re = re.compile(r'href="([^"]*' + re.escape(card_link_marker(card_selector)) + r'[^"]*)"')
+    kept = []
+    for fragment in fragments:
+        match = href_re.search(fragment)
+        if not match or unescape(match.group(1)) not in captured:
+            kept.append(fragment)
+    return kept
+
+
+def extract_cards(fragments, card_selector, extract_card, seen, context, parser=None, errors=None):
+    # Parses one scroll batch in a single pass; each fragment is a card wrapper, so
+    # the top-level elements of the batch document are the card scopes. A card the
+    # extractor fails on is skipped and counted in `errors` by the field it failed on.
+    if not fragments:
+        return []
+    parser = parser or get_html_parser()
+    link_marker = card_link_marker(card_selector)
+    records = []
+    with span("parse"):
+        roots = parser.parse_fragments("".join(fragments))
+    with span("extract"):
+        for root in roots:
+            for href, found in iter_card_scopes(parser, root, link_marker):
+                try:
+                    if not href or href in seen:
+                        continue
+                    seen.add(href)
+                    records.append(extract_card(parser, href, found, context))
+                except Exception as e:
+                    if errors is not None:
+                        key = card_error_key(e)
+                        errors[key] = errors.get(key, 0) + 1
+                    continue
+    count("cards_parsed", len(records))
+    return records
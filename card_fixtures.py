@@ -0,0 +1,181 @@
+import glob
+import json
+import os
+from html import escape
+
+from card_extract import COMPOUND_CARD_SELECTOR, PROPERTY_CARD_SELECTOR
+
+# ---------- HTML FIXTURES FROM SAVED LISTINGS ----------
+# Renders the checked-in listing JSON back into cards-container markup using the
+# same class names the scrapers select on, so extraction can be exercised and
+# benchmarked offline. Extracting a rendered card gives back the record it was
+# rendered from.
+
+def load_listing_records(paths):
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.load(f))
+    return records
+
+
+def _href(record):
+    return record["Detail Page URL"].replace("https://www.nawy.com", "", 1)
+
+
+def render_property_card(record):
+    parts = [f'<div class="card-wrapper"><div class="area">{escape(record["Area"])}</div>']
+    parts.append(f'<a href="{escape(_href(record))}"><div class="cover">')
+    if record["Sale Type"] == "Resale":
+        parts.append('<p class="tag">Resale</p>')
+    parts.append('</div><div class="card-body">')
+    name = record["Property Type"]
+    if record["Project Name"] != "N/A":
+        name = f'{name}, {record["Project Name"]}'
+    parts.append(f'<div class="name">{escape(name)}</div>')
+    if record["BUA"] != "N/A":
+        parts.append(
+            f'<div class="sc-234f71bd-1 fkOmQT"><div>{escape(record["BUA"])}</div>'
+            f'<div>{escape(record["Beds"])}</div><div>{escape(record["Bathrooms"])}</div></div>'
+        )
+    parts.append('</div><div class="card-footer">')
+    if record["Down Payment"] is not None:
+        amount, egp, plan = record["Down Payment"].partition(" EGP ")
+        spans = [f"{amount} EGP", plan] if egp else [amount]
+        parts.append(
+            '<div class="down-payment-container">'
+            + "".join(f"<span>{escape(text)}</span>" for text in spans if text)
+            + "</div>"
+        )
+    if record["Price"] != "N/A":
+        amount = record["Price"].replace(" EGP", "")
+        parts.append(f'<div class="price-container"><span class="price">{escape(amount)}<span>EGP</span></span></div>')
+    parts.append("</div></a></div>")
+    return "".join(parts)
+
+
+def render_compound_card(record):
+    parts = [f'<div class="card-wrapper"><a href="{escape(_href(record))}">']
+    if record["Area"] != "N/A":
+        parts.append(f'<div class="area">{escape(record["Area"])}</div>')
+    if record["Project Name"] != "N/A":
+        parts.append(f'<div class="name">{escape(record["Project Name"])}</div>')
+    for property_type in record["Property Types"]:
+        parts.append(f'<span class="property-type">{escape(property_type)}</span>')
+    if record["Summary"] != "N/A":
+        parts.append(f'<h2>{escape(record["Summary"])}</h2>')
+    parts.append('<div class="card-footer">')
+    for label, key in (("Developer Start Price", "Developer Start Price"), ("Resale Start Price", "Resale Start Price")):
+        if record.get(key, "N/A") != "N/A":
+            parts.append(
+                f'<div class="sc-a18c0201-0 HytCg"><div class="price-text">{label}</div>'
+                f'<span class="price">{escape(record[key])}</span></div>'
+            )
+    parts.append("</div></a></div>")
+    return "".join(parts)
+
+
+def render_cards(records, category):
+    render = render_property_card if category == "property" else render_compound_card
+    return [render(record) for record in records]
+
+
+def render_cards_page(records, category):
+    # Full search page with the scroll container / cards container pair
+    cards = "".join(render_cards(records, category))
+    return (
+        "<html><body>"
+        '<div class="sc-88b4dfdb-0 cgVQXi">'
+        f'<div class="sc-93b4050e-0 iJSftd cards-container">{cards}</div>'
+        "</div></body></html>"
+    )
+
+
+def card_selector_for(category):
+    return PROPERTY_CARD_SELECTOR if category == "property" else COMPOUND_CARD_SELECTOR
+
+
+def save_fixture_batches(fixtures_dir, category, records, batch_size=50):
+    # One file per scroll batch, one card wrapper per line, as the scroll loop ships them
+    os.makedirs(fixtures_dir, exist_ok=True)
+    fragments = render_cards(records, category)
+    paths = []
+    for n, start in enumerate(range(0, len(fragments), batch_size)):
+        path = os.path.join(fixtures_dir, f"{category}_{n:04d}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(fragments[start:start + batch_size]))
+        paths.append(path)
+    return paths
+
+
+def load_fixture_batches(fixtures_dir, category):
+    batches = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, f"{category}_*.html"))):
+        with open(path, encoding="utf-8") as f:
+            batches.append(f.read().split("\n"))
+    return batches
+
+
+# ---------- RECORDED FIXTURES ----------
+# Card wrappers as a real browser rendered them, one JSON list of fragments per
+# scroll batch (real markup can hold newlines), under <fixtures_dir>/recorded/<job>/.
+# See benchmarks/record_fixtures.py.
+
+def recorded_dir(fixtures_dir, job):
+    return os.path.join(fixtures_dir, "recorded", job)
+
+
+def save_recorded_batches(fixtures_dir, job, batches):
+    out_dir = recorded_dir(fixtures_dir, job)
+    os.makedirs(out_dir, exist_ok=True)
+    # A previous recording's batches and expected records no longer apply
+    for path in glob.glob(os.path.join(out_dir, "batch_*.json")) + glob.glob(os.path.join(out_dir, "expected.json")):
+        os.remove(path)
+    paths = []
+    for n, fragments in enumerate(batches):
+        path = os.path.join(out_dir, f"batch_{n:04d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(fragments, f, ensure_ascii=False)
+        paths.append(path)
+    return paths
+
+
+def load_recorded_batches(fixtures_dir, job):
+    batches = []
+    for path in sorted(glob.glob(os.path.join(recorded_dir(fixtures_dir, job), "batch_*.json"))):
+        with open(path, encoding="utf-8") as f:
+            batches.append(json.load(f))
+    return batches
+
+
+def save_recorded_expected(fixtures_dir, job, records):
+    # The records the live crawl wrote for the recorded batches, in crawl order
+    path = os.path.join(recorded_dir(fixtures_dir, job), "expected.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_recorded_expected(fixtures_dir, job):
+    path = os.path.join(recorded_dir(fixtures_dir, job), "expected.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def recorded_jobs(fixtures_dir):
+    return sorted(os.path.basename(os.path.dirname(path)) for path in glob.glob(os.path.join(fixtures_dir, "recorded", "*", "batch_0000.json")))
+
+
+def golden_records(records, urls=None):
+    # What extraction should give back: one record per URL, first occurrence wins
+    # (extract_cards skips hrefs it has seen), optionally only the URLs in `urls`
+    seen, golden = set(), []
+    for record in records:
+        url = record["Detail Page URL"]
+        if url in seen or (urls is not None and url not in urls):
+            continue
+        seen.add(url)
+        golden.append(record)
+    return golden
@@ -1,1008 +1,664 @@
-from langchain.agents import initialize_agent, AgentType, Tool
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
-import os
-import json
-
-# Load environment variables from .env file
-load_dotenv()
-
-print("API KEY:", os.getenv("OPENAI_API_KEY"))
-
-# ---------- TOOL FUNCTION (from your scraper) ----------
-def scrape_nawy_compounds():
-    import time
-    from bs4 import BeautifulSoup
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://www.nawy.com/search?category=compound")
-
-        # Wait for the cards-container to be present
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
-        )
-
-        # Improved infinite scroll logic for the cards-container
-        def scroll_cards_container(min_cards=650, max_total_time=1800, wait_after_scroll=2):
-            import time
-            start_time = time.time()
-            last_count = 0
-            while True:
-                # Find the parent scrollable div
-                scroll_container = driver.find_element(By.CSS_SELECTOR, "div.sc-88b4dfdb-0.cgVQXi")
-                # Find the inner container with the cards
-                cards_container = scroll_container.find_element(By.CSS_SELECTOR, "div.sc-93b4050e-0.iJSftd")
-                cards = cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']")
-                if len(cards) >= min_cards:
-                    break
-                # Scroll the parent container
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight",
-                    scroll_container
-                )
-                time.sleep(wait_after_scroll)
-                new_count = len(cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']"))
-                if new_count == last_count or (time.time() - start_time > max_total_time):
-                    break
-                last_count = new_count
-
-        scroll_cards_container(min_cards=650)
-        # Now parse the fully loaded cards-container
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards_container = soup.select_one("div.cards-container")
-        if not cards_container:
-            return json.dumps({"error": "No cards container found on the page"})
-        cards = cards_container.select("a[href*='/compound/']")
-
-        if not cards:
-            return json.dumps({"error": "No compound listings found in the cards container"})
-
-        compound_data = []
-        seen = set()
-
-        for card in cards:
-            try:
-                href = card.get("href")
-                if not href or href in seen:
-                    continue
-                seen.add(href)
-                full_url = f"https://www.nawy.com{href}"
-
-                # Area
-                area = None
-                area_div = card.select_one(".area")
-                if area_div:
-                    area = area_div.get_text(strip=True)
-
-                # Project Name
-                name = None
-                name_div = card.select_one(".name")
-                if name_div:
-                    name = name_div.get_text(strip=True)
-
-                # Description/Summary
-                summary = None
-                summary_h2 = card.find_next("h2")
-                if summary_h2:
-                    summary = summary_h2.get_text(strip=True)
-
-                # Property Types
-                property_types = [pt.get_text(strip=True) for pt in card.find_all("span", class_="property-type")]
-
-                # Developer Start Price & Resale Start Price
-                dev_price = resale_price = None
-                card_footer = card.find_next("div", class_="card-footer")
-                if card_footer:
-                    price_blocks = card_footer.find_all("div", class_="sc-a18c0201-0 HytCg")
-                    for block in price_blocks:
-                        price_text = block.find("div", class_="price-text")
-                        price_value = block.find("span", class_="price")
-                        if price_text and price_value:
-                            if "Developer Start Price" in price_text.get_text():
-                                dev_price = price_value.get_text(strip=True)
-                            elif "Resale Start Price" in price_text.get_text():
-                                resale_price = price_value.get_text(strip=True)
-
-                # Extract developer name from summary
-                developer_name = "N/A"
-                if summary:
-                    import re
-                    match = re.search(r'discover\s+(.*?)\'', summary.lower())
-                    if match:
-                        developer_name = match.group(1).strip()
-
-                compound_data.append({
-                    "Area": area or "N/A",
-                    "Project Name": name or "N/A",
-                    "Developer Name": developer_name,
-                    "Summary": summary or "N/A",
-                    "Property Types": property_types,
-                    "Developer Start Price": dev_price or "N/A",
-                    "Resale Start Price": resale_price or "N/A",
-                    "Land Area": "",
-                    "Detail Page URL": full_url
-                })
-            except Exception as e:
-                print(f"Error processing card: {e}")
-                continue
-
-        if not compound_data:
-            return json.dumps({"error": "No valid compound data could be extracted"})
-
-        with open("compounds_west.json", "w", encoding="utf-8") as f:
-            json.dump(compound_data, f, ensure_ascii=False, indent=2)
-        return json.dumps({"message": f"Extracted {len(compound_data)} projects and saved to compounds_west.json", "count": len(compound_data)})
-    except Exception as e:
-        print(f"Error during scraping: {e}")
-        return json.dumps({"error": f"Failed to scrape compounds: {str(e)}"})
-    finally:
-        driver.quit()
-
-# ---------- TOOL WRAPPING ----------
-scrape_tool = Tool(
-    name="Scrape Nawy Compounds",
-    func=lambda _: scrape_nawy_compounds(),
-    description="Scrapes compound listings from Nawy and saves them to CSV"
-)
-
-# ---------- TOOL FUNCTION (for North areas) ----------
-def scrape_nawy_compounds_north():
-    import time
-    from bs4 import BeautifulSoup
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://www.nawy.com/search?category=compound&areas=12%2C32%2C33%2C34%2C35%2C36%2C37")
-
-        # Wait for the cards-container to be present
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
-        )
-
-        def scroll_cards_container(min_cards=650, max_total_time=1800, wait_after_scroll=2):
-            import time
-            start_time = time.time()
-            last_count = 0
-            while True:
-                scroll_container = driver.find_element(By.CSS_SELECTOR, "div.sc-88b4dfdb-0.cgVQXi")
-                cards_container = scroll_container.find_element(By.CSS_SELECTOR, "div.sc-93b4050e-0.iJSftd")
-                cards = cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']")
-                if len(cards) >= min_cards:
-                    break
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight",
-                    scroll_container
-                )
-                time.sleep(wait_after_scroll)
-                new_count = len(cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']"))
-                if new_count == last_count or (time.time() - start_time > max_total_time):
-                    break
-                last_count = new_count
-
-        scroll_cards_container(min_cards=650)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards_container = soup.select_one("div.cards-container")
-        if not cards_container:
-            return json.dumps({"error": "No cards container found on the page"})
-        cards = cards_container.select("a[href*='/compound/']")
-
-        if not cards:
-            return json.dumps({"error": "No compound listings found in the cards container"})
-
-        compound_data = []
-        seen = set()
-
-        for card in cards:
-            try:
-                href = card.get("href")
-                if not href or href in seen:
-                    continue
-                seen.add(href)
-                full_url = f"https://www.nawy.com{href}"
-
-                area = None
-                area_div = card.select_one(".area")
-                if area_div:
-                    area = area_div.get_text(strip=True)
-
-                name = None
-                name_div = card.select_one(".name")
-                if name_div:
-                    name = name_div.get_text(strip=True)
-
-                summary = None
-                summary_h2 = card.find_next("h2")
-                if summary_h2:
-                    summary = summary_h2.get_text(strip=True)
-
-                property_types = [pt.get_text(strip=True) for pt in card.find_all("span", class_="property-type")]
-
-                dev_price = resale_price = None
-                card_footer = card.find_next("div", class_="card-footer")
-                if card_footer:
-                    price_blocks = card_footer.find_all("div", class_="sc-a18c0201-0 HytCg")
-                    for block in price_blocks:
-                        price_text = block.find("div", class_="price-text")
-                        price_value = block.find("span", class_="price")
-                        if price_text and price_value:
-                            if "Developer Start Price" in price_text.get_text():
-                                dev_price = price_value.get_text(strip=True)
-                            elif "Resale Start Price" in price_text.get_text():
-                                resale_price = price_value.get_text(strip=True)
-
-                # Extract developer name from summary
-                developer_name = "N/A"
-                if summary:
-                    import re
-                    match = re.search(r'discover\s+(.*?)\'', summary.lower())
-                    if match:
-                        developer_name = match.group(1).strip()
-
-                compound_data.append({
-                    "Area": area or "N/A",
-                    "Project Name": name or "N/A",
-                    "Developer Name": developer_name,
-                    "Summary": summary or "N/A",
-                    "Property Types": property_types,
-                    "Developer Start Price": dev_price or "N/A",
-                    "Resale Start Price": resale_price or "N/A",
-                    "Land Area": "",
-                    "Detail Page URL": full_url
-                })
-            except Exception as e:
-                continue
-
-        if not compound_data:
-            return json.dumps({"error": "No valid compound data could be extracted"})
-
-        with open("compounds_north.json", "w", encoding="utf-8") as f:
-            json.dump(compound_data, f, ensure_ascii=False, indent=2)
-        return json.dumps({"message": f"Extracted {len(compound_data)} projects and saved to compounds_north.json", "count": len(compound_data)})
-    except Exception as e:
-        return json.dumps({"error": f"Failed to scrape compounds: {str(e)}"})
-    finally:
-        driver.quit()
-
-# ---------- TOOL WRAPPING for North areas ----------
-scrape_north_tool = Tool(
-    name="Scrape Nawy Compounds North",
-    func=lambda _: scrape_nawy_compounds_north(),
-    description="Scrapes compound listings from Nawy North areas and saves them to compounds_north.json"
-)
-
-# ---------- TOOL FUNCTION (for East areas) ----------
-def scrape_nawy_compounds_east():
-    import time
-    from bs4 import BeautifulSoup
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://www.nawy.com/search?category=compound&areas=2%2C9%2C10%2C16%2C8%2C28%2C41%2C44")
-
-        # Wait for the cards-container to be present
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
-        )
-
-        def scroll_cards_container(min_cards=650, max_total_time=1800, wait_after_scroll=2):
-            import time
-            start_time = time.time()
-            last_count = 0
-            while True:
-                scroll_container = driver.find_element(By.CSS_SELECTOR, "div.sc-88b4dfdb-0.cgVQXi")
-                cards_container = scroll_container.find_element(By.CSS_SELECTOR, "div.sc-93b4050e-0.iJSftd")
-                cards = cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']")
-                if len(cards) >= min_cards:
-                    break
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight",
-                    scroll_container
-                )
-                time.sleep(wait_after_scroll)
-                new_count = len(cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']"))
-                if new_count == last_count or (time.time() - start_time > max_total_time):
-                    break
-                last_count = new_count
-
-        scroll_cards_container(min_cards=650)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards_container = soup.select_one("div.cards-container")
-        if not cards_container:
-            return json.dumps({"error": "No cards container found on the page"})
-        cards = cards_container.select("a[href*='/compound/']")
-
-        if not cards:
-            return json.dumps({"error": "No compound listings found in the cards container"})
-
-        compound_data = []
-        seen = set()
-
-        for card in cards:
-            try:
-                href = card.get("href")
-                if not href or href in seen:
-                    continue
-                seen.add(href)
-                full_url = f"https://www.nawy.com{href}"
-
-                area = None
-                area_div = card.select_one(".area")
-                if area_div:
-                    area = area_div.get_text(strip=True)
-
-                name = None
-                name_div = card.select_one(".name")
-                if name_div:
-                    name = name_div.get_text(strip=True)
-
-                summary = None
-                summary_h2 = card.find_next("h2")
-                if summary_h2:
-                    summary = summary_h2.get_text(strip=True)
-
-                property_types = [pt.get_text(strip=True) for pt in card.find_all("span", class_="property-type")]
-
-                dev_price = resale_price = None
-                card_footer = card.find_next("div", class_="card-footer")
-                if card_footer:
-                    price_blocks = card_footer.find_all("div", class_="sc-a18c0201-0 HytCg")
-                    for block in price_blocks:
-                        price_text = block.find("div", class_="price-text")
-                        price_value = block.find("span", class_="price")
-                        if price_text and price_value:
-                            if "Developer Start Price" in price_text.get_text():
-                                dev_price = price_value.get_text(strip=True)
-                            elif "Resale Start Price" in price_text.get_text():
-                                resale_price = price_value.get_text(strip=True)
-
-                # Extract developer name from summary
-                developer_name = "N/A"
-                if summary:
-                    import re
-                    match = re.search(r'discover\s+(.*?)\'', summary.lower())
-                    if match:
-                        developer_name = match.group(1).strip()
-
-                compound_data.append({
-                    "Area": area or "N/A",
-                    "Project Name": name or "N/A",
-                    "Developer Name": developer_name,
-                    "Summary": summary or "N/A",
-                    "Property Types": property_types,
-                    "Developer Start Price": dev_price or "N/A",
-                    "Resale Start Price": resale_price or "N/A",
-                    "Land Area": "",
-                    "Detail Page URL": full_url
-                })
-            except Exception as e:
-                continue
-
-        if not compound_data:
-            return json.dumps({"error": "No valid compound data could be extracted"})
-
-        with open("compounds_east.json", "w", encoding="utf-8") as f:
-            json.dump(compound_data, f, ensure_ascii=False, indent=2)
-        return json.dumps({"message": f"Extracted {len(compound_data)} projects and saved to compounds_east.json", "count": len(compound_data)})
-    except Exception as e:
-        return json.dumps({"error": f"Failed to scrape compounds: {str(e)}"})
-    finally:
-        driver.quit()
-
-# ---------- TOOL WRAPPING for East areas ----------
-scrape_east_tool = Tool(
-    name="Scrape Nawy Compounds East",
-    func=lambda _: scrape_nawy_compounds_east(),
-    description="Scrapes compound listings from Nawy East areas and saves them to compounds_east.json"
-)
-
-# ---------- TOOL FUNCTION (for West areas) ----------
-def scrape_nawy_compounds_west():
-    import time
-    from bs4 import BeautifulSoup
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://www.nawy.com/search?areas=1%2C26%2C38%2C39%2C40%2C42")
-
-        # Wait for the cards-container to be present
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
-        )
-
-        def scroll_cards_container(min_cards=650, max_total_time=1800, wait_after_scroll=2):
-            import time
-            start_time = time.time()
-            last_count = 0
-            while True:
-                scroll_container = driver.find_element(By.CSS_SELECTOR, "div.sc-88b4dfdb-0.cgVQXi")
-                cards_container = scroll_container.find_element(By.CSS_SELECTOR, "div.sc-93b4050e-0.iJSftd")
-                cards = cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']")
-                if len(cards) >= min_cards:
-                    break
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight",
-                    scroll_container
-                )
-                time.sleep(wait_after_scroll)
-                new_count = len(cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/compound/']"))
-                if new_count == last_count or (time.time() - start_time > max_total_time):
-                    break
-                last_count = new_count
-
-        scroll_cards_container(min_cards=650)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards_container = soup.select_one("div.cards-container")
-        if not cards_container:
-            return json.dumps({"error": "No cards container found on the page"})
-        cards = cards_container.select("a[href*='/compound/']")
-
-        if not cards:
-            return json.dumps({"error": "No compound listings found in the cards container"})
-
-        compound_data = []
-        seen = set()
-
-        for card in cards:
-            try:
-                href = card.get("href")
-                if not href or href in seen:
-                    continue
-                seen.add(href)
-                full_url = f"https://www.nawy.com{href}"
-
-                area = None
-                area_div = card.select_one(".area")
-                if area_div:
-                    area = area_div.get_text(strip=True)
-
-                name = None
-                name_div = card.select_one(".name")
-                if name_div:
-                    name = name_div.get_text(strip=True)
-
-                summary = None
-                summary_h2 = card.find_next("h2")
-                if summary_h2:
-                    summary = summary_h2.get_text(strip=True)
-
-                property_types = [pt.get_text(strip=True) for pt in card.find_all("span", class_="property-type")]
-
-                dev_price = resale_price = None
-                card_footer = card.find_next("div", class_="card-footer")
-                if card_footer:
-                    price_blocks = card_footer.find_all("div", class_="sc-a18c0201-0 HytCg")
-                    for block in price_blocks:
-                        price_text = block.find("div", class_="price-text")
-                        price_value = block.find("span", class_="price")
-                        if price_text and price_value:
-                            if "Developer Start Price" in price_text.get_text():
-                                dev_price = price_value.get_text(strip=True)
-                            elif "Resale Start Price" in price_text.get_text():
-                                resale_price = price_value.get_text(strip=True)
-
-                # Extract developer name from summary
-                developer_name = "N/A"
-                if summary:
-                    import re
-                    match = re.search(r'discover\s+(.*?)\'', summary.lower())
-                    if match:
-                        developer_name = match.group(1).strip()
-
-                compound_data.append({
-                    "Area": area or "N/A",
-                    "Project Name": name or "N/A",
-                    "Developer Name": developer_name,
-                    "Summary": summary or "N/A",
-                    "Property Types": property_types,
-                    "Developer Start Price": dev_price or "N/A",
-                    "Resale Start Price": resale_price or "N/A",
-                    "Land Area": "",
-                    "Detail Page URL": full_url
-                })
-            except Exception as e:
-                continue
-
-        if not compound_data:
-            return json.dumps({"error": "No valid compound data could be extracted"})
-
-        with open("compounds_west.json", "w", encoding="utf-8") as f:
-            json.dump(compound_data, f, ensure_ascii=False, indent=2)
-        return json.dumps({"message": f"Extracted {len(compound_data)} projects and saved to compounds_west.json", "count": len(compound_data)})
-    except Exception as e:
-        return json.dumps({"error": f"Failed to scrape compounds: {str(e)}"})
-    finally:
-        driver.quit()
-
-# ---------- TOOL WRAPPING for West areas ----------
-scrape_west_tool = Tool(
-    name="Scrape Nawy Compounds West",
-    func=lambda _: scrape_nawy_compounds_west(),
-    description="Scrapes compound listings from Nawy West areas and saves them to compounds_west.json"
-)
-
-# ---------- TOOL FUNCTION (for North areas) ----------
-def scrape_nawy_properties_north(skip=0):
-    import time
-    from bs4 import BeautifulSoup
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://www.nawy.com/search?category=property&areas=12%2C32%2C33%2C34%2C35%2C36%2C37")
-
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
-        )
-
-        def scroll_cards_container(min_cards=3000, max_total_time=1800, wait_after_scroll=2):
-            import time
-            start_time = time.time()
-            last_count = 0
-            while True:
-                scroll_container = driver.find_element(By.CSS_SELECTOR, "div.sc-88b4dfdb-0.cgVQXi")
-                cards_container = scroll_container.find_element(By.CSS_SELECTOR, "div.sc-93b4050e-0.iJSftd")
-                cards = cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/property/']")
-                if len(cards) >= min_cards:
-                    break
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight",
-                    scroll_container
-                )
-                time.sleep(wait_after_scroll)
-                new_count = len(cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/property/']"))
-                if new_count == last_count or (time.time() - start_time > max_total_time):
-                    break
-                last_count = new_count
-
-        scroll_cards_container(min_cards=3000)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards_container = soup.select_one("div.cards-container")
-        if not cards_container:
-            return json.dumps({"error": "No cards container found on the page"})
-        cards = cards_container.select("a[href*='/property/']")
-        if skip > 0:
-            cards = cards[skip:]
-
-        if not cards:
-            return json.dumps({"error": "No property listings found in the cards container"})
-
-        property_data = []
-        seen = set()
-
-        for card in cards:
-            try:
-                href = card.get("href")
-                if not href or href in seen:
-                    continue
-                seen.add(href)
-                full_url = f"https://www.nawy.com{href}"
-
-                # Area, Property Type, Project Name
-                area = card.find_previous("div", class_="area")
-                area_text = area.get_text(strip=True) if area else "N/A"
-                name_div = card.select_one(".name")
-                name_text = name_div.get_text(strip=True) if name_div else "N/A"
-                if "," in name_text:
-                    property_type, project_name = [x.strip() for x in name_text.split(",", 1)]
-                else:
-                    property_type, project_name = name_text, "N/A"
-
-                # BUA, Beds, Bathrooms
-                bua = beds = baths = "N/A"
-                details = card.find_all("div", class_="sc-234f71bd-1 fkOmQT")
-                if details and len(details) >= 1:
-                    spans = details[0].find_all("div")
-                    if len(spans) >= 3:
-                        bua = spans[0].get_text(strip=True)
-                        beds = spans[1].get_text(strip=True)
-                        baths = spans[2].get_text(strip=True)
-
-                # Down Payment
-                down_payment = None
-                card_footer = card.find_next("div", class_="card-footer")
-                if card_footer:
-                    dp_container = card_footer.find("div", class_="down-payment-container")
-                    if dp_container:
-                        down_payment = ' '.join(dp_container.stripped_strings)
-
-                # Price
-                price = "N/A"
-                price_container = card_footer.find("div", class_="price-container") if card_footer else None
-                if price_container:
-                    price_span = price_container.find("span", class_="price")
-                    if price_span:
-                        price = price_span.get_text(separator=" ", strip=True)
-                        import re
-                        price = re.sub(r"\s*EGP", " EGP", price)
-                        price = re.sub(r"\s+", " ", price).strip()
-
-                # Sale Type
-                sale_type = "Developer Sale"
-                cover_tags = card.find_all("p", class_="tag")
-                if cover_tags:
-                    for tag in cover_tags:
-                        if "resale" in tag.get_text(strip=True).lower():
-                            sale_type = "Resale"
-                            break
-
-                property_data.append({
-                    "Area": area_text,
-                    "Property Type": property_type,
-                    "Project Name": project_name,
-                    "BUA": bua,
-                    "Beds": beds,
-                    "Bathrooms": baths,
-                    "Down Payment": down_payment,
-                    "Price": price,
-                    "Sale Type": sale_type,
-                    "Detail Page URL": full_url
-                })
-            except Exception as e:
-                continue
-
-        if not property_data:
-            return json.dumps({"error": "No valid property data could be extracted"})
-
-        with open("property_listings_north.json", "w", encoding="utf-8") as f:
-            json.dump(property_data, f, ensure_ascii=False, indent=2)
-        return json.dumps({"message": f"Extracted {len(property_data)} properties and saved to property_listings_north.json", "count": len(property_data)})
-    except Exception as e:
-        return json.dumps({"error": f"Failed to scrape properties: {str(e)}"})
-    finally:
-        driver.quit()
-
-# ---------- TOOL WRAPPING for North property listings ----------
-scrape_north_property_tool = Tool(
-    name="Scrape Nawy Property Listings North",
-    func=lambda _: scrape_nawy_properties_north(skip=1632),
-    description="Scrapes property listings from Nawy North areas and saves them to property_listings_north.json"
-)
-
-# ---------- TOOL FUNCTION (for East property listings) ----------
-def scrape_nawy_properties_east(skip=0):
-    import time
-    from bs4 import BeautifulSoup
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://www.nawy.com/search?category=property&areas=2%2C9%2C10%2C16%2C8%2C28%2C41%2C44")
-
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
-        )
-
-        def scroll_cards_container(min_cards=3000, max_total_time=1800, wait_after_scroll=2):
-            import time
-            start_time = time.time()
-            last_count = 0
-            while True:
-                scroll_container = driver.find_element(By.CSS_SELECTOR, "div.sc-88b4dfdb-0.cgVQXi")
-                cards_container = scroll_container.find_element(By.CSS_SELECTOR, "div.sc-93b4050e-0.iJSftd")
-                cards = cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/property/']")
-                if len(cards) >= min_cards:
-                    break
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight",
-                    scroll_container
-                )
-                time.sleep(wait_after_scroll)
-                new_count = len(cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/property/']"))
-                if new_count == last_count or (time.time() - start_time > max_total_time):
-                    break
-                last_count = new_count
-
-        scroll_cards_container(min_cards=3000)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards_container = soup.select_one("div.cards-container")
-        if not cards_container:
-            return json.dumps({"error": "No cards container found on the page"})
-        cards = cards_container.select("a[href*='/property/']")
-        if skip > 0:
-            cards = cards[skip:]
-
-        if not cards:
-            return json.dumps({"error": "No property listings found in the cards container"})
-
-        property_data = []
-        seen = set()
-
-        for card in cards:
-            try:
-                href = card.get("href")
-                if not href or href in seen:
-                    continue
-                seen.add(href)
-                full_url = f"https://www.nawy.com{href}"
-
-                area = card.find_previous("div", class_="area")
-                area_text = area.get_text(strip=True) if area else "N/A"
-                name_div = card.select_one(".name")
-                name_text = name_div.get_text(strip=True) if name_div else "N/A"
-                if "," in name_text:
-                    property_type, project_name = [x.strip() for x in name_text.split(",", 1)]
-                else:
-                    property_type, project_name = name_text, "N/A"
-
-                bua = beds = baths = "N/A"
-                details = card.find_all("div", class_="sc-234f71bd-1 fkOmQT")
-                if details and len(details) >= 1:
-                    spans = details[0].find_all("div")
-                    if len(spans) >= 3:
-                        bua = spans[0].get_text(strip=True)
-                        beds = spans[1].get_text(strip=True)
-                        baths = spans[2].get_text(strip=True)
-
-                down_payment = None
-                card_footer = card.find_next("div", class_="card-footer")
-                if card_footer:
-                    dp_container = card_footer.find("div", class_="down-payment-container")
-                    if dp_container:
-                        down_payment = ' '.join(dp_container.stripped_strings)
-
-                price = "N/A"
-                price_container = card_footer.find("div", class_="price-container") if card_footer else None
-                if price_container:
-                    price_span = price_container.find("span", class_="price")
-                    if price_span:
-                        price = price_span.get_text(separator=" ", strip=True)
-                        import re
-                        price = re.sub(r"\s*EGP", " EGP", price)
-                        price = re.sub(r"\s+", " ", price).strip()
-
-                sale_type = "Developer Sale"
-                cover_tags = card.find_all("p", class_="tag")
-                if cover_tags:
-                    for tag in cover_tags:
-                        if "resale" in tag.get_text(strip=True).lower():
-                            sale_type = "Resale"
-                            break
-
-                property_data.append({
-                    "Area": area_text,
-                    "Property Type": property_type,
-                    "Project Name": project_name,
-                    "BUA": bua,
-                    "Beds": beds,
-                    "Bathrooms": baths,
-                    "Down Payment": down_payment,
-                    "Price": price,
-                    "Sale Type": sale_type,
-                    "Detail Page URL": full_url
-                })
-            except Exception as e:
-                continue
-
-        if not property_data:
-            return json.dumps({"error": "No valid property data could be extracted"})
-
-        with open("property_listings_east.json", "w", encoding="utf-8") as f:
-            json.dump(property_data, f, ensure_ascii=False, indent=2)
-        return json.dumps({"message": f"Extracted {len(property_data)} properties and saved to property_listings_east.json", "count": len(property_data)})
-    except Exception as e:
-        return json.dumps({"error": f"Failed to scrape properties: {str(e)}"})
-    finally:
-        driver.quit()
-
-# ---------- TOOL FUNCTION (for East property listings) ----------
-scrape_east_property_tool = Tool(
-    name="Scrape Nawy Property Listings East",
-    func=lambda _: scrape_nawy_properties_east(),
-    description="Scrapes property listings from Nawy East areas and saves them to property_listings_east.json"
-)
-
-# ---------- TOOL FUNCTION (for West property listings) ----------
-def scrape_nawy_properties_west(skip=0):
-    import time
-    from bs4 import BeautifulSoup
-    from selenium import webdriver
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        driver.get("https://www.nawy.com/search?category=property&areas=1%2C26%2C38%2C39%2C40%2C42")
-
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
-        )
-
-        def scroll_cards_container(min_cards=3000, max_total_time=1800, wait_after_scroll=2):
-            import time
-            start_time = time.time()
-            last_count = 0
-            while True:
-                scroll_container = driver.find_element(By.CSS_SELECTOR, "div.sc-88b4dfdb-0.cgVQXi")
-                cards_container = scroll_container.find_element(By.CSS_SELECTOR, "div.sc-93b4050e-0.iJSftd")
-                cards = cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/property/']")
-                if len(cards) >= min_cards:
-                    break
-                driver.execute_script(
-                    "arguments[0].scrollTop = arguments[0].scrollHeight",
-                    scroll_container
-                )
-                time.sleep(wait_after_scroll)
-                new_count = len(cards_container.find_elements(By.CSS_SELECTOR, "a[href*='/property/']"))
-                if new_count == last_count or (time.time() - start_time > max_total_time):
-                    break
-                last_count = new_count
-
-        scroll_cards_container(min_cards=3000)
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards_container = soup.select_one("div.cards-container")
-        if not cards_container:
-            return json.dumps({"error": "No cards container found on the page"})
-        cards = cards_container.select("a[href*='/property/']")
-        if skip > 0:
-            cards = cards[skip:]
-
-        if not cards:
-            return json.dumps({"error": "No property listings found in the cards container"})
-
-        property_data = []
-        seen = set()
-
-        for card in cards:
-            try:
-                href = card.get("href")
-                if not href or href in seen:
-                    continue
-                seen.add(href)
-                full_url = f"https://www.nawy.com{href}"
-
-                area = card.find_previous("div", class_="area")
-                area_text = area.get_text(strip=True) if area else "N/A"
-                name_div = card.select_one(".name")
-                name_text = name_div.get_text(strip=True) if name_div else "N/A"
-                if "," in name_text:
-                    property_type, project_name = [x.strip() for x in name_text.split(",", 1)]
-                else:
-                    property_type, project_name = name_text, "N/A"
-
-                bua = beds = baths = "N/A"
-                details = card.find_all("div", class_="sc-234f71bd-1 fkOmQT")
-                if details and len(details) >= 1:
-                    spans = details[0].find_all("div")
-                    if len(spans) >= 3:
-                        bua = spans[0].get_text(strip=True)
-                        beds = spans[1].get_text(strip=True)
-                        baths = spans[2].get_text(strip=True)
-
-                down_payment = None
-                card_footer = card.find_next("div", class_="card-footer")
-                if card_footer:
-                    dp_container = card_footer.find("div", class_="down-payment-container")
-                    if dp_container:
-                        down_payment = ' '.join(dp_container.stripped_strings)
-
-                price = "N/A"
-                price_container = card_footer.find("div", class_="price-container") if card_footer else None
-                if price_container:
-                    price_span = price_container.find("span", class_="price")
-                    if price_span:
-                        price = price_span.get_text(separator=" ", strip=True)
-                        import re
-                        price = re.sub(r"\s*EGP", " EGP", price)
-                        price = re.sub(r"\s+", " ", price).strip()
-
-                sale_type = "Developer Sale"
-                cover_tags = card.find_all("p", class_="tag")
-                if cover_tags:
-                    for tag in cover_tags:
-                        if "resale" in tag.get_text(strip=True).lower():
-                            sale_type = "Resale"
-                            break
-
-                property_data.append({
-                    "Area": area_text,
-                    "Property Type": property_type,
-                    "Project Name": project_name,
-                    "BUA": bua,
-                    "Beds": beds,
-                    "Bathrooms": baths,
-                    "Down Payment": down_payment,
-                    "Price": price,
-                    "Sale Type": sale_type,
-                    "Detail Page URL": full_url
-                })
-            except Exception as e:
-                continue
-
-        if not property_data:
-            return json.dumps({"error": "No valid property data could be extracted"})
-
-        with open("property_listings_west.json", "w", encoding="utf-8") as f:
-            json.dump(property_data, f, ensure_ascii=False, indent=2)
-        return json.dumps({"message": f"Extracted {len(property_data)} properties and saved to property_listings_west.json", "count": len(property_data)})
-    except Exception as e:
-        return json.dumps({"error": f"Failed to scrape properties: {str(e)}"})
-    finally:
-        driver.quit()
-
-# ---------- TOOL WRAPPING for West property listings ----------
-scrape_west_property_tool = Tool(
-    name="Scrape Nawy Property Listings West",
-    func=lambda _: scrape_nawy_properties_west(),
-    description="Scrapes property listings from Nawy West areas and saves them to property_listings_west.json"
-)
-
-# ---------- AGENT SETUP ----------
-llm = ChatOpenAI(temperature=0, model_name="gpt-3.5-turbo-1106")
-
-agent = initialize_agent(
-    tools=[scrape_tool, scrape_north_tool, scrape_east_tool, scrape_west_tool, scrape_north_property_tool, scrape_east_property_tool, scrape_west_property_tool],
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    max_iterations=3
-)
-
-# ---------- RUN AGENT ----------
-if __name__ == "__main__":
-    agent.run("Use the Scrape Nawy Property Listings North tool to scrape the remaining north area property listings from Nawy, then use the Scrape Nawy Property Listings East tool to scrape all east area property listings, then use the Scrape Nawy Property Listings West tool to scrape all west area property listings, and save each to their respective files.")
+import os
+import json
+import shutil
+import sys
+
+from card_extract import (
+    COMPOUND_CARD_SELECTOR,
+    PROPERTY_CARD_SELECTOR,
+    drop_captured_fragments,
+    extract_cards,
+    extract_compound_card,
+    extract_property_card,
+)
+from instrument import annotate, count as count_event, span
+from listing_dedup import record_id
+
+# Importing this module only pulls in the scraper engine. Selenium, requests,
+# numpy and friends load inside the functions that use them, and the LangChain
+# agent (plus .env and the OpenAI key) only when build_agent() is called, so
+# workers, tests and the scheduler CLI start fast and need no API key.
+
+# ---------- SHARED SCRAPING HELPERS ----------
+SCROLL_CONTAINER_SELECTOR = "div.sc-88b4dfdb-0.cgVQXi"
+CARDS_CONTAINER_SELECTOR = "div.sc-93b4050e-0.iJSftd"
+
+# Returns [total card count, outerHTML of the cards from index `start` on].
+# Each card is shipped as its wrapper (the direct child of the cards container)
+# so the area/summary/footer blocks that sit next to the link come along.
+NEW_CARDS_JS = """
+const container = arguments[0], selector = arguments[1], start = arguments[2];
+const cards = container.querySelectorAll(selector);
+const fragments = [];
+let last = null;
+for (let i = start; i < cards.length; i++) {
+    let el = cards[i];
+    while (el.parentElement && el.parentElement !== container) el = el.parentElement;
+    if (el !== last) fragments.push(el.outerHTML);
+    last = el;
+}
+return [cards.length, fragments];
+"""
+
+
+# Resolves with the card count as soon as it grows past `previous`, or with the
+# current count once `timeoutMs` passes without growth.
+CARD_GROWTH_JS = """
+const container = arguments[0], selector = arguments[1], previous = arguments[2], timeoutMs = arguments[3];
+const done = arguments[arguments.length - 1];
+const count = () => container.querySelectorAll(selector).length;
+if (count() > previous) { done(count()); return; }
+let timer = null;
+const observer = new MutationObserver(() => {
+    const n = count();
+    if (n > previous) { observer.disconnect(); clearTimeout(timer); done(n); }
+});
+timer = setTimeout(() => { observer.disconnect(); done(count()); }, timeoutMs);
+observer.observe(container, {childList: true, subtree: true});
+"""
+
+SCROLL_DEFAULTS = {
+    "initial_wait": 1.0,   # seconds to wait for new cards after a scroll
+    "max_wait": 8.0,       # backoff ceiling for that wait while nothing arrives
+    "patience": 3,         # consecutive scrolls without new cards before giving up
+}
+
+
+def wait_for_card_growth(driver, cards_container, card_selector, previous, timeout):
+    # MutationObserver wakes us up the moment cards land; polling with backoff is
+    # the fallback for drivers without async script support.
+    import time
+    from selenium.webdriver.common.by import By
+
+    try:
+        driver.set_script_timeout(timeout + 5)
+        return driver.execute_async_script(CARD_GROWTH_JS, cards_container, card_selector, previous, int(timeout * 1000))
+    except Exception:
+        deadline = time.time() + timeout
+        delay = 0.1
+        while True:
+            count = len(cards_container.find_elements(By.CSS_SELECTOR, card_selector))
+            remaining = deadline - time.time()
+            if count > previous or remaining <= 0:
+                return count
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+
+
+def iter_card_batches(driver, card_selector, min_cards, max_total_time=1800, skip=0, stop_event=None,
+                      initial_wait=1.0, max_wait=8.0, patience=3, metrics=None):
+    # Infinite scroll over the cards-container that yields only the cards appended
+    # since the previous scroll, so the full page never has to be serialized/parsed.
+    # After each scroll we wait only until new cards show up; a scroll that brings
+    # nothing doubles the wait (up to max_wait) and `patience` such scrolls in a row
+    # end the crawl. `metrics` gets the split between waiting and working, and "end"
+    # says why the crawl stopped: only "exhausted" means every card was seen.
+    import time
+    from selenium.webdriver.common.by import By
+
+    metrics = metrics if metrics is not None else {}
+    metrics.update(scrolls=0, no_growth_scrolls=0, wait_s=0.0, end="exhausted")
+    start_time = time.time()
+    emitted = skip
+    wait = initial_wait
+    misses = 0
+    try:
+        while True:
+            scroll_container = driver.find_element(By.CSS_SELECTOR, SCROLL_CONTAINER_SELECTOR)
+            cards_container = scroll_container.find_element(By.CSS_SELECTOR, CARDS_CONTAINER_SELECTOR)
+            with span("card_fetch"):
+                count, fragments = driver.execute_script(NEW_CARDS_JS, cards_container, card_selector, emitted)
+            emitted = max(emitted, count)
+            # Cards on the page, including the ones a resumed crawl scrolls past unread
+            metrics["cards_loaded"] = count
+            if fragments:
+                yield fragments
+            if count >= min_cards:
+                metrics["end"] = "min_cards"
+                return
+            if time.time() - start_time > max_total_time:
+                metrics["end"] = "timeout"
+                return
+            if stop_event is not None and stop_event.is_set():
+                metrics["end"] = "stopped"
+                return
+            with span("scroll"):
+                driver.execute_script(
+                    "arguments[0].scrollTop = arguments[0].scrollHeight",
+                    scroll_container
+                )
+            metrics["scrolls"] += 1
+            count_event("scrolls")
+            waited_from = time.time()
+            with span("scroll_wait"):
+                new_count = wait_for_card_growth(driver, cards_container, card_selector, count, wait)
+            metrics["wait_s"] += time.time() - waited_from
+            if new_count > count:
+                misses = 0
+                wait = initial_wait
+                continue
+            misses += 1
+            metrics["no_growth_scrolls"] += 1
+            if misses >= patience:
+                break
+            wait = min(wait * 2, max_wait)
+
+        # Pick up whatever landed after the last wait gave up
+        with span("card_fetch"):
+            count, fragments = driver.execute_script(NEW_CARDS_JS, cards_container, card_selector, emitted)
+        if fragments:
+            yield fragments
+    finally:
+        elapsed = time.time() - start_time
+        metrics["elapsed_s"] = round(elapsed, 2)
+        metrics["work_s"] = round(elapsed - metrics["wait_s"], 2)
+        metrics["wait_s"] = round(metrics["wait_s"], 2)
+
+
+class ListingSink:
+    """Streams extracted records to ``<output>.partial.jsonl`` batch by batch.
+
+    Nothing is held in memory beyond the current batch and the captured URLs;
+    ``commit`` rewrites the partial file into the final pretty-printed JSON list.
+    The partial file doubles as the crawl checkpoint: with ``resume`` a restarted
+    job picks it up, so cards captured before the crash are neither re-extracted
+    nor lost. With ``merge`` the records already in the output file are kept and
+    new ones are appended to them instead of replacing the file. Records are
+    de-duplicated by canonical listing ID, so a re-slugged URL is not a new listing.
+    With ``typed`` every written record is also normalized on the spot into
+    ``<output>.typed.partial.jsonl``, which ``commit`` moves to the typed sidecar.
+    """
+
+    def __init__(self, output_path, resume=False, merge=False, typed=False):
+        self.output_path = output_path
+        stem = os.path.splitext(output_path)[0]
+        self.partial_path = f"{stem}.partial.jsonl"
+        self.typed_partial_path = f"{stem}.typed.partial.jsonl" if typed else None
+        self.merge = merge
+        self.count = 0
+        self.resumed = 0
+        self.urls = set()
+        self.ids = set()
+        if resume and os.path.exists(self.partial_path):
+            self._load_checkpoint()
+            self._file = open(self.partial_path, "a", encoding="utf-8")
+        else:
+            self._file = open(self.partial_path, "w", encoding="utf-8")
+        self._typed_file = None
+        if typed:
+            from listing_model import typed_line
+            # Typed lines follow the checkpoint, so a resumed one is re-normalized
+            self._typed_file = open(self.typed_partial_path, "w", encoding="utf-8")
+            self._typed_file.writelines(typed_line(record) for record in self.checkpoint_records())
+        self.existing, self.existing_ids = self._existing() if merge else (set(), set())
+
+    def _load_checkpoint(self):
+        # A crash can leave half a line at the end; cut the file back to the last whole record
+        good = 0
+        with open(self.partial_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.urls.add(record["Detail Page URL"])
+                self.ids.add(record_id(record))
+                self.count += 1
+                good += len(line)
+        with open(self.partial_path, "r+b") as f:
+            f.truncate(good)
+        self.resumed = self.count
+
+    def _existing(self):
+        if not os.path.exists(self.output_path):
+            return set(), set()
+        with open(self.output_path, encoding="utf-8") as f:
+            records = json.load(f)
+        return {record["Detail Page URL"] for record in records}, {record_id(record) for record in records}
+
+    @property
+    def captured(self):
+        # URLs a crawl can skip: checkpointed this run, or already in the output when merging
+        return self.urls | self.existing
+
+    def write_batch(self, records):
+        for record in records:
+            key = record_id(record)
+            if key in self.ids or key in self.existing_ids:
+                continue
+            self.ids.add(key)
+            self.urls.add(record["Detail Page URL"])
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if self._typed_file is not None:
+                from listing_model import typed_line
+                self._typed_file.write(typed_line(record))
+            self.count += 1
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if self._typed_file is not None and not self._typed_file.closed:
+            self._typed_file.close()
+
+    def checkpoint_records(self):
+        with open(self.partial_path, encoding="utf-8") as src:
+            for line in src:
+                yield json.loads(line)
+
+    def discard(self):
+        self.close()
+        os.remove(self.partial_path)
+        if self.typed_partial_path is not None:
+            os.remove(self.typed_partial_path)
+
+    def _records(self):
+        # -> (record, whether it came from this crawl's checkpoint)
+        if self.merge and os.path.exists(self.output_path):
+            with open(self.output_path, encoding="utf-8") as f:
+                for record in json.load(f):
+                    yield record, False
+        for record in self.checkpoint_records():
+            yield record, True
+
+    def commit(self):
+        # Same layout as json.dump(records, f, ensure_ascii=False, indent=2)
+        self.close()
+        tmp_path = self.output_path + ".tmp"
+        typed = None
+        if self.typed_partial_path is not None:
+            from listing_model import typed_line, typed_path_for
+            typed_path = typed_path_for(self.output_path)
+            typed = open(typed_path + ".tmp", "w", encoding="utf-8")
+        total = 0
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("[")
+                for record, fresh in self._records():
+                    item = json.dumps(record, ensure_ascii=False, indent=2)
+                    f.write(",\n  " if total else "\n  ")
+                    f.write(item.replace("\n", "\n  "))
+                    total += 1
+                    if typed is not None and not fresh:
+                        # Merged-in records were not extracted this run
+                        typed.write(typed_line(record))
+                f.write("\n]" if total else "]")
+            if typed is not None:
+                with open(self.typed_partial_path, encoding="utf-8") as src:
+                    shutil.copyfileobj(src, typed)
+        finally:
+            if typed is not None:
+                typed.close()
+        os.replace(tmp_path, self.output_path)
+        os.remove(self.partial_path)
+        if typed is not None:
+            os.replace(typed_path + ".tmp", typed_path)
+            os.remove(self.typed_partial_path)
+        return total
+
+
+# ---------- SCRAPE JOB SPECS ----------
+# One row per tool. Adding a region is one line in REGION_AREAS plus a job row.
+# "merge": True keeps what is already in the output file and only adds new listings.
+NAWY_SEARCH_URL = "https://www.nawy.com/search"
+
+REGION_AREAS = {
+    "north": "12,32,33,34,35,36,37",
+    "east": "2,9,10,16,8,28,41,44",
+    "west": "1,26,38,39,40,42",
+}
+
+CATEGORIES = {
+    "compound": {
+        "card_selector": COMPOUND_CARD_SELECTOR,
+        "extract_card": extract_compound_card,
+        "min_cards": 650,
+        "label": "projects",
+        "plural": "compounds",
+    },
+    "property": {
+        "card_selector": PROPERTY_CARD_SELECTOR,
+        "extract_card": extract_property_card,
+        "min_cards": 3000,
+        "label": "properties",
+        "plural": "properties",
+    },
+}
+
+SCRAPE_JOBS = {
+    "compounds": {"category": "compound", "region": None, "output": "nawy_compound_listings.json", "tool": "Scrape Nawy Compounds"},
+    "compounds_north": {"category": "compound", "region": "north", "output": "compounds_north.json", "tool": "Scrape Nawy Compounds North"},
+    "compounds_east": {"category": "compound", "region": "east", "output": "compounds_east.json", "tool": "Scrape Nawy Compounds East"},
+    "compounds_west": {"category": "compound", "region": "west", "output": "compounds_west.json", "tool": "Scrape Nawy Compounds West"},
+    "properties_north": {"category": "property", "region": "north", "output": "property_listings_north.json", "tool": "Scrape Nawy Property Listings North", "merge": True},
+    "properties_east": {"category": "property", "region": "east", "output": "property_listings_east.json", "tool": "Scrape Nawy Property Listings East"},
+    "properties_west": {"category": "property", "region": "west", "output": "property_listings_west.json", "tool": "Scrape Nawy Property Listings West"},
+}
+
+
+def search_url(spec, base_url=NAWY_SEARCH_URL):
+    from urllib.parse import urlencode
+    params = {"category": spec["category"]}
+    if spec.get("region"):
+        params["areas"] = REGION_AREAS[spec["region"]]
+    return f"{base_url}?{urlencode(params)}"
+
+
+# ---------- SCRAPER ENGINE ----------
+# Two ways to get a job's records: "browser" scrolls the search page in Chrome and
+# parses the cards, "http" reads the listings straight out of the page state with
+# plain requests (see http_backend.py). A job row may set "backend"; the call's
+# backend argument overrides it. Both feed the same ListingSink. With a response
+# cache (response_cache.py) both record what they load, and "cache" re-runs the
+# extractors over the recorded pages without a browser or the network.
+SCRAPE_BACKENDS = ("browser", "http", "cache")
+DETAIL_CACHE_DIR = ".detail_cache"
+
+
+def iter_browser_record_batches(spec, url, skip=0, min_cards=None, max_total_time=1800, stop_event=None,
+                                driver_pool=None, scroll=None, metrics=None, captured=None, cache=None, extractor=None):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from driver_pool import get_driver_pool
+
+    category = CATEGORIES[spec["category"]]
+    card_selector = category["card_selector"]
+    metrics = metrics if metrics is not None else {}
+
+    # Sessions come warm from the pool and go back to it after the job
+    pool = driver_pool or get_driver_pool()
+    with pool.session() as driver:
+        # Wait for the cards-container to be present
+        with span("page_load"):
+            driver.get(url)
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.cards-container"))
+            )
+
+        # Parse each scroll's new cards as they arrive. Cards captured by an earlier
+        # run still have to be scrolled past, but are dropped before parsing.
+        seen = {captured_url.replace("https://www.nawy.com", "", 1) for captured_url in captured or ()}
+        context = {}
+        batches = iter_card_batches(
+            driver, card_selector, min_cards=min_cards or category["min_cards"],
+            max_total_time=max_total_time, skip=skip, stop_event=stop_event,
+            metrics=metrics, **{**SCROLL_DEFAULTS, **(scroll or {})}
+        )
+        metrics.update(cards_seen=0, card_errors={})
+
+        def scrolled():
+            position = skip
+            for fragments in batches:
+                if cache is not None:
+                    if position == skip:
+                        # This crawl's batches replace the previous recording of the URL
+                        from response_cache import CARDS
+                        cache.clear(CARDS, url)
+                    cache.put_cards(url, position, fragments)
+                position += len(fragments)
+                metrics["cards_seen"] += len(fragments)
+                count_event("cards_seen", len(fragments))
+                yield drop_captured_fragments(fragments, card_selector, seen)
+
+        yield from iter_extracted_batches(scrolled(), category, seen, context, metrics["card_errors"], extractor)
+
+
+def iter_extracted_batches(fragment_batches, category, seen, context, errors, extractor=None):
+    # In-process, or on a ParallelExtractor's workers with one batch parsing while
+    # the next is scrolled to / read (parallel_extract.py); same records either way
+    if extractor is not None:
+        yield from extractor.iter_extracted(
+            fragment_batches, category["card_selector"], category["extract_card"], seen, context, errors
+        )
+        return
+    for fragments in fragment_batches:
+        yield extract_cards(fragments, category["card_selector"], category["extract_card"], seen, context, errors=errors)
+
+
+def iter_cached_record_batches(spec, url, cache, metrics=None, captured=None, extractor=None):
+    # Replays the scroll batches the browser recorded for this search, or else the
+    # results pages the http backend recorded, through the same extractors
+    from response_cache import CARDS
+
+    metrics = metrics if metrics is not None else {}
+    positions = cache.positions(CARDS, url)
+    if not positions:
+        from http_backend import iter_http_record_batches
+        yield from iter_http_record_batches(url, spec["category"], metrics=metrics, captured=captured, cache=cache, offline=True)
+        return
+    category = CATEGORIES[spec["category"]]
+    card_selector = category["card_selector"]
+    seen = {captured_url.replace("https://www.nawy.com", "", 1) for captured_url in captured or ()}
+    context = {}
+    metrics.update(batches=0, cards_seen=0, card_errors={}, end="exhausted")
+
+    def replayed():
+        for position in positions:
+            with span("cache_read"):
+                fragments = cache.get_cards(url, position, stale=True)
+            metrics["batches"] += 1
+            metrics["cards_seen"] += len(fragments)
+            count_event("cards_seen", len(fragments))
+            yield drop_captured_fragments(fragments, card_selector, seen)
+
+    yield from iter_extracted_batches(replayed(), category, seen, context, metrics["card_errors"], extractor)
+
+
+def scrape_nawy(job, skip=None, min_cards=None, base_url=NAWY_SEARCH_URL, max_total_time=1800, output_dir=None,
+                stop_event=None, driver_pool=None, scroll=None, backend=None, resume=True, merge=None,
+                diff=False, typed=False, columns=False, store=None, history=None, details=False, cache=None,
+                progress=None, stall_timeout=None, report_dir=None, profile=None, extract_workers=None):
+    from scrape_progress import ScrapeProgress
+    from instrument import DEFAULT_REPORT_DIR, NULL_SPAN, RunReport
+
+    # With report_dir (or a profiler) every stage of the run is timed and the run
+    # report is written to <report_dir>/<job>.report.json and <job>.prom (instrument.py)
+    try:
+        report = RunReport(job, profile=profile) if report_dir or profile else None
+    except (ImportError, ValueError) as e:
+        return json.dumps({"error": f"Cannot profile with {profile}: {e}"})
+    with report.active(report_dir or DEFAULT_REPORT_DIR) if report is not None else NULL_SPAN:
+        spec = SCRAPE_JOBS[job]
+        category = CATEGORIES[spec["category"]]
+        # Progress events go to the `progress` callback; a stalled or aborted crawl is
+        # stopped through the same event the scheduler uses for its timeouts
+        metrics = {}
+        tracker = ScrapeProgress(job, spec["category"], progress, stall_timeout, stop_event, metrics)
+        stop_event = tracker.stop_event
+        output = os.path.join(output_dir, spec["output"]) if output_dir else spec["output"]
+        if skip is None:
+            skip = spec.get("skip", 0)
+        backend = backend or spec.get("backend", "browser")
+        if merge is None:
+            merge = spec.get("merge", False)
+        if backend not in SCRAPE_BACKENDS:
+            return json.dumps(tracker.finish({"error": f"Unknown scrape backend: {backend}"}))
+
+        url = search_url(spec, base_url)
+        if cache is not None:
+            from response_cache import open_cache
+            cache = open_cache(cache)
+        elif backend == "cache":
+            return json.dumps(tracker.finish({"error": "The cache backend needs a response cache"}))
+        tracker.start()
+        try:
+            # A checkpoint left by a crashed run is picked up instead of starting over.
+            # In diff mode the snapshot diff does the merging (a merge job never logs
+            # removals), so listings already in the output are re-parsed, not skipped,
+            # and their price changes and updates show up.
+            # With typed, records are normalized batch by batch as they are written.
+            # A diff rewrites the output and details enrich it after the commit, so
+            # their typed sidecar is converted from the final file instead.
+            typed_after = typed and (diff or details)
+            sink = ListingSink(output, resume=resume, merge=merge and not diff, typed=typed and not typed_after)
+            captured = sink.captured
+            # Card HTML is parsed on a process pool when extract_workers is set
+            extractor = None
+            if extract_workers and backend != "http":
+                from parallel_extract import get_parallel_extractor
+                extractor = get_parallel_extractor(extract_workers)
+            if backend == "cache":
+                batches = iter_cached_record_batches(spec, url, cache, metrics=metrics, captured=captured, extractor=extractor)
+            elif backend == "http":
+                from http_backend import iter_http_record_batches
+                batches = iter_http_record_batches(
+                    url, spec["category"], max_total_time=max_total_time, stop_event=stop_event, metrics=metrics,
+                    captured=captured, cache=cache
+                )
+            else:
+                batches = iter_browser_record_batches(
+                    spec, url, skip=skip, min_cards=min_cards, max_total_time=max_total_time,
+                    stop_event=stop_event, driver_pool=driver_pool, scroll=scroll, metrics=metrics, captured=captured,
+                    cache=cache, extractor=extractor
+                )
+
+            # Stream each batch of records to disk as it is parsed, and into the SQLite
+            # listing store when one is given
+            conn = None
+            if store:
+                from listing_store import open_store, upsert_records
+                conn = open_store(store)
+            try:
+                for records in batches:
+                    written = sink.count
+                    with span("write"):
+                        sink.write_batch(records)
+                    tracker.batch(records, sink.count - written)
+                    if conn is not None:
+                        with span("store"):
+                            upsert_records(conn, records, spec["category"], spec.get("region"))
+            finally:
+                batches.close()
+                sink.close()
+                if conn is not None:
+                    conn.close()
+                if cache is not None and backend != "cache":
+                    # Keep the cache within its TTL and size budget; a replay adds nothing
+                    metrics["cache_evicted"] = cache.evict()
+                # The backend's metrics also go into the result below
+                annotate(backend, metrics)
+
+            if not sink.count and not sink.existing:
+                return json.dumps(tracker.finish({"error": f"No valid {spec['category']} data could be extracted"}))
+
+            changes = None
+            if diff:
+                # Only the delta is logged and the snapshot is updated in place. Removals
+                # are only trusted from a crawl that ran to the end of the results.
+                # Detail-page fields from an earlier details=True run are not in the
+                # search results; they are kept rather than logged as blanked.
+                from listing_diff import refresh_snapshot
+                from detail_crawler import DETAIL_PATHS
+                complete = not merge and metrics.get("end") == "exhausted"
+                with span("diff"):
+                    changes = refresh_snapshot(
+                        output, list(sink.checkpoint_records()), complete=complete, carry=tuple(DETAIL_PATHS)
+                    )
+                sink.discard()
+                total = sum(n for op, n in changes.items() if op != "removed")
+            else:
+                with span("commit"):
+                    total = sink.commit()
+            enriched = None
+            if details:
+                # Land Area, delivery date, amenities and payment plans from the detail pages
+                from detail_crawler import enrich_listing_file
+                with span("details"):
+                    enriched = enrich_listing_file(output, cache_dir=DETAIL_CACHE_DIR)
+            if typed_after:
+                # Typed sidecar (<stem>.typed.jsonl) with parsed prices, areas and counts
+                from listing_model import convert_listing_file
+                with span("typed"):
+                    convert_listing_file(output)
+            if history:
+                # Append whatever prices moved since the last recorded snapshot
+                from price_history import open_history
+                with span("history"):
+                    open_history(history).record_file(output)
+            if columns:
+                # Memory-mappable columnar snapshot (<stem>.columns/) next to the JSON
+                from listing_columns import write_listing_files
+                with span("columns"):
+                    write_listing_files([output], f"{os.path.splitext(output)[0]}.columns")
+            return json.dumps(tracker.finish({
+                "message": f"Extracted {sink.count} {category['label']} and saved to {output}",
+                "count": sink.count,
+                "resumed": sink.resumed,
+                "total": total,
+                "changes": changes,
+                "details": enriched,
+                "backend": backend,
+                {"browser": "scroll", "http": "fetch", "cache": "replay"}[backend]: metrics,
+            }))
+        except Exception as e:
+            print(f"Error during scraping: {e}", file=sys.stderr)
+            return json.dumps(tracker.finish({"error": f"Failed to scrape {category['plural']}: {str(e)}"}))
+
+
+# ---------- TOOL WRAPPING ----------
+def make_scrape_tool(job, progress=None, stall_timeout=None):
+    # `progress` receives the scrape's events while the tool runs (scrape_progress.py)
+    from langchain.agents import Tool
+
+    spec = SCRAPE_JOBS[job]
+    where = f" {spec['region'].title()} areas" if spec.get("region") else ""
+    listings = "compound listings" if spec["category"] == "compound" else "property listings"
+    return Tool(
+        name=spec["tool"],
+        func=lambda _: scrape_nawy(job, progress=progress, stall_timeout=stall_timeout),
+        description=f"Scrapes {listings} from Nawy{where} and saves them to {spec['output']}"
+    )
+
+
+def make_pipeline_tool():
+    # One call runs the whole declared pipeline (job_runner.py) instead of the
+    # agent chaining scrape tools itself
+    from langchain.agents import Tool
+    from job_runner import default_pipeline, run_pipeline
+
+    def run(_):
+        code, results = run_pipeline(default_pipeline())
+        return json.dumps({"exit_code": code, "jobs": {name: result.get("status") for name, result in results.items()}})
+
+    return Tool(
+        name="Run Nawy Pipeline",
+        func=run,
+        description="Scrapes every Nawy job, then normalizes and stores all listing files, in one deterministic run"
+    )
+
+
+def make_scrape_tools(jobs=None, progress=None, stall_timeout=None):
+    tools = [make_scrape_tool(job, progress, stall_timeout) for job in jobs or SCRAPE_JOBS]
+    return tools + ([] if jobs else [make_pipeline_tool()])
+
+
+# ---------- AGENT SETUP ----------
+# The agent is an optional front-end over SCRAPE_JOBS; scheduled crawls should use
+# job_runner.py, which runs the same jobs as a DAG without model round-trips.
+AGENT_MODEL = "gpt-3.5-turbo-1106"
+AGENT_TASK = "Use the Scrape Nawy Property Listings North tool to scrape the remaining north area property listings from Nawy, then use the Scrape Nawy Property Listings East tool to scrape all east area property listings, then use the Scrape Nawy Property Listings West tool to scrape all west area property listings, and save each to their respective files."
+
+
+def build_agent(jobs=None, model=AGENT_MODEL, verbose=True, max_iterations=3, progress=None, stall_timeout=None):
+    # Loads LangChain and the .env file on first use; the key is checked, never printed
+    from dotenv import load_dotenv
+    from langchain.agents import initialize_agent, AgentType
+    from langchain_openai import ChatOpenAI
+
+    load_dotenv()
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("OPENAI_API_KEY is not set (in the environment or .env)")
+    llm = ChatOpenAI(temperature=0, model_name=model)
+    return initialize_agent(
+        tools=make_scrape_tools(jobs, progress, stall_timeout),
+        llm=llm,
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=verbose,
+        max_iterations=max_iterations
+    )
+
+
+# ---------- RUN AGENT ----------
+if __name__ == "__main__":
+    build_agent().run(AGENT_TASK)
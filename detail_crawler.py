@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+from http_backend import USER_AGENT, lookup, page_state
+from listing_dedup import PROPERTY_ID_RE, compound_id
+
+# ---------- ASYNC DETAIL-PAGE CRAWLER ----------
+# The search cards carry no Land Area, delivery date, amenities or payment plans;
+# the detail pages do, in their __NEXT_DATA__ page state. This fetches detail pages
+# concurrently on one aiohttp session:
+#   - at most `concurrency` requests in flight (semaphore),
+#   - at most `rate` requests per second per host,
+#   - 429/5xx and connection errors retried with exponential backoff and full
+#     jitter (Retry-After wins when the server sends one),
+#   - an on-disk ETag / Last-Modified cache, so re-crawls send conditional GETs
+#     and unchanged pages come back as bodiless 304s.
+#
+#   python detail_crawler.py compounds_east.json property_listings_east.json --concurrency 16 --rate 8
+
+NAWY_ORIGIN = "https://www.nawy.com"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Candidate paths into the listing object of the detail page state, first hit wins
+DETAIL_PATHS = {
+    "Land Area": ("land_area", "compound_land_area", "area_size"),
+    "Delivery Date": ("delivery_date", "min_ready_by", "ready_by"),
+    "Finishing": ("finishing.name", "finishing_type.name", "finishing"),
+    "Amenities": ("amenities", "facilities"),
+    "Payment Plans": ("payment_plans", "paymentPlans"),
+    "Description": ("description", "about"),
+}
+
+
+class RetryableStatus(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = {}
+        self._locks = {}
+
+    async def wait(self, host):
+        if not self.interval:
+            return
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            at = max(now, self._next.get(host, now))
+            self._next[host] = at + self.interval
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+class EtagCache:
+    """One gzip'd JSON file per URL holding the body and its validators."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json.gz")
+
+    def get(self, url):
+        try:
+            with gzip.open(self._path(url), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, body, etag, last_modified):
+        if not etag and not last_modified:
+            return
+        tmp_path = self._path(url) + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": etag, "last_modified": last_modified, "body": body}, f)
+        os.replace(tmp_path, self._path(url))
+
+
+def _retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def fetch_page(session, url, limiter, cache=None, retries=3, backoff=0.5, metrics=None):
+    import aiohttp
+
+    metrics = metrics if metrics is not None else {}
+    entry = cache.get(url) if cache else None
+    headers = cache.conditional_headers(entry) if cache else {}
+    host = urlparse(url).netloc
+    for attempt in range(retries + 1):
+        await limiter.wait(host)
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    if entry:
+                        metrics["not_modified"] = metrics.get("not_modified", 0) + 1
+                        return entry["body"]
+                    # Nothing cached to revalidate against: a cache miss, so ask
+                    # again without conditional headers
+                    metrics["not_modified_miss"] = metrics.get("not_modified_miss", 0) + 1
+                    headers = {}
+                    raise RetryableStatus(response.status, 0)
+                if response.status in RETRY_STATUSES:
+                    raise RetryableStatus(response.status, _retry_after(response.headers.get("Retry-After")))
+                response.raise_for_status()
+                body = await response.text()
+                if cache:
+                    cache.put(url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                metrics["fetched"] = metrics.get("fetched", 0) + 1
+                return body
+        except (RetryableStatus, aiohttp.ClientConnectionError, aiohttp.ServerTimeoutError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                raise
+            metrics["retries"] = metrics.get("retries", 0) + 1
+            delay = getattr(e, "retry_after", None)
+            if delay is None:
+                delay = random.uniform(0, backoff * 2 ** attempt)
+            await asyncio.sleep(delay)
+
+
+# ---------- DETAIL PAGE STATE -> FIELDS ----------
+def listing_numeric_id(url):
+    match = PROPERTY_ID_RE.search(url)
+    return int(match.group(1)) if match else compound_id(url)
+
+
+def find_detail_object(state, listing_id):
+    # The listing object is the dict in the page state whose "id" is the URL's ID.
+    # Without an ID nothing is matched: an object without "id" would compare equal.
+    if listing_id is None:
+        return None
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if str(node.get("id")) == str(listing_id) and any(lookup(node, paths) is not None for paths in DETAIL_PATHS.values()):
+                return node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def _named(items):
+    return [item.get("name", "") if isinstance(item, dict) else str(item) for item in items]
+
+
+def _plan(plan):
+    if not isinstance(plan, dict):
+        return str(plan)
+    return {key: value for key, value in plan.items() if isinstance(value, (str, int, float)) and value is not None}
+
+
+def parse_detail_page(body, url):
+    item = find_detail_object(page_state(body), listing_numeric_id(url))
+    if item is None:
+        return {}
+    details = {}
+    for field, paths in DETAIL_PATHS.items():
+        value = lookup(item, paths)
+        if value is None:
+            continue
+        if field == "Amenities":
+            value = _named(value) if isinstance(value, list) else [str(value)]
+        elif field == "Payment Plans":
+            value = [_plan(plan) for plan in value] if isinstance(value, list) else [_plan(value)]
+        elif not isinstance(value, str):
+            value = str(value)
+        details[field] = value
+    return details
+
+
+async def crawl_details(urls, concurrency=8, rate=4.0, retries=3, backoff=0.5, cache_dir=None, origin=None,
+                        timeout=30, metrics=None):
+    # url -> detail fields, or {"error": ...} for pages that could not be fetched.
+    # `origin` points the crawl at another host (a local stub) with the same paths.
+    import aiohttp
+
+    metrics = metrics if metrics is not None else {}
+    metrics.update(fetched=0, not_modified=0, retries=0, errors=0)
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(rate)
+    cache = EtagCache(cache_dir) if cache_dir else None
+    results = {}
+
+    async def crawl(session, url):
+        target = url.replace(NAWY_ORIGIN, origin, 1) if origin else url
+        async with semaphore:
+            try:
+                body = await fetch_page(session, target, limiter, cache, retries, backoff, metrics)
+                results[url] = parse_detail_page(body, url)
+            except Exception as e:
+                metrics["errors"] += 1
+                results[url] = {"error": str(e)}
+
+    started = time.perf_counter()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=timeout), headers={"User-Agent": USER_AGENT}
+    ) as session:
+        await asyncio.gather(*(crawl(session, url) for url in dict.fromkeys(urls)))
+    metrics["elapsed_s"] = round(time.perf_counter() - started, 2)
+    return results
+
+
+def fetch_details(urls, **options):
+    return asyncio.run(crawl_details(urls, **options))
+
+
+def enrich_records(records, details):
+    # Fills detail fields in place; records whose page failed keep what they had
+    enriched = 0
+    for record in records:
+        found = details.get(record["Detail Page URL"])
+        if found and "error" not in found:
+            record.update(found)
+            enriched += 1
+    return enriched
+
+
+def enrich_listing_file(path, **options):
+    with open(path, encoding="utf-8") as f:
+        records = json.load(f)
+    metrics = options.setdefault("metrics", {})
+    details = fetch_details([record["Detail Page URL"] for record in records], **options)
+    enriched = enrich_records(records, details)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return {"records": len(records), "enriched": enriched, **metrics}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill listing files with fields from their detail pages")
+    parser.add_argument("paths", nargs="+", help="compounds_*.json / property_listings_*.json files, updated in place")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=4.0, help="requests per second per host")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--cache-dir", default=".detail_cache", help="ETag cache directory ('' to disable)")
+    parser.add_argument("--origin", help="fetch from this origin instead of https://www.nawy.com")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        report = enrich_listing_file(
+            path, concurrency=args.concurrency, rate=args.rate, retries=args.retries,
+            cache_dir=args.cache_dir or None, origin=args.origin
+        )
+        print(json.dumps({path: report}))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
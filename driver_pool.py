@@ -0,0 +1,164 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+from instrument import span
+
+# ---------- CHROME SESSION POOL ----------
+# Resolving chromedriver and cold-starting Chrome costs seconds, so both happen once:
+# the driver binary path is cached for the process and browser sessions are handed
+# back to the pool after a job instead of being quit. A session is health-checked
+# (and reset to about:blank with cookies cleared) before it is reused, and replaced
+# if the check fails.
+
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    # CHROMEDRIVER_PATH skips webdriver_manager entirely (e.g. on CI images)
+    path = os.getenv("CHROMEDRIVER_PATH")
+    if path:
+        return path
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def chrome_options(headless=True):
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--window-size=1920,1080")
+    return options
+
+
+class DriverPool:
+    """At most ``size`` Chrome sessions, reused across jobs.
+
+    Use ``with pool.session() as driver:``; ``report()`` lists the startup time and
+    job count of every session the pool launched.
+    """
+
+    def __init__(self, size=1, headless=True):
+        self.size = size
+        self.headless = headless
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._live = {}
+        self._sessions = []
+        self._closed = False
+
+    def _launch(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        start = time.perf_counter()
+        with span("chrome_start"):
+            driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options(self.headless))
+        with self._lock:
+            stats = {"session": len(self._sessions) + 1, "startup_s": round(time.perf_counter() - start, 3), "jobs": 0}
+            self._sessions.append(stats)
+            self._live[id(driver)] = (driver, stats)
+        return driver
+
+    def _healthy(self, driver):
+        try:
+            driver.execute_script("return 1")
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._live.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        with span("driver_acquire"):
+            return self._acquire(timeout)
+
+    def _acquire(self, timeout):
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No Chrome session free after {timeout}s (pool size {self.size})")
+        try:
+            if self._closed:
+                raise RuntimeError("Driver pool is closed")
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    driver = self._launch()
+                    break
+                if self._healthy(driver):
+                    break
+                self._discard(driver)
+            self._live[id(driver)][1]["jobs"] += 1
+            return driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver):
+        try:
+            if self._closed:
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self, timeout=None):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def warm(self, count=None):
+        # Start sessions ahead of the first job so it does not pay the cold start
+        drivers = [self.acquire() for _ in range(count or self.size)]
+        for driver in drivers:
+            self._live[id(driver)][1]["jobs"] -= 1
+            self.release(driver)
+
+    def report(self):
+        with self._lock:
+            return [dict(stats) for stats in self._sessions]
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    # One warm session shared by the single-job tools; closed at interpreter exit
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = DriverPool(size=1)
+            atexit.register(_default_pool.close)
+        return _default_pool
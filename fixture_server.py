@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from card_fixtures import render_cards
+
+# ---------- LOCAL NAWY SEARCH STAND-IN ----------
+# Serves /search?category=...&areas=... as an infinite-scroll page with the same
+# scroll container / cards container markup as nawy.com. Cards are appended a page
+# at a time when the scroll container hits the bottom, so the real scroll loop and
+# extractors can run end to end in headless Chrome without touching the live site.
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><style>
+.sc-88b4dfdb-0.cgVQXi {{ height: 900px; overflow-y: auto; }}
+.card-wrapper {{ min-height: 240px; }}
+</style></head><body>
+<div class="sc-88b4dfdb-0 cgVQXi"><div class="sc-93b4050e-0 iJSftd cards-container"></div></div>
+<script>
+const CARDS = {cards};
+const PAGE_SIZE = {page_size}, DELAY_MS = {delay_ms};
+const scroller = document.querySelector("div.sc-88b4dfdb-0.cgVQXi");
+const container = scroller.firstElementChild;
+let next = 0, loading = false;
+function appendPage() {{
+    const end = Math.min(next + PAGE_SIZE, CARDS.length);
+    container.insertAdjacentHTML("beforeend", CARDS.slice(next, end).join(""));
+    next = end;
+    loading = false;
+}}
+scroller.addEventListener("scroll", () => {{
+    if (loading || next >= CARDS.length) return;
+    if (scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 50) {{
+        loading = true;
+        setTimeout(appendPage, DELAY_MS);
+    }}
+}});
+appendPage();
+</script></body></html>
+"""
+
+
+def render_search_page(records, category, page_size=50, delay_ms=200):
+    cards = json.dumps(render_cards(records, category), ensure_ascii=False).replace("</", "<\\/")
+    return PAGE_TEMPLATE.format(cards=cards, page_size=page_size, delay_ms=delay_ms)
+
+
+def start_fixture_server(datasets, page_size=50, delay_ms=200, host="127.0.0.1", port=0):
+    # datasets maps (category, areas) -> records, areas being the comma-separated
+    # area IDs from the query string or None for an unfiltered search.
+    # Returns (server, base_url); call server.shutdown() when done.
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            key = (query.get("category", [None])[0], query.get("areas", [None])[0])
+            if url.path != "/search" or key not in datasets:
+                self.send_error(404)
+                return
+            body = render_search_page(datasets[key], key[0], page_size, delay_ms).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/search"
+
+
+def start_replay_server(recordings_dir, host="127.0.0.1", port=0):
+    # Serves responses saved by http_backend.record_search_responses, keyed by the
+    # exact path and query string they were fetched with.
+    # Returns (server, base_url); call server.shutdown() when done.
+    from http_backend import recording_name
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            path = os.path.join(recordings_dir, recording_name(url.path, url.query))
+            if not os.path.exists(path):
+                self.send_error(404)
+                return
+            with open(path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json" if body[:1] in b"[{" else "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/search"
+
+
+# ---------- DETAIL PAGE STUB (aiohttp) ----------
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body><div id="__next"></div>
+<script id="__NEXT_DATA__" type="application/json">{state}</script>
+</body></html>
+"""
+AMENITIES = ("Clubhouse", "Gym", "Swimming Pool", "Kids Area", "Security", "Commercial Strip", "Beach Access")
+
+
+def detail_state(record):
+    # A plausible detail page state for a listing, derived from its numeric ID
+    from detail_crawler import listing_numeric_id
+
+    listing_id = listing_numeric_id(record["Detail Page URL"])
+    seed = listing_id or 0
+    listing = {
+        "id": listing_id,
+        "name": record.get("Project Name"),
+        "land_area": 20 + seed % 480,
+        "delivery_date": f"{2026 + seed % 5}-{1 + seed % 12:02d}-01",
+        "finishing": {"name": ("Finished", "Semi Finished", "Core & Shell")[seed % 3]},
+        "amenities": [{"name": name} for i, name in enumerate(AMENITIES) if (seed >> i) & 1],
+        "payment_plans": [
+            {"down_payment": 5 * (1 + (seed + i) % 4), "years": 6 + 2 * i, "discount": None} for i in range(1 + seed % 3)
+        ],
+        "description": f"Listing {listing_id}",
+    }
+    return {"props": {"pageProps": {"listing": listing, "compound": {"id": -1, "name": listing["name"]}}}}
+
+
+def start_detail_stub_server(records, fail_every=0, latency=0.0, host="127.0.0.1", port=0):
+    # Serves a detail page at the path of every record's Detail Page URL, on an
+    # aiohttp server in its own thread. Pages carry an ETag and answer a matching
+    # If-None-Match with 304; with fail_every=n, the first request for every n-th
+    # page gets a 503. stats counts requests, 200s, 304s and injected 503s.
+    # Returns (stop, base_url, stats); call stop() when done.
+    import asyncio
+    import hashlib
+
+    from aiohttp import web
+
+    pages, order = {}, {}
+    for i, record in enumerate(records):
+        path = urlparse(record["Detail Page URL"]).path
+        body = DETAIL_TEMPLATE.format(state=json.dumps(detail_state(record), ensure_ascii=False).replace("</", "<\\/"))
+        pages[path] = (body, '"' + hashlib.sha1(body.encode("utf-8")).hexdigest()[:16] + '"')
+        order[path] = i
+    stats = {"requests": 0, "ok": 0, "not_modified": 0, "failed": 0}
+    failed = set()
+
+    async def handle(request):
+        stats["requests"] += 1
+        path = request.rel_url.raw_path
+        if path not in pages:
+            raise web.HTTPNotFound()
+        if latency:
+            await asyncio.sleep(latency)
+        if fail_every and order[path] % fail_every == 0 and path not in failed:
+            failed.add(path)
+            stats["failed"] += 1
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        body, etag = pages[path]
+        if request.headers.get("If-None-Match") == etag:
+            stats["not_modified"] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        stats["ok"] += 1
+        return web.Response(text=body, content_type="text/html", headers={"ETag": etag})
+
+    loop = asyncio.new_event_loop()
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    runner = web.AppRunner(app, access_log=None)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, host, port)
+    loop.run_until_complete(site.start())
+    bound_port = site._server.sockets[0].getsockname()[1]
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return stop, f"http://{host}:{bound_port}", stats
@@ -0,0 +1,299 @@
+import json
+import os
+import re
+import time
+from urllib.parse import parse_qsl, quote, urlencode, urlparse, urlunparse
+
+from instrument import count, span
+from response_cache import PAGE
+
+# ---------- BROWSERLESS SEARCH BACKEND ----------
+# The search page is a Next.js app: the first render embeds the page state as JSON
+# in <script id="__NEXT_DATA__">, and the listings the cards are drawn from are in
+# there. This backend pages through the search with plain HTTP on one pooled
+# session, pulls the listing objects out of that JSON (or out of a JSON search
+# endpoint when NAWY_SEARCH_API is set) and maps them onto the same record schema
+# the card extractors produce for compounds_*.json / property_listings_*.json.
+#
+# The key layout in PROPERTY_PATHS / COMPOUND_PATHS is inferred, not taken from a
+# recorded response: benchmarks/replay_http.py only replays synthetic pages built
+# in that same layout until live responses are recorded with
+# record_search_responses. Prefer the browser backend for anything that has to
+# match its output until then.
+
+NEXT_DATA_RE = re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+
+def make_session(pool_size=8, retries=3):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en"})
+    return session
+
+
+def with_page(url, page):
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query))
+    query["page"] = str(page)
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def page_state(body):
+    # JSON search endpoints return the payload directly; HTML pages carry it in __NEXT_DATA__
+    body = body.strip()
+    if body[:1] in "[{":
+        return json.loads(body)
+    match = NEXT_DATA_RE.search(body)
+    if not match:
+        raise ValueError("No __NEXT_DATA__ page state in response")
+    return json.loads(match.group(1))
+
+
+# ---------- LISTING OBJECTS -> RECORDS ----------
+# Candidate paths per field; the first one present wins, so renamed keys only need
+# another entry here.
+PROPERTY_PATHS = {
+    "id": ("id",),
+    "slug": ("slug",),
+    "url": ("url", "link"),
+    "area": ("area.name", "compound.area.name", "area_name"),
+    "type": ("property_type.name", "type.name", "property_type"),
+    "compound_id": ("compound.id", "compound_id"),
+    "compound_slug": ("compound.slug",),
+    "project": ("compound.name", "compound_name"),
+    "bua": ("min_unit_area", "unit_area", "bua"),
+    "beds": ("number_of_bedrooms", "bedrooms"),
+    "baths": ("number_of_bathrooms", "bathrooms"),
+    "monthly": ("min_installments", "monthly_installment", "installment"),
+    "years": ("max_installment_years", "installment_years", "years"),
+    "price": ("min_price", "price"),
+    "resale": ("is_resale", "resale"),
+    "sale_type": ("sale_type", "finishing_type.sale_type"),
+}
+COMPOUND_PATHS = {
+    "id": ("id",),
+    "slug": ("slug",),
+    "url": ("url", "link"),
+    "area": ("area.name", "area_name"),
+    "name": ("name",),
+    "developer": ("developer.name", "developer_name"),
+    "summary": ("summary", "meta_title", "title"),
+    "property_types": ("property_types", "types"),
+    "developer_price": ("developer_start_price", "min_price", "starting_price"),
+    "resale_price": ("resale_start_price", "min_resale_price"),
+}
+
+
+def lookup(item, paths):
+    for path in paths:
+        value = item
+        for key in path.split("."):
+            if not isinstance(value, dict) or key not in value:
+                value = None
+                break
+            value = value[key]
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _number(value):
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        digits = re.sub(r"[^\d.]", "", value)
+        return float(digits) if digits else None
+    return None
+
+
+def _egp(value, suffix=True):
+    number = _number(value)
+    if number is None:
+        return None
+    return f"{int(round(number)):,} EGP" if suffix else f"{int(round(number)):,}"
+
+
+def _slugged(id_, slug):
+    return f"{id_}-{slug}" if slug else str(id_)
+
+
+def property_item_to_record(item):
+    get = lambda field: lookup(item, PROPERTY_PATHS[field])
+    url = get("url")
+    if not url:
+        url = (
+            f"/compound/{_slugged(get('compound_id'), get('compound_slug'))}"
+            f"/property/{_slugged(get('id'), get('slug'))}"
+        )
+    if url.startswith("/"):
+        url = f"https://www.nawy.com{url}"
+
+    bua, beds, baths = _number(get("bua")), get("beds"), get("baths")
+    monthly, years = _egp(get("monthly")), get("years")
+    down_payment = None
+    if monthly and years:
+        down_payment = f"{monthly} Monthly / {years} Years"
+    elif monthly:
+        down_payment = f"{monthly} Monthly"
+    elif years:
+        down_payment = f"{years} Years"
+
+    sale_type = get("sale_type")
+    resale = get("resale") is True or (isinstance(sale_type, str) and "resale" in sale_type.lower())
+    return {
+        "Area": get("area") or "N/A",
+        "Property Type": get("type") or "N/A",
+        "Project Name": get("project") or "N/A",
+        "BUA": f"{int(bua)}m2" if bua is not None else "N/A",
+        "Beds": f"{beds}Beds" if beds is not None else "N/A",
+        "Bathrooms": f"{baths}Baths" if baths is not None else "N/A",
+        "Down Payment": down_payment,
+        "Price": _egp(get("price")) or "N/A",
+        "Sale Type": "Resale" if resale else "Developer Sale",
+        "Detail Page URL": url,
+    }
+
+
+def compound_item_to_record(item):
+    get = lambda field: lookup(item, COMPOUND_PATHS[field])
+    url = get("url") or f"/compound/{_slugged(get('id'), get('slug'))}"
+    if url.startswith("/"):
+        url = f"https://www.nawy.com{url}"
+    types = get("property_types") or []
+    developer = get("developer")
+    return {
+        "Area": get("area") or "N/A",
+        "Project Name": get("name") or "N/A",
+        "Developer Name": developer.lower() if isinstance(developer, str) else "N/A",
+        "Summary": get("summary") or "N/A",
+        "Property Types": [t.get("name", "") if isinstance(t, dict) else str(t) for t in types],
+        "Developer Start Price": _egp(get("developer_price"), suffix=False) or "N/A",
+        "Resale Start Price": _egp(get("resale_price"), suffix=False) or "N/A",
+        "Land Area": "",
+        "Detail Page URL": url,
+    }
+
+
+ITEM_MAPPERS = {
+    "property": property_item_to_record,
+    "compound": compound_item_to_record,
+}
+
+
+def looks_like_listing(item, category):
+    # Property items point at their compound; compound items carry a developer or a
+    # start price. Filter options (areas, developers, types) have neither.
+    if category == "property":
+        return lookup(item, PROPERTY_PATHS["compound_id"]) is not None
+    return lookup(item, PROPERTY_PATHS["compound_id"]) is None and any(
+        lookup(item, COMPOUND_PATHS[field]) is not None for field in ("developer", "developer_price", "resale_price")
+    )
+
+
+def find_listing_items(state, category):
+    # Depth-first search for the first list of listing-shaped objects in the page state
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            if node and all(isinstance(x, dict) and "id" in x and looks_like_listing(x, category) for x in node):
+                return node
+            stack.extend(reversed(node))
+    return []
+
+
+def iter_http_record_batches(url, category, session=None, max_pages=500, max_total_time=1800, stop_event=None,
+                             page_delay=0.0, metrics=None, captured=None, cache=None, offline=False):
+    # Yields one batch of records per search results page until a page brings
+    # nothing new. NAWY_SEARCH_API (a URL accepting the same query string) switches
+    # from HTML page state to a JSON endpoint. URLs in `captured` are skipped.
+    # With a response cache, fresh cached pages are not fetched again and fetched
+    # ones are stored; `offline` replays the cache only, stale pages included.
+    api = os.getenv("NAWY_SEARCH_API")
+    if api:
+        url = f"{api}?{urlparse(url).query}"
+    session = session or (None if offline else make_session())
+    to_record = ITEM_MAPPERS[category]
+    metrics = metrics if metrics is not None else {}
+    metrics.update(pages=0, fetch_s=0.0, cards_seen=0, end="max_pages")
+    if cache is not None:
+        metrics["cached_pages"] = 0
+    start_time = time.time()
+    captured = captured or set()
+    seen = set()
+    for page in range(1, max_pages + 1):
+        if stop_event is not None and stop_event.is_set():
+            metrics["end"] = "stopped"
+            break
+        if time.time() - start_time > max_total_time:
+            metrics["end"] = "timeout"
+            break
+        fetched_from = time.time()
+        body = cache.get(PAGE, url, page, stale=offline) if cache is not None else None
+        if body is not None:
+            metrics["cached_pages"] += 1
+            count("cache_hits")
+        elif offline:
+            metrics["end"] = "cache_miss"
+            break
+        else:
+            with span("fetch"):
+                response = session.get(with_page(url, page), timeout=30)
+                response.raise_for_status()
+                body = response.text
+            count("pages_fetched")
+            count("bytes_fetched", len(response.content))
+            if cache is not None:
+                cache.put(PAGE, url, page, body)
+        with span("page_state"):
+            items = find_listing_items(page_state(body), category)
+        metrics["fetch_s"] = round(metrics["fetch_s"] + time.time() - fetched_from, 2)
+        metrics["pages"] += 1
+        # Past the last page the search returns nothing, or repeats a page already seen
+        metrics["cards_seen"] += len(items)
+        with span("extract"):
+            page_records = [to_record(item) for item in items]
+        count("cards_parsed", len(page_records))
+        urls = [record["Detail Page URL"] for record in page_records]
+        if not urls or seen.issuperset(urls):
+            metrics["end"] = "exhausted"
+            break
+        records = [r for r in page_records if r["Detail Page URL"] not in seen and r["Detail Page URL"] not in captured]
+        seen.update(urls)
+        yield records
+        if page_delay:
+            time.sleep(page_delay)
+
+
+def record_search_responses(url, out_dir, max_pages=500, session=None):
+    # Saves each raw results page so the backend can be replayed offline with
+    # fixture_server.start_replay_server(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    session = session or make_session()
+    saved = []
+    for page in range(1, max_pages + 1):
+        page_url = with_page(url, page)
+        response = session.get(page_url, timeout=30)
+        response.raise_for_status()
+        parts = urlparse(page_url)
+        path = os.path.join(out_dir, recording_name(parts.path, parts.query))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        saved.append(path)
+        if not find_listing_items(page_state(response.text), "property" if "category=property" in page_url else "compound"):
+            break
+    return saved
+
+
+def recording_name(path, query):
+    return quote(f"{path}?{query}", safe="") + ".txt"
@@ -0,0 +1,255 @@
+import contextvars
+import json
+import os
+import threading
+import time
+
+# ---------- RUN INSTRUMENTATION ----------
+# Timing spans and counters for every stage of a scrape, plus sampled peak RSS,
+# exported as a JSON run report and an OpenMetrics text file. Code marks its stages
+# with `with span("parse"):` / `count("cards", n)` and attach non-numeric run facts
+# with `annotate("fetch", metrics)`; those go to the RunReport active
+# in the current thread (scrape_nawy activates one per job when asked for a
+# report) and cost one context-variable lookup when none is.
+#
+# Stages recorded by the scrape engine:
+#   chrome_start, driver_acquire, page_load   - driver_pool / browser backend
+#   card_fetch, scroll, scroll_wait           - the scroll loop (card_fetch is the
+#                                               outerHTML serialization round trip)
+#   fetch, page_state                         - http backend
+#   parse, extract                            - card extraction per batch
+#   extract_wait                              - waiting on extraction workers
+#                                               (parallel_extract.py; parse/extract
+#                                               then run in the workers, untimed)
+#   write, store, commit, diff, details, typed, history, columns
+#
+# With profile="cprofile" (or "pyinstrument", if installed) the parse and extract
+# spans also run under a profiler, saved next to the report as <job>.pstats
+# (flameprof / snakeviz) or <job>.profile.html.
+
+DEFAULT_REPORT_DIR = "run_reports"
+PROFILED_STAGES = ("parse", "extract")
+PROFILERS = ("cprofile", "pyinstrument")
+
+_current = contextvars.ContextVar("run_report", default=None)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    report = _current.get()
+    return report.span(name) if report is not None else NULL_SPAN
+
+
+def count(name, n=1):
+    report = _current.get()
+    if report is not None:
+        report.count(name, n)
+
+
+def annotate(name, value):
+    report = _current.get()
+    if report is not None:
+        report.annotate(name, value)
+
+
+def current_rss():
+    # Resident set size in bytes, from /proc where available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Span:
+    __slots__ = ("report", "name", "start", "profiling")
+
+    def __init__(self, report, name):
+        self.report = report
+        self.name = name
+
+    def __enter__(self):
+        self.profiling = self.report.profiler is not None and self.name in PROFILED_STAGES
+        if self.profiling:
+            self.report.profiler_start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.profiling:
+            self.report.profiler_stop()
+        self.report.add_time(self.name, elapsed)
+        return False
+
+
+class RunReport:
+    """Per-stage totals (calls, seconds, slowest call), counters and peak RSS for one run.
+
+    ``with report.active(out_dir):`` routes span()/count() in this thread here,
+    samples RSS in the background and writes the report to out_dir on the way out.
+    """
+
+    def __init__(self, job, sample_interval=0.25, profile=None):
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profile!r}, expected one of {', '.join(PROFILERS)}")
+        self.job = job
+        self.sample_interval = sample_interval
+        self.stages = {}    # name -> [calls, seconds, max seconds]
+        self.counters = {}
+        self.annotations = {}
+        self.started = None
+        self.elapsed = 0.0
+        self.rss_start = self.rss_peak = 0
+        self.profile = profile
+        self.profiler = None
+        self._profiling = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if profile == "cprofile":
+            import cProfile
+            self.profiler = cProfile.Profile()
+        elif profile == "pyinstrument":
+            from pyinstrument import Profiler
+            self.profiler = Profiler(async_mode="disabled")
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                self.stages[name] = [1, seconds, seconds]
+            else:
+                stage[0] += 1
+                stage[1] += seconds
+                stage[2] = max(stage[2], seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def annotate(self, name, value):
+        with self._lock:
+            self.annotations[name] = value
+
+    # The profiler runs only inside profiled spans, and only the outermost one
+    # turns it on and off. pyinstrument cannot pause, so it runs from the first
+    # profiled span to the end of the run.
+    def profiler_start(self):
+        self._profiling += 1
+        if self._profiling == 1:
+            if self.profile == "cprofile":
+                try:
+                    self.profiler.enable()
+                except ValueError:
+                    # Python 3.12+ allows one cProfile at a time per process; a
+                    # concurrent job's batch goes unprofiled rather than failing
+                    self.counters["profiler_busy"] = self.counters.get("profiler_busy", 0) + 1
+            elif not self.profiler.is_running:
+                self.profiler.start()
+
+    def profiler_stop(self):
+        self._profiling -= 1
+        if self._profiling == 0 and self.profile == "cprofile":
+            self.profiler.disable()
+
+    def _sample(self):
+        while not self._stop.wait(self.sample_interval):
+            self.rss_peak = max(self.rss_peak, current_rss())
+
+    def active(self, out_dir=None):
+        report = self
+
+        class _Active:
+            def __enter__(self):
+                report.started = time.time()
+                report.rss_start = report.rss_peak = current_rss()
+                report._stop.clear()
+                threading.Thread(target=report._sample, name=f"rss-{report.job}", daemon=True).start()
+                self.token = _current.set(report)
+                return report
+
+            def __exit__(self, *exc):
+                _current.reset(self.token)
+                report._stop.set()
+                report.rss_peak = max(report.rss_peak, current_rss())
+                report.elapsed = time.time() - report.started
+                if report.profile == "pyinstrument" and report.profiler.is_running:
+                    report.profiler.stop()
+                if out_dir:
+                    report.write(out_dir)
+                return False
+
+        return _Active()
+
+    # ---------- export ----------
+    def as_dict(self):
+        with self._lock:
+            stages = {
+                name: {"calls": calls, "seconds": round(total, 6), "max_s": round(slowest, 6)}
+                for name, (calls, total, slowest) in sorted(self.stages.items(), key=lambda item: -item[1][1])
+            }
+            counters = dict(sorted(self.counters.items()))
+            annotations = dict(self.annotations)
+        return {
+            "job": self.job,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)) if self.started else None,
+            "elapsed_s": round(self.elapsed, 3),
+            "stages": stages,
+            "counters": counters,
+            "annotations": annotations,
+            "rss_start_bytes": self.rss_start,
+            "rss_peak_bytes": self.rss_peak,
+        }
+
+    def to_openmetrics(self):
+        report = self.as_dict()
+        job = report["job"].replace("\\", "\\\\").replace('"', '\\"')
+        lines = [
+            "# TYPE nawy_scrape_stage_seconds counter",
+            "# HELP nawy_scrape_stage_seconds Time spent in each scrape stage.",
+        ]
+        lines += [f'nawy_scrape_stage_seconds_total{{job="{job}",stage="{name}"}} {s["seconds"]}' for name, s in report["stages"].items()]
+        lines += ["# TYPE nawy_scrape_stage_calls counter", "# HELP nawy_scrape_stage_calls Times each scrape stage ran."]
+        lines += [f'nawy_scrape_stage_calls_total{{job="{job}",stage="{name}"}} {s["calls"]}' for name, s in report["stages"].items()]
+        lines += ["# TYPE nawy_scrape_events counter", "# HELP nawy_scrape_events Counted scrape events (cards, pages, ...)."]
+        lines += [f'nawy_scrape_events_total{{job="{job}",name="{name}"}} {n}' for name, n in report["counters"].items()]
+        lines += [
+            "# TYPE nawy_scrape_elapsed_seconds gauge",
+            f'nawy_scrape_elapsed_seconds{{job="{job}"}} {report["elapsed_s"]}',
+            "# TYPE nawy_scrape_peak_rss_bytes gauge",
+            f'nawy_scrape_peak_rss_bytes{{job="{job}"}} {report["rss_peak_bytes"]}',
+            "# EOF",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, out_dir):
+        # -> paths written: <job>.report.json, <job>.prom and the profile, if any
+        os.makedirs(out_dir, exist_ok=True)
+        stem = os.path.join(out_dir, self.job)
+        paths = [f"{stem}.report.json", f"{stem}.prom"]
+        with open(paths[0], "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        with open(paths[1], "w", encoding="utf-8") as f:
+            f.write(self.to_openmetrics())
+        if self.profile == "cprofile":
+            paths.append(f"{stem}.pstats")
+            self.profiler.dump_stats(paths[-1])
+        elif self.profile == "pyinstrument" and self.profiler.last_session is not None:
+            paths.append(f"{stem}.profile.html")
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(self.profiler.output_html())
+        return paths
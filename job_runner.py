@@ -0,0 +1,300 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from compound_scrape_agent import NAWY_SEARCH_URL, SCRAPE_JOBS, scrape_nawy
+
+# ---------- DETERMINISTIC PIPELINE RUNNER ----------
+# Runs a declared DAG of jobs directly, without an LLM deciding which tool to call
+# next. A pipeline is a JSON object of named nodes:
+#
+#   {"jobs": {
+#       "north": {"run": "scrape", "job": "properties_north", "options": {"backend": "http"}},
+#       "east":  {"run": "scrape", "job": "properties_east"},
+#       "typed": {"run": "normalize", "after": ["north", "east"]},
+#       "db":    {"run": "store", "after": ["typed"], "db": "nawy_listings.db"}
+#   }}
+#
+# A node starts once everything in its "after" list succeeded, up to --max-workers
+# at a time, in declaration order among the ready ones. A node without "paths"
+# works on the listing files its dependencies produced. A failed node's dependents
+# are skipped; the rest of the graph still runs. A scrape that runs out its own
+# time budget succeeds with what it got; one stopped by the runner's timeout or a
+# stall keeps what it wrote but counts as failed.
+#
+# Exit codes: 0 every node succeeded, 1 a node failed or was skipped,
+# 2 the pipeline itself is invalid (unknown node type or dependency, or a cycle).
+#
+#   python job_runner.py                                    # every scrape job, then normalize + store
+#   python job_runner.py pipelines/nightly.json --max-workers 3
+#   python job_runner.py pipelines/nightly.json --only db --dry-run
+
+EXIT_OK, EXIT_FAILED, EXIT_INVALID = 0, 1, 2
+
+
+class JobFailed(Exception):
+    pass
+
+
+# ---------- NODE TYPES ----------
+# Each takes (node, input paths, run context) and returns a result dict whose
+# "outputs" are the listing files handed to dependent nodes.
+def run_scrape(node, paths, context):
+    spec = SCRAPE_JOBS[node["job"]]
+    result = json.loads(scrape_nawy(
+        node["job"], base_url=context["base_url"], output_dir=context["output_dir"],
+        max_total_time=node.get("timeout", context["job_timeout"]), stop_event=context["stop_event"],
+        driver_pool=context["driver_pool"], **{"report_dir": context["report_dir"], **node.get("options", {})}
+    ))
+    if "error" in result:
+        raise JobFailed(result["error"])
+    # A crawl that used up its own max_total_time is a normal, partial run. One the
+    # runner had to stop past its timeout, or a stall abort (both set the stop
+    # event), still commits what it got, but it is not a success.
+    if context["stop_event"].is_set():
+        reason = result.get("progress", {}).get("aborted") or "timeout"
+        raise JobFailed(f"{node['job']} {reason} after {result.get('count', 0)} listings")
+    output_dir = context["output_dir"]
+    return {"outputs": [os.path.join(output_dir, spec["output"]) if output_dir else spec["output"]], **result}
+
+
+def run_normalize(node, paths, context):
+    # Typed <stem>.typed.jsonl sidecars; the JSON files are passed on unchanged
+    from listing_model import convert_listing_file
+    converted = {path: convert_listing_file(path)[1] for path in paths}
+    return {"outputs": paths, "normalized": converted}
+
+
+def run_store(node, paths, context):
+    from listing_store import DEFAULT_DB_PATH, ingest_files, open_store
+    conn = open_store(node.get("db", DEFAULT_DB_PATH))
+    try:
+        counts = ingest_files(conn, paths)
+    finally:
+        conn.close()
+    return {"outputs": paths, "stored": counts}
+
+
+def run_columns(node, paths, context):
+    from listing_columns import write_listing_files
+    written = [write_listing_files([path], f"{os.path.splitext(path)[0]}.columns") for path in paths]
+    return {"outputs": paths, "columns": len(written)}
+
+
+def run_history(node, paths, context):
+    from price_history import DEFAULT_HISTORY_PATH, open_history
+    history = open_history(node.get("history", DEFAULT_HISTORY_PATH))
+    return {"outputs": paths, "changes": {path: history.record_file(path) for path in paths}}
+
+
+def run_details(node, paths, context):
+    from detail_crawler import enrich_listing_file
+    return {"outputs": paths, "details": {path: enrich_listing_file(path, **node.get("options", {})) for path in paths}}
+
+
+def run_dedup(node, paths, context):
+    from listing_dedup import DedupIndex
+    index = DedupIndex(node.get("index", "listing_index.json"))
+    counts = {path: index.add_file(path) for path in paths}
+    index.save()
+    return {"outputs": paths, "dedup": counts}
+
+
+JOB_TYPES = {
+    "scrape": run_scrape,
+    "normalize": run_normalize,
+    "store": run_store,
+    "columns": run_columns,
+    "history": run_history,
+    "details": run_details,
+    "dedup": run_dedup,
+}
+
+
+# ---------- PIPELINE ----------
+def default_pipeline(jobs=None):
+    # Every scrape job in parallel, then one normalize and one store over all outputs
+    jobs = list(jobs or SCRAPE_JOBS)
+    nodes = {job: {"run": "scrape", "job": job} for job in jobs}
+    nodes["normalize"] = {"run": "normalize", "after": jobs}
+    nodes["store"] = {"run": "store", "after": ["normalize"]}
+    return {"jobs": nodes}
+
+
+def load_pipeline(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validate_pipeline(pipeline):
+    # Returns a list of problems; empty when the graph can run
+    nodes = pipeline.get("jobs") or {}
+    problems = []
+    if not nodes:
+        problems.append("pipeline has no jobs")
+    for name, node in nodes.items():
+        if node.get("run") not in JOB_TYPES:
+            problems.append(f"{name}: unknown job type {node.get('run')!r}, expected one of {', '.join(JOB_TYPES)}")
+        if node.get("run") == "scrape" and node.get("job") not in SCRAPE_JOBS:
+            problems.append(f"{name}: unknown scrape job {node.get('job')!r}")
+        for dep in node.get("after", []):
+            if dep not in nodes:
+                problems.append(f"{name}: depends on unknown job {dep!r}")
+    if not problems and len(topological_order(nodes)) < len(nodes):
+        problems.append("dependency cycle between: " + ", ".join(sorted(set(nodes) - set(topological_order(nodes)))))
+    return problems
+
+
+def topological_order(nodes):
+    # Kahn's algorithm, ties broken by declaration order so the plan is deterministic
+    position = {name: i for i, name in enumerate(nodes)}
+    waiting = {name: len(node.get("after", [])) for name, node in nodes.items()}
+    dependents = {name: [] for name in nodes}
+    for name, node in nodes.items():
+        for dep in node.get("after", []):
+            dependents[dep].append(name)
+    ready = [name for name in nodes if not waiting[name]]
+    order = []
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for child in dependents[name]:
+            waiting[child] -= 1
+            if not waiting[child]:
+                ready.append(child)
+                ready.sort(key=position.get)
+    return order
+
+
+def select_nodes(nodes, only):
+    # The named nodes plus everything they depend on, in declaration order
+    wanted, stack = set(), list(only)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(nodes[name].get("after", []))
+    return {name: node for name, node in nodes.items() if name in wanted}
+
+
+def plan(pipeline, only=None):
+    # -> (problems, the nodes to run)
+    problems = validate_pipeline(pipeline)
+    nodes = pipeline.get("jobs") or {}
+    if not problems and only:
+        problems = [f"unknown job {name!r}" for name in only if name not in nodes]
+    if problems or not only:
+        return problems, nodes
+    return problems, select_nodes(nodes, only)
+
+
+def run_pipeline(pipeline, max_workers=3, job_timeout=1800, base_url=NAWY_SEARCH_URL, output_dir=None,
+                 driver_pool=None, only=None, log=print, report_dir=None):
+    # -> (exit code, {node: {"status": ok|failed|skipped, "elapsed": s, ...result}})
+    problems, nodes = plan(pipeline, only)
+    if problems:
+        return EXIT_INVALID, {"errors": problems}
+
+    position = {name: i for i, name in enumerate(nodes)}
+    results = {}
+    started = {}
+    stop_events = {name: threading.Event() for name in nodes}
+    owns_pool = driver_pool is None and any(node["run"] == "scrape" for node in nodes.values())
+    if owns_pool:
+        from driver_pool import DriverPool
+        driver_pool = DriverPool(size=max_workers)
+
+    def inputs(name):
+        node = nodes[name]
+        if "paths" in node:
+            return list(node["paths"])
+        paths = []
+        for dep in node.get("after", []):
+            paths.extend(path for path in results[dep].get("outputs", []) if path not in paths)
+        return paths
+
+    def run(name):
+        node = nodes[name]
+        context = {
+            "base_url": base_url, "output_dir": output_dir, "job_timeout": job_timeout,
+            "driver_pool": driver_pool, "stop_event": stop_events[name], "report_dir": report_dir,
+        }
+        return JOB_TYPES[node["run"]](node, inputs(name), context)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline") as executor:
+            running = {}
+            while len(results) < len(nodes):
+                # Skip whatever depends on a failure; start whatever is ready
+                for name in nodes:
+                    if name in results or name in running.values():
+                        continue
+                    deps = nodes[name].get("after", [])
+                    if any(results.get(dep, {}).get("status") in ("failed", "skipped") for dep in deps):
+                        results[name] = {"status": "skipped", "elapsed": 0.0}
+                        log(f"[{name}] skipped")
+                    elif all(results.get(dep, {}).get("status") == "ok" for dep in deps):
+                        started[name] = time.time()
+                        running[executor.submit(run, name)] = name
+                        log(f"[{name}] started")
+                if not running:
+                    continue
+                done, _ = wait(running, timeout=1, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: position[running[f]]):
+                    name = running.pop(future)
+                    elapsed = round(time.time() - started[name], 1)
+                    try:
+                        results[name] = {"status": "ok", "elapsed": elapsed, **future.result()}
+                    except Exception as e:
+                        results[name] = {"status": "failed", "elapsed": elapsed, "error": str(e)}
+                    log(f"[{name}] {results[name]['status']} in {elapsed}s")
+                now = time.time()
+                for future, name in running.items():
+                    timeout = nodes[name].get("timeout", job_timeout)
+                    if now - started[name] > timeout:
+                        stop_events[name].set()
+    finally:
+        if owns_pool:
+            driver_pool.close()
+
+    ordered = {name: results[name] for name in nodes}
+    return (EXIT_OK if all(r["status"] == "ok" for r in ordered.values()) else EXIT_FAILED), ordered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a DAG of scrape/normalize/store jobs without the agent")
+    parser.add_argument("pipeline", nargs="?", help="pipeline JSON file (default: every scrape job, then normalize and store)")
+    parser.add_argument("--max-workers", type=int, default=3)
+    parser.add_argument("--job-timeout", type=float, default=1800, help="seconds per node unless it sets 'timeout'")
+    parser.add_argument("--base-url", default=NAWY_SEARCH_URL)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--only", nargs="+", metavar="JOB", help="run only these nodes and what they depend on")
+    parser.add_argument("--report-dir", metavar="DIR", help="write a run report per scrape node (see instrument.py)")
+    parser.add_argument("--dry-run", action="store_true", help="print the execution order and exit")
+    args = parser.parse_args()
+
+    pipeline = load_pipeline(args.pipeline) if args.pipeline else default_pipeline()
+    if args.dry_run:
+        problems, nodes = plan(pipeline, args.only)
+        if problems:
+            print(json.dumps({"errors": problems}, indent=2))
+            return EXIT_INVALID
+        for name in topological_order(nodes):
+            after = nodes[name].get("after", [])
+            print(f"{name:<20} {nodes[name]['run']:<10} {'after ' + ', '.join(after) if after else ''}")
+        return EXIT_OK
+
+    code, results = run_pipeline(
+        pipeline, args.max_workers, args.job_timeout, args.base_url, args.output_dir, only=args.only,
+        report_dir=args.report_dir
+    )
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from listing_model import PropertyListing, load_listings, region_of
+
+# ---------- COLUMNAR LISTING SNAPSHOTS ----------
+# A snapshot is a directory with one .npy file per column plus meta.json, written
+# next to the JSON output. Repetitive text (area, project, type, developer, region)
+# is dictionary-encoded as int32 codes into a list kept in meta.json; prices and
+# counts are plain numeric arrays; URLs are one UTF-8 blob with int64 offsets.
+# read_columns memory-maps every array, so opening a snapshot reads only meta.json
+# and the pages a query actually touches. A snapshot is written into a temporary
+# sibling directory and renamed into place, so readers never see torn columns.
+#
+#   python listing_columns.py property_listings_*.json --out property_listings.columns
+#   python listing_columns.py compounds_*.json --out compounds.columns
+#
+# Missing values: -1 in dictionary codes and integer columns, NaN in float columns.
+
+NULL_CODE = -1
+NULL_INT = -1
+
+PROPERTY_COLUMNS = (
+    ("url", "text"),
+    ("region", "dict"),
+    ("area", "dict"),
+    ("project", "dict"),
+    ("property_type", "dict"),
+    ("sale_type", "dict"),
+    ("price_egp", "int64"),
+    ("bua_m2", "float64"),
+    ("beds", "int16"),
+    ("baths", "int16"),
+    ("monthly_egp", "int64"),
+    ("tenor_years", "int16"),
+)
+COMPOUND_COLUMNS = (
+    ("url", "text"),
+    ("region", "dict"),
+    ("area", "dict"),
+    ("name", "dict"),
+    ("developer", "dict"),
+    ("property_types", "dict"),
+    ("developer_price_egp", "int64"),
+    ("resale_price_egp", "int64"),
+)
+COLUMN_LAYOUTS = {
+    "property": PROPERTY_COLUMNS,
+    "compound": COMPOUND_COLUMNS,
+}
+
+
+def _value(listing, name, region):
+    if name == "region":
+        return region
+    value = getattr(listing, name)
+    if name == "sale_type":
+        return value.value
+    if name == "property_types":
+        return "|".join(value) or None
+    return value
+
+
+def _encode_dict(values):
+    dictionary, index = [], {}
+    codes = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = NULL_CODE
+            continue
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(dictionary)
+            dictionary.append(value)
+        codes[i] = code
+    return codes, dictionary
+
+
+def _encode_text(values):
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def encode_columns(sources):
+    # sources: [(region, listings)], all of one category -> (category, arrays, dictionaries)
+    listings = [listing for _, group in sources for listing in group]
+    regions = [region for region, group in sources for _ in group]
+    properties = sum(isinstance(listing, PropertyListing) for listing in listings)
+    if properties not in (0, len(listings)):
+        raise ValueError(f"Listings of both categories in one snapshot ({properties} of {len(listings)} are properties)")
+    category = "property" if properties else "compound"
+    arrays, dictionaries = {}, {}
+    for name, kind in COLUMN_LAYOUTS[category]:
+        values = [_value(listing, name, region) for listing, region in zip(listings, regions)]
+        if kind == "dict":
+            arrays[name], dictionaries[name] = _encode_dict(values)
+        elif kind == "text":
+            arrays[name], arrays[f"{name}.offsets"] = _encode_text(values)
+        elif kind == "float64":
+            arrays[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            arrays[name] = np.array([NULL_INT if v is None else v for v in values], dtype=kind)
+    return category, arrays, dictionaries
+
+
+def write_columns(sources, out_dir):
+    category, arrays, dictionaries = encode_columns(sources)
+    meta = {"category": category, "rows": len(arrays["url.offsets"]) - 1, "columns": {}}
+    for name, kind in COLUMN_LAYOUTS[category]:
+        meta["columns"][name] = {"kind": kind}
+        if kind == "dict":
+            meta["columns"][name]["dictionary"] = dictionaries[name]
+
+    out_dir = os.path.abspath(out_dir)
+    parent, base = os.path.split(out_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{base}.", dir=parent)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        # A directory cannot be renamed over a non-empty one: the old snapshot is
+        # moved aside first and removed once the new one is in place. Snapshots
+        # already memory-mapped keep reading the old files.
+        old_dir = None
+        if os.path.exists(out_dir):
+            old_dir = tempfile.mkdtemp(prefix=f".{base}.old.", dir=parent)
+            os.replace(out_dir, os.path.join(old_dir, base))
+        os.replace(tmp_dir, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if old_dir is not None:
+        shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+
+def write_listing_files(paths, out_dir):
+    return write_columns([(region_of(path), load_listings(path)) for path in paths], out_dir)
+
+
+class ColumnarSnapshot:
+    """Memory-mapped view of a snapshot written by ``write_columns``.
+
+    ``snapshot["price_egp"]`` is the raw array (codes for dictionary columns);
+    ``decode``, ``codes_for`` and ``url`` translate between codes and values.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.category = meta["category"]
+        self.rows = meta["rows"]
+        self.columns = meta["columns"]
+        self._arrays = {}
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return array
+
+    def dictionary(self, name):
+        return self.columns[name]["dictionary"]
+
+    def codes_for(self, name, *values):
+        # Codes of the given dictionary values (unknown values are ignored)
+        dictionary = self.dictionary(name)
+        return [dictionary.index(value) for value in values if value in dictionary]
+
+    def decode(self, name, rows=None):
+        codes = self[name] if rows is None else self[name][rows]
+        dictionary = self.dictionary(name)
+        return [dictionary[code] if code != NULL_CODE else None for code in codes.tolist()]
+
+    def url(self, row):
+        offsets = self["url.offsets"]
+        return bytes(self["url"][offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+
+def read_columns(path):
+    return ColumnarSnapshot(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a columnar snapshot of listing files")
+    parser.add_argument("paths", nargs="+", help="listing files of one category (JSON or typed JSONL)")
+    parser.add_argument("--out", required=True, help="snapshot directory")
+    args = parser.parse_args()
+    meta = write_listing_files(args.paths, args.out)
+    print(f"{meta['rows']} {meta['category']} rows -> {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
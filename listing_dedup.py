@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import urlparse
+
+# ---------- CANONICAL LISTING IDS + CROSS-FILE DEDUP ----------
+# A listing's identity is the numeric ID in its Nawy URL, not the URL itself: the
+# slug after the ID can change between runs and the same compound is scraped by
+# the regional jobs and the unfiltered one. Properties are "p<id>" (from
+# /property/<id>-...), compounds "c<id>" (from /compound/<id>-...).
+#
+# DedupIndex is the persistent, cross-run view of which canonical IDs were seen in
+# which output files. merge_records folds any number of listing files into one
+# list in a single pass: first-occurrence order, later non-empty values win.
+#
+#   python listing_dedup.py compounds_*.json nawy_compound_listings.json --merge all_compounds.json
+#   python listing_dedup.py property_listings_*.json --index listing_index.json
+
+PROPERTY_ID_RE = re.compile(r"/property/(\d+)")
+COMPOUND_ID_RE = re.compile(r"/compound/(\d+)")
+EMPTY_VALUES = (None, "", "N/A", [])
+
+
+def compound_id(url):
+    match = COMPOUND_ID_RE.search(url)
+    return int(match.group(1)) if match else None
+
+
+def canonical_id(url):
+    match = PROPERTY_ID_RE.search(url)
+    if match:
+        return f"p{match.group(1)}"
+    match = COMPOUND_ID_RE.search(url)
+    if match:
+        return f"c{match.group(1)}"
+    # Not a Nawy detail URL: fall back to the normalized path
+    return "u:" + urlparse(url).path.rstrip("/").lower()
+
+
+def record_id(record):
+    return canonical_id(record["Detail Page URL"])
+
+
+def _merge_into(kept, record):
+    for key, value in record.items():
+        if value not in EMPTY_VALUES or key not in kept:
+            kept[key] = value
+
+
+def merge_records(sources):
+    # sources: iterables of records, in priority order (later wins). Returns
+    # (records, duplicates): one record per canonical ID in first-seen order.
+    merged, position = [], {}
+    duplicates = 0
+    for records in sources:
+        for record in records:
+            key = record_id(record)
+            at = position.get(key)
+            if at is None:
+                position[key] = len(merged)
+                merged.append(dict(record))
+            else:
+                _merge_into(merged[at], record)
+                duplicates += 1
+    return merged, duplicates
+
+
+class DedupIndex:
+    """Canonical ID -> where and when a listing was seen, persisted as JSON.
+
+    ``add`` registers one output file's records and reports how many were new
+    to the index and how many another source already had.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, records, source, seen_at=None):
+        seen_at = seen_at or time.strftime("%Y-%m-%dT%H:%M:%S")
+        counts = {"new": 0, "known": 0, "cross_source": 0}
+        for record in records:
+            key = record_id(record)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = {"url": record["Detail Page URL"], "sources": [source], "first_seen": seen_at, "last_seen": seen_at}
+                counts["new"] += 1
+                continue
+            counts["known"] += 1
+            if source not in entry["sources"]:
+                entry["sources"].append(source)
+                counts["cross_source"] += 1
+            entry["url"] = record["Detail Page URL"]
+            entry["last_seen"] = seen_at
+        return counts
+
+    def add_file(self, path, seen_at=None):
+        with open(path, encoding="utf-8") as f:
+            return self.add(json.load(f), os.path.basename(path), seen_at)
+
+    def overlaps(self):
+        # (sources...) -> number of listings seen in exactly that set of files
+        counts = {}
+        for entry in self.entries.values():
+            if len(entry["sources"]) > 1:
+                key = tuple(sorted(entry["sources"]))
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def save(self, path=None):
+        path = path or self.path
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicate listing files by canonical Nawy ID")
+    parser.add_argument("paths", nargs="+", help="listing JSON files, lowest priority first")
+    parser.add_argument("--index", help="persistent dedup index to update (JSON)")
+    parser.add_argument("--merge", metavar="OUT", help="write the merged, de-duplicated listings here")
+    args = parser.parse_args()
+
+    index = DedupIndex(args.index)
+    report = {path: index.add_file(path) for path in args.paths}
+    report["overlaps"] = {" + ".join(key): n for key, n in sorted(index.overlaps().items())}
+    if args.index:
+        index.save()
+    if args.merge:
+        sources = []
+        for path in args.paths:
+            with open(path, encoding="utf-8") as f:
+                sources.append(json.load(f))
+        merged, duplicates = merge_records(sources)
+        with open(args.merge, "w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+        report["merged"] = {"records": len(merged), "duplicates": duplicates}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# ---------- INCREMENTAL REFRESH AGAINST THE LAST SNAPSHOT ----------
+# A listing file (compounds_*.json / property_listings_*.json) is the snapshot.
+# A fresh crawl is compared with it by Detail Page URL and every listing lands in
+# one of: new, removed, price_changed, updated (some other field moved) or
+# unchanged. Only the first four are appended to `<stem>.delta.jsonl`, one event
+# per line, and the snapshot is rewritten in place: surviving listings keep their
+# position, new ones are appended. Replaying the delta log over an old snapshot
+# with apply_delta gives the current one. Fields the search crawl does not see
+# (`carry`, e.g. the detail-page fields of detail_crawler.py) keep their snapshot
+# value when the fresh record has them empty, instead of counting as updates.
+#
+#   python listing_diff.py property_listings_east.json fresh_east.json
+#   python listing_diff.py property_listings_east.json --apply property_listings_east.delta.jsonl
+
+KEY = "Detail Page URL"
+PRICE_FIELDS = ("Price", "Down Payment", "Developer Start Price", "Resale Start Price")
+CHANGE_TYPES = ("new", "removed", "price_changed", "updated", "unchanged")
+EMPTY_VALUES = (None, "", "N/A", [])
+
+
+def delta_path_for(snapshot_path):
+    return f"{os.path.splitext(snapshot_path)[0]}.delta.jsonl"
+
+
+def load_snapshot(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _changed_fields(old, new, carry=()):
+    fields = list(new) + [field for field in old if field not in new]
+    return {
+        field: new.get(field) for field in fields
+        if old.get(field) != new.get(field) and not (field in carry and new.get(field) in EMPTY_VALUES)
+    }
+
+
+def diff_listings(previous, current, complete=True, carry=()):
+    # Returns (events, counts). With complete=False the crawl is known to have been
+    # cut short, so listings missing from it are left alone instead of removed.
+    # Empty `carry` fields in the crawl never count as changes.
+    previous_by_url = {record[KEY]: record for record in previous}
+    counts = dict.fromkeys(CHANGE_TYPES, 0)
+    events = []
+    current_urls = set()
+    for record in current:
+        url = record[KEY]
+        if url in current_urls:
+            continue
+        current_urls.add(url)
+        old = previous_by_url.get(url)
+        if old is None:
+            events.append({"op": "new", "url": url, "record": record})
+            counts["new"] += 1
+            continue
+        changed = _changed_fields(old, record, carry)
+        if not changed:
+            counts["unchanged"] += 1
+            continue
+        # Only the fields that moved are logged; price moves keep the old value too
+        op = "price_changed" if any(field in changed for field in PRICE_FIELDS) else "updated"
+        event = {"op": op, "url": url, "fields": changed}
+        if op == "price_changed":
+            event["was"] = {field: old.get(field) for field in PRICE_FIELDS if field in changed}
+        events.append(event)
+        counts[op] += 1
+    if complete:
+        for url in previous_by_url:
+            if url not in current_urls:
+                events.append({"op": "removed", "url": url})
+                counts["removed"] += 1
+    return events, counts
+
+
+def apply_delta(records, events):
+    # Snapshot order is kept: updates land in place, removals drop out, new listings go last
+    by_url = {record[KEY]: dict(record) for record in records}
+    order = [record[KEY] for record in records]
+    for event in events:
+        url, op = event["url"], event["op"]
+        if op == "new":
+            if url not in by_url:
+                order.append(url)
+            by_url[url] = event["record"]
+        elif op == "removed":
+            by_url.pop(url, None)
+        elif url in by_url:
+            by_url[url].update(event["fields"])
+    return [by_url[url] for url in order if url in by_url]
+
+
+def write_delta_log(path, events, run=None):
+    run = run or time.strftime("%Y-%m-%dT%H:%M:%S")
+    with open(path, "a", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps({"run": run, **event}, ensure_ascii=False) + "\n")
+
+
+def read_delta_log(path, since=None):
+    # Events in log order, optionally only those of runs after `since`
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            if since is None or event["run"] > since:
+                events.append(event)
+    return events
+
+
+def write_snapshot(path, records):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def refresh_snapshot(snapshot_path, current, delta_path=None, complete=True, run=None, carry=()):
+    # Diff a fresh crawl against the snapshot, log the delta and update the snapshot.
+    # An unchanged crawl leaves both files untouched.
+    previous = load_snapshot(snapshot_path)
+    events, counts = diff_listings(previous, current, complete=complete, carry=carry)
+    if events:
+        write_delta_log(delta_path or delta_path_for(snapshot_path), events, run)
+        write_snapshot(snapshot_path, apply_delta(previous, events))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff a fresh listing crawl against its snapshot")
+    parser.add_argument("snapshot", help="listing JSON file updated in place")
+    parser.add_argument("current", nargs="?", help="fresh crawl (JSON list) to diff against the snapshot")
+    parser.add_argument("--apply", metavar="DELTA_LOG", help="replay a delta log onto the snapshot instead")
+    parser.add_argument("--since", help="with --apply, only runs after this timestamp")
+    parser.add_argument("--delta-log", help="delta log path (default: <snapshot stem>.delta.jsonl)")
+    parser.add_argument("--partial", action="store_true", help="crawl was cut short; never log removals")
+    args = parser.parse_args()
+
+    if args.apply:
+        records = apply_delta(load_snapshot(args.snapshot), read_delta_log(args.apply, args.since))
+        write_snapshot(args.snapshot, records)
+        print(json.dumps({"records": len(records)}))
+        return
+    if not args.current:
+        parser.error("either a fresh crawl file or --apply is required")
+    current = load_snapshot(args.current)
+    counts = refresh_snapshot(args.snapshot, current, args.delta_log, complete=not args.partial)
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import argparse
+import json
+import sys
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+
+from listing_dedup import compound_id
+from listing_model import COMPOUND_LISTING_FILES, PROPERTY_LISTING_FILES, CompoundListing, load_listings
+
+# ---------- PROPERTY -> COMPOUND JOIN ----------
+# Property URLs embed their compound's numeric ID (/compound/1230-sicily-lagoon/
+# property/...), and so do compound URLs (/compound/1230-sicily-lagoon). The
+# compounds are hashed by that ID once; each property is then joined in one dict
+# lookup. Per-compound aggregates (unit count, min/median price per m2) are kept
+# up to date as properties are added, replaced or removed, without rescanning.
+#
+#   python listing_join.py --top 10
+
+# Compound fields a later, emptier copy of a compound must not blank out
+COMPOUND_MERGE_FIELDS = ("area", "name", "developer", "summary", "developer_price_egp", "resale_price_egp")
+
+
+@dataclass(slots=True)
+class JoinedProperty:
+    listing: object
+    compound_id: int | None
+    compound: CompoundListing | None
+
+    @property
+    def developer(self):
+        return self.compound.developer if self.compound else None
+
+    @property
+    def price_per_m2(self):
+        return price_per_m2(self.listing)
+
+
+def price_per_m2(listing):
+    if listing.price_egp is None or not listing.bua_m2:
+        return None
+    return listing.price_egp / listing.bua_m2
+
+
+def _merge_compound(old, new):
+    # The same compound shows up in several files (nawy_compound_listings.json has
+    # no developer, for one); fill the gaps of the newer copy from the older one
+    for name in COMPOUND_MERGE_FIELDS:
+        if getattr(new, name) is None:
+            setattr(new, name, getattr(old, name))
+    if not new.property_types:
+        new.property_types = old.property_types
+    return new
+
+
+class CompoundStats:
+    """Running aggregates for one compound: units, min and median price per m2."""
+
+    __slots__ = ("units", "_ppm")
+
+    def __init__(self):
+        self.units = 0
+        self._ppm = []  # sorted price-per-m2 of the units that have one
+
+    def add(self, ppm):
+        self.units += 1
+        if ppm is not None:
+            insort(self._ppm, ppm)
+
+    def remove(self, ppm):
+        self.units -= 1
+        if ppm is not None:
+            del self._ppm[bisect_left(self._ppm, ppm)]
+
+    @property
+    def min_price_per_m2(self):
+        return self._ppm[0] if self._ppm else None
+
+    @property
+    def median_price_per_m2(self):
+        n = len(self._ppm)
+        if not n:
+            return None
+        mid = n // 2
+        return self._ppm[mid] if n % 2 else (self._ppm[mid - 1] + self._ppm[mid]) / 2
+
+    def as_dict(self):
+        return {
+            "units": self.units,
+            "min_price_per_m2": self.min_price_per_m2,
+            "median_price_per_m2": self.median_price_per_m2,
+        }
+
+
+class ListingJoin:
+    """Compound hash table plus incrementally maintained per-compound aggregates.
+
+    ``add_compounds`` / ``add_properties`` can be called with every new batch;
+    re-adding a property URL replaces its earlier contribution.
+    """
+
+    def __init__(self, compounds=()):
+        self.compounds = {}
+        self.stats = {}
+        self._units = {}  # property URL -> (compound id, price per m2)
+        self.add_compounds(compounds)
+
+    def add_compounds(self, compounds):
+        for compound in compounds:
+            key = compound_id(compound.url)
+            if key is None:
+                continue
+            old = self.compounds.get(key)
+            self.compounds[key] = compound if old is None else _merge_compound(old, compound)
+
+    def join(self, listing):
+        key = compound_id(listing.url)
+        return JoinedProperty(listing, key, self.compounds.get(key))
+
+    def add_properties(self, listings):
+        # Joins each property and folds it into its compound's aggregates
+        joined = []
+        for listing in listings:
+            row = self.join(listing)
+            self.remove_property(listing.url)
+            ppm = price_per_m2(listing)
+            self.stats.setdefault(row.compound_id, CompoundStats()).add(ppm)
+            self._units[listing.url] = (row.compound_id, ppm)
+            joined.append(row)
+        return joined
+
+    def remove_property(self, url):
+        unit = self._units.pop(url, None)
+        if unit is not None:
+            key, ppm = unit
+            self.stats[key].remove(ppm)
+            if not self.stats[key].units:
+                del self.stats[key]
+
+    def compound_stats(self, key):
+        stats = self.stats.get(key)
+        return stats.as_dict() if stats else {"units": 0, "min_price_per_m2": None, "median_price_per_m2": None}
+
+    def coverage(self):
+        # Share of added properties whose compound is known
+        if not self._units:
+            return 0.0
+        return sum(key in self.compounds for key, _ in self._units.values()) / len(self._units)
+
+
+def load_join(compound_paths=None, property_paths=None):
+    join = ListingJoin()
+    for path in compound_paths or COMPOUND_LISTING_FILES + ["nawy_compound_listings.json"]:
+        join.add_compounds(load_listings(path))
+    joined = []
+    for path in property_paths or PROPERTY_LISTING_FILES:
+        joined.extend(join.add_properties(load_listings(path)))
+    return join, joined
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join property listings to their compounds")
+    parser.add_argument("--top", type=int, default=10, help="compounds with the most units to print")
+    args = parser.parse_args()
+
+    join, joined = load_join()
+    print(f"{len(joined)} properties, {len(join.compounds)} compounds, {join.coverage():.1%} joined")
+    for key, stats in sorted(join.stats.items(), key=lambda item: -item[1].units)[:args.top]:
+        compound = join.compounds.get(key)
+        print(json.dumps({
+            "compound_id": key,
+            "name": compound.name if compound else None,
+            "developer": compound.developer if compound else None,
+            **stats.as_dict(),
+        }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass, field, fields
+from enum import Enum
+
+# ---------- TYPED LISTING MODEL ----------
+# The scrapers store display strings ("13,317,690 EGP", "123m2", "2Beds",
+# "131,789 EGP Monthly / 8 Years"). normalize_record parses them once into slotted
+# dataclasses with integer EGP amounts, float m2 and int counts, so consumers stop
+# re-parsing strings on every query. The scraped record is kept untouched on
+# `.raw`. Unparseable values become None rather than raising.
+#
+# The typed JSONL (<stem>.typed.jsonl) is written by the scrape itself, from each
+# extracted batch (ListingSink with typed=True), or by convert_listing_file for an
+# existing file. It holds the typed fields and, as "raw", only what they do not
+# carry: fields no typed field is parsed from (detail-page fields, Land Area) and
+# display strings that did not parse. Listings loaded from it have that on `.raw`.
+#
+#   python listing_model.py property_listings_*.json compounds_*.json   # writes <stem>.typed.jsonl
+
+AMOUNT_RE = re.compile(r"\d[\d,]*")
+BUA_RE = re.compile(r"(\d+(?:\.\d+)?)\s*m2")
+COUNT_RE = re.compile(r"^(\d+)")
+MONTHLY_RE = re.compile(r"([\d,]+)\s*EGP\s*Monthly")
+YEARS_RE = re.compile(r"(\d+)\s*Years")
+
+
+class SaleType(Enum):
+    DEVELOPER = "Developer Sale"
+    RESALE = "Resale"
+
+
+@dataclass(slots=True)
+class PropertyListing:
+    url: str
+    area: str | None
+    property_type: str | None
+    project: str | None
+    price_egp: int | None
+    bua_m2: float | None
+    beds: int | None
+    baths: int | None
+    monthly_egp: int | None
+    tenor_years: int | None
+    sale_type: SaleType
+    raw: dict = field(repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class CompoundListing:
+    url: str
+    area: str | None
+    name: str | None
+    developer: str | None
+    summary: str | None
+    property_types: tuple
+    developer_price_egp: int | None
+    resale_price_egp: int | None
+    raw: dict = field(repr=False, compare=False)
+
+
+LISTING_MODELS = {
+    "property": PropertyListing,
+    "compound": CompoundListing,
+}
+
+
+def _text(value):
+    return None if value in (None, "", "N/A") else value
+
+
+def parse_egp(value):
+    # "13,317,690 EGP" / "8,060,000" -> 13317690 / 8060000
+    match = AMOUNT_RE.search(value) if isinstance(value, str) else None
+    return int(match.group().replace(",", "")) if match else None
+
+
+def parse_bua(value):
+    match = BUA_RE.search(value) if isinstance(value, str) else None
+    return float(match.group(1)) if match else None
+
+
+def parse_count(value):
+    # "2Beds" / "3Baths"
+    match = COUNT_RE.match(value) if isinstance(value, str) else None
+    return int(match.group(1)) if match else None
+
+
+def parse_down_payment(value):
+    # "131,789 EGP Monthly / 8 Years" -> (131789, 8); either part may be missing
+    if not isinstance(value, str):
+        return None, None
+    monthly, years = MONTHLY_RE.search(value), YEARS_RE.search(value)
+    return (
+        int(monthly.group(1).replace(",", "")) if monthly else None,
+        int(years.group(1)) if years else None,
+    )
+
+
+def parse_sale_type(value):
+    return SaleType.RESALE if value == SaleType.RESALE.value else SaleType.DEVELOPER
+
+
+def normalize_property(record):
+    monthly, years = parse_down_payment(record.get("Down Payment"))
+    return PropertyListing(
+        url=record["Detail Page URL"],
+        area=_text(record.get("Area")),
+        property_type=_text(record.get("Property Type")),
+        project=_text(record.get("Project Name")),
+        price_egp=parse_egp(record.get("Price")),
+        bua_m2=parse_bua(record.get("BUA")),
+        beds=parse_count(record.get("Beds")),
+        baths=parse_count(record.get("Bathrooms")),
+        monthly_egp=monthly,
+        tenor_years=years,
+        sale_type=parse_sale_type(record.get("Sale Type")),
+        raw=record,
+    )
+
+
+def normalize_compound(record):
+    return CompoundListing(
+        url=record["Detail Page URL"],
+        area=_text(record.get("Area")),
+        name=_text(record.get("Project Name")),
+        developer=_text(record.get("Developer Name")),
+        summary=_text(record.get("Summary")),
+        property_types=tuple(record.get("Property Types") or ()),
+        developer_price_egp=parse_egp(record.get("Developer Start Price")),
+        resale_price_egp=parse_egp(record.get("Resale Start Price")),
+        raw=record,
+    )
+
+
+NORMALIZERS = {
+    "property": normalize_property,
+    "compound": normalize_compound,
+}
+
+
+def record_category(record):
+    # Property cards carry a Price, compound cards carry start prices
+    return "property" if "Price" in record else "compound"
+
+
+def normalize_record(record, category=None):
+    return NORMALIZERS[category or record_category(record)](record)
+
+
+def normalize_records(records, category=None):
+    if not records:
+        return []
+    normalize = NORMALIZERS[category or record_category(records[0])]
+    return [normalize(record) for record in records]
+
+
+# ---------- SERIALIZATION ----------
+# Record field -> the typed fields parsed from it
+PARSED_FIELDS = {
+    "property": {
+        "Detail Page URL": ("url",),
+        "Area": ("area",),
+        "Property Type": ("property_type",),
+        "Project Name": ("project",),
+        "Price": ("price_egp",),
+        "BUA": ("bua_m2",),
+        "Beds": ("beds",),
+        "Bathrooms": ("baths",),
+        "Down Payment": ("monthly_egp", "tenor_years"),
+        "Sale Type": ("sale_type",),
+    },
+    "compound": {
+        "Detail Page URL": ("url",),
+        "Area": ("area",),
+        "Project Name": ("name",),
+        "Developer Name": ("developer",),
+        "Summary": ("summary",),
+        "Property Types": ("property_types",),
+        "Developer Start Price": ("developer_price_egp",),
+        "Resale Start Price": ("resale_price_egp",),
+    },
+}
+SALE_TYPES = {sale_type.value for sale_type in SaleType}
+
+
+def unparsed_fields(listing):
+    # The part of listing.raw its typed fields do not carry
+    parsed = PARSED_FIELDS["property" if isinstance(listing, PropertyListing) else "compound"]
+    rest = {}
+    for name, value in listing.raw.items():
+        if value in (None, "", "N/A", []):
+            continue
+        targets = parsed.get(name)
+        if targets is None:
+            rest[name] = value
+        elif name == "Sale Type":
+            if value not in SALE_TYPES:
+                rest[name] = value
+        elif all(getattr(listing, target) is None for target in targets):
+            rest[name] = value
+    return rest
+
+
+def listing_to_dict(listing):
+    data = {f.name: getattr(listing, f.name) for f in fields(listing)}
+    data["raw"] = unparsed_fields(listing)
+    if isinstance(listing, PropertyListing):
+        data["sale_type"] = listing.sale_type.value
+    else:
+        data["property_types"] = list(listing.property_types)
+    return data
+
+
+def typed_line(record, category=None):
+    # One typed JSONL line for a scraped record
+    return json.dumps(listing_to_dict(normalize_record(record, category)), ensure_ascii=False) + "\n"
+
+
+def listing_from_dict(data):
+    if "price_egp" in data:
+        return PropertyListing(**{**data, "sale_type": SaleType(data["sale_type"])})
+    return CompoundListing(**{**data, "property_types": tuple(data["property_types"])})
+
+
+# The checked-in listing files, one per region
+PROPERTY_LISTING_FILES = [
+    "property_listings_north.json",
+    "property_listings_east.json",
+    "property_listings_west.json",
+]
+COMPOUND_LISTING_FILES = [
+    "compounds_north.json",
+    "compounds_east.json",
+    "compounds_west.json",
+]
+
+
+def region_of(path):
+    # property_listings_north.json -> north; nawy_compound_listings.json -> None
+    stem = os.path.basename(path).split(".", 1)[0]
+    region = stem.rsplit("_", 1)[-1]
+    return region if region in ("north", "east", "west") else None
+
+
+def typed_path_for(path):
+    return f"{os.path.splitext(path)[0]}.typed.jsonl"
+
+
+def load_listings(path):
+    # Typed JSONL written by convert_listing_file, or a scraper JSON file normalized on load
+    if path.endswith(".typed.jsonl"):
+        with open(path, encoding="utf-8") as f:
+            return [listing_from_dict(json.loads(line)) for line in f]
+    with open(path, encoding="utf-8") as f:
+        return normalize_records(json.load(f))
+
+
+def convert_listing_file(path, out_path=None):
+    out_path = out_path or typed_path_for(path)
+    listings = load_listings(path)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for listing in listings:
+            f.write(json.dumps(listing_to_dict(listing), ensure_ascii=False) + "\n")
+    os.replace(tmp_path, out_path)
+    return out_path, len(listings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert scraped listing JSON files to typed JSONL")
+    parser.add_argument("paths", nargs="+", help="compounds_*.json / property_listings_*.json files")
+    args = parser.parse_args()
+    for path in args.paths:
+        out_path, count = convert_listing_file(path)
+        print(f"{path} -> {out_path} ({count} listings)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
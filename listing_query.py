@@ -0,0 +1,219 @@
+import heapq
+
+import numpy as np
+
+from listing_columns import COLUMN_LAYOUTS, NULL_CODE, NULL_INT, encode_columns
+
+# ---------- IN-MEMORY LISTING SEARCH ----------
+# Built once from typed listings or a columnar snapshot, then answers
+# filter / range / sort / top-k queries without touching the records:
+#   - every dictionary column (area, project, type, ...) gets an inverted index,
+#     code -> ascending row ids, so equality filters are array intersections;
+#   - every numeric column gets a sorted order, so a range is two binary searches
+#     and "cheapest first" walks that order until `limit` rows pass the filters.
+# Small candidate sets are ranked with a heap instead of walking the sort order.
+#
+#   index = ListingIndex.from_listings(load_listings("property_listings_north.json"))
+#   index.search(where={"area": "Ras El Hekma", "property_type": "Apartment"},
+#                ranges={"price_egp": (None, 15_000_000), "beds": (2, None)},
+#                order_by="price_egp", limit=20)
+
+# Candidate sets up to this size are ranked with a heap; larger ones walk the
+# sort order of the order_by column in chunks of STREAM_CHUNK rows.
+HEAP_MAX = 20_000
+STREAM_CHUNK = 4096
+
+# Multi-valued dictionary columns: one dictionary entry holds several values
+MULTI_VALUED = {"property_types": "|"}
+
+
+def _union(parts):
+    # Sorted, de-duplicated union of ascending id arrays
+    if len(parts) == 1:
+        return parts[0]
+    ids = np.sort(np.concatenate(parts))
+    return ids[np.concatenate(([True], ids[1:] != ids[:-1]))]
+
+
+def _intersect(small, big, rows):
+    # Both ascending. A much smaller list is binary-searched into the bigger one;
+    # lists of similar size go through a row bitmap, which is linear and cache-friendly.
+    if len(small) > len(big):
+        small, big = big, small
+    if not len(small):
+        return small
+    if len(small) * 16 < len(big):
+        positions = np.minimum(np.searchsorted(big, small), len(big) - 1)
+        return small[big[positions] == small]
+    member = np.zeros(rows, dtype=bool)
+    member[big] = True
+    return small[member[small]]
+
+
+def _inverted_index(codes, dictionary, separator=None):
+    # code -> ascending row ids; a stable argsort keeps ids in order within each code
+    order = np.argsort(codes, kind="stable").astype(np.int64)
+    counts = np.bincount(codes[codes != NULL_CODE], minlength=len(dictionary))
+    start = int(np.count_nonzero(codes == NULL_CODE))
+    index = {}
+    for code, value in enumerate(dictionary):
+        ids = order[start:start + counts[code]]
+        start += counts[code]
+        for key in (value.split(separator) if separator else (value,)):
+            index.setdefault(key, []).append(ids)
+    return {key: _union(parts) for key, parts in index.items()}
+
+
+class ListingIndex:
+    """Inverted indexes and sorted numeric orders over one category of listings.
+
+    ``search`` returns listings (or decoded column dicts when built from bare
+    arrays); ``search_ids`` returns row ids.
+    """
+
+    def __init__(self, category, arrays, dictionaries, listings=None):
+        self.category = category
+        self.listings = listings
+        self.dictionaries = dictionaries
+        self.rows = len(arrays["url.offsets"]) - 1
+        self._arrays = arrays
+        self.inverted = {}
+        self.numeric = {}
+        self.sorted = {}
+        for name, kind in COLUMN_LAYOUTS[category]:
+            if kind == "dict":
+                codes = np.asarray(arrays[name])
+                self.inverted[name] = _inverted_index(codes, dictionaries[name], MULTI_VALUED.get(name))
+            elif kind != "text":
+                # Float with NaN for missing, so comparisons drop missing values on their own
+                values = np.asarray(arrays[name], dtype=np.float64)
+                if kind != "float64":
+                    values[np.asarray(arrays[name]) == NULL_INT] = np.nan
+                order = np.argsort(values, kind="stable")
+                valid = int(np.count_nonzero(~np.isnan(values)))
+                self.numeric[name] = values
+                self.sorted[name] = (order[:valid], values[order[:valid]])
+
+    @classmethod
+    def from_listings(cls, listings, region=None):
+        category, arrays, dictionaries = encode_columns([(region, listings)])
+        return cls(category, arrays, dictionaries, listings)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        arrays = {name: snapshot[name] for name, kind in COLUMN_LAYOUTS[snapshot.category] if kind != "text"}
+        arrays["url"], arrays["url.offsets"] = snapshot["url"], snapshot["url.offsets"]
+        dictionaries = {name: snapshot.dictionary(name) for name in snapshot.columns if "dictionary" in snapshot.columns[name]}
+        return cls(snapshot.category, arrays, dictionaries)
+
+    def __len__(self):
+        return self.rows
+
+    def values(self, field):
+        # Facet values available for a `where` filter on `field`
+        return sorted(self.inverted[field])
+
+    # ---------- candidate selection ----------
+    def _matching(self, field, wanted):
+        if isinstance(wanted, (str, int)):
+            wanted = (wanted,)
+        parts = [self.inverted[field][value] for value in wanted if value in self.inverted[field]]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return _union(parts)
+
+    def _range_slice(self, field, low, high):
+        order, values = self.sorted[field]
+        start = 0 if low is None else int(np.searchsorted(values, low, side="left"))
+        stop = len(values) if high is None else int(np.searchsorted(values, high, side="right"))
+        return start, stop
+
+    def _candidates(self, where, ranges):
+        # Equality filters intersect inverted lists, smallest first
+        lists = sorted((self._matching(field, wanted) for field, wanted in where.items()), key=len)
+        candidates = None
+        for ids in lists:
+            candidates = ids if candidates is None else _intersect(candidates, ids, self.rows)
+            if not len(candidates):
+                return candidates
+        if candidates is None:
+            if not ranges:
+                return np.arange(self.rows)
+            # No equality filter: the narrowest range slice drives
+            spans = {field: self._range_slice(field, *bounds) for field, bounds in ranges.items()}
+            field = min(spans, key=lambda f: spans[f][1] - spans[f][0])
+            start, stop = spans[field]
+            candidates = self.sorted[field][0][start:stop]
+        return self._apply_ranges(candidates, ranges)
+
+    def _apply_ranges(self, ids, ranges):
+        for field, (low, high) in ranges.items():
+            values = self.numeric[field][ids]
+            keep = ~np.isnan(values)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            ids = ids[keep]
+        return ids
+
+    # ---------- ranking ----------
+    def _top_k_heap(self, ids, order_by, limit, descending):
+        values = self.numeric[order_by][ids]
+        valid = ~np.isnan(values)
+        pairs = zip(values[valid].tolist(), ids[valid].tolist())
+        top = heapq.nlargest(limit, pairs) if descending else heapq.nsmallest(limit, pairs)
+        return [row for _, row in top]
+
+    def _top_k_stream(self, candidates, ranges, order_by, limit, descending):
+        # Walk order_by's sort order (restricted to its own range, if any) and keep
+        # the first `limit` rows that are candidates
+        start, stop = self._range_slice(order_by, *ranges.get(order_by, (None, None)))
+        order = self.sorted[order_by][0][start:stop]
+        if descending:
+            order = order[::-1]
+        member = np.zeros(self.rows, dtype=bool)
+        member[candidates] = True
+        hits = []
+        for offset in range(0, len(order), STREAM_CHUNK):
+            chunk = order[offset:offset + STREAM_CHUNK]
+            hits.extend(chunk[member[chunk]][:limit - len(hits)].tolist())
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def search_ids(self, where=None, ranges=None, order_by=None, descending=False, limit=20):
+        # where: {field: value or [values]}; ranges: {field: (low, high)}, inclusive, None = open
+        where, ranges = where or {}, ranges or {}
+        for field in where:
+            if field not in self.inverted:
+                raise ValueError(f"Cannot filter on {field!r}; categorical fields: {', '.join(self.inverted)}")
+        for field in [*ranges, *([order_by] if order_by else [])]:
+            if field not in self.numeric:
+                raise ValueError(f"{field!r} is not numeric; numeric fields: {', '.join(self.numeric)}")
+        candidates = self._candidates(where, ranges)
+        if order_by is None:
+            return candidates[:limit].tolist()
+        if len(candidates) <= HEAP_MAX:
+            return self._top_k_heap(candidates, order_by, limit, descending)
+        return self._top_k_stream(candidates, ranges, order_by, limit, descending)
+
+    def count(self, where=None, ranges=None):
+        return len(self._candidates(where or {}, ranges or {}))
+
+    def row(self, row_id):
+        if self.listings is not None:
+            return self.listings[row_id]
+        offsets = self._arrays["url.offsets"]
+        record = {"url": bytes(self._arrays["url"][offsets[row_id]:offsets[row_id + 1]]).decode("utf-8")}
+        for name, kind in COLUMN_LAYOUTS[self.category]:
+            if kind == "dict":
+                code = int(self._arrays[name][row_id])
+                record[name] = self.dictionaries[name][code] if code != NULL_CODE else None
+            elif kind != "text":
+                value = self.numeric[name][row_id]
+                record[name] = None if np.isnan(value) else (float(value) if kind == "float64" else int(value))
+        return record
+
+    def search(self, where=None, ranges=None, order_by=None, descending=False, limit=20):
+        return [self.row(row_id) for row_id in self.search_ids(where, ranges, order_by, descending, limit)]
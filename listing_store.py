@@ -0,0 +1,162 @@
+import argparse
+import json
+import sqlite3
+import sys
+import time
+
+from listing_model import normalize_records, record_category, region_of
+
+# ---------- SQLITE LISTING STORE ----------
+# One local database for every scraper result, keyed by Detail Page URL, instead of
+# seven JSON files with overlapping rows. Writes are batched upserts, one
+# transaction per batch; WAL mode lets readers query while a crawl is writing.
+# first_seen/last_seen record when a listing was first and most recently scraped,
+# and `raw` keeps the scraped record as JSON.
+#
+#   python listing_store.py property_listings_*.json compounds_*.json nawy_compound_listings.json
+#   python listing_store.py --db nawy.db --query "SELECT area, COUNT(*) FROM properties GROUP BY area"
+
+DEFAULT_DB_PATH = "nawy_listings.db"
+UPSERT_BATCH_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS properties (
+    url TEXT PRIMARY KEY,
+    region TEXT,
+    area TEXT,
+    project TEXT,
+    property_type TEXT,
+    price_egp INTEGER,
+    bua_m2 REAL,
+    beds INTEGER,
+    baths INTEGER,
+    monthly_egp INTEGER,
+    tenor_years INTEGER,
+    sale_type TEXT,
+    raw TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS properties_area ON properties (area);
+CREATE INDEX IF NOT EXISTS properties_project ON properties (project);
+CREATE INDEX IF NOT EXISTS properties_type ON properties (property_type);
+CREATE INDEX IF NOT EXISTS properties_price ON properties (price_egp);
+CREATE INDEX IF NOT EXISTS properties_beds ON properties (beds);
+
+CREATE TABLE IF NOT EXISTS compounds (
+    url TEXT PRIMARY KEY,
+    region TEXT,
+    area TEXT,
+    name TEXT,
+    developer TEXT,
+    summary TEXT,
+    property_types TEXT,
+    developer_price_egp INTEGER,
+    resale_price_egp INTEGER,
+    raw TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS compounds_area ON compounds (area);
+CREATE INDEX IF NOT EXISTS compounds_name ON compounds (name);
+CREATE INDEX IF NOT EXISTS compounds_developer ON compounds (developer);
+CREATE INDEX IF NOT EXISTS compounds_price ON compounds (developer_price_egp);
+"""
+
+TABLE_COLUMNS = {
+    "property": ("properties", (
+        "url", "region", "area", "project", "property_type", "price_egp", "bua_m2",
+        "beds", "baths", "monthly_egp", "tenor_years", "sale_type",
+    )),
+    "compound": ("compounds", (
+        "url", "region", "area", "name", "developer", "summary", "property_types",
+        "developer_price_egp", "resale_price_egp",
+    )),
+}
+
+
+def open_store(path=DEFAULT_DB_PATH):
+    # timeout covers concurrent scheduler jobs waiting on each other's write transaction
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _upsert_sql(table, columns):
+    names = ", ".join(columns)
+    placeholders = ", ".join("?" for _ in columns)
+    # A region-less scrape (the unfiltered compounds job) never blanks a known region
+    updates = ", ".join(
+        f"{c} = COALESCE(excluded.{c}, {c})" if c == "region" else f"{c} = excluded.{c}"
+        for c in columns[1:]
+    )
+    return (
+        f"INSERT INTO {table} ({names}, raw, first_seen, last_seen) VALUES ({placeholders}, ?, ?, ?) "
+        f"ON CONFLICT(url) DO UPDATE SET {updates}, raw = excluded.raw, last_seen = excluded.last_seen"
+    )
+
+
+def _row(listing, columns, region):
+    row = []
+    for name in columns:
+        if name == "region":
+            row.append(region)
+        elif name == "sale_type":
+            row.append(listing.sale_type.value)
+        elif name == "property_types":
+            row.append(json.dumps(list(listing.property_types), ensure_ascii=False))
+        else:
+            row.append(getattr(listing, name))
+    return row
+
+
+def upsert_records(conn, records, category=None, region=None, batch_size=UPSERT_BATCH_SIZE, seen_at=None):
+    # Scraped records (display-string dicts) -> typed rows, one transaction per batch
+    if not records:
+        return 0
+    category = category or record_category(records[0])
+    table, columns = TABLE_COLUMNS[category]
+    sql = _upsert_sql(table, columns)
+    seen_at = seen_at or time.time()
+    listings = normalize_records(records, category)
+    for start in range(0, len(listings), batch_size):
+        rows = [
+            (*_row(listing, columns, region), json.dumps(listing.raw, ensure_ascii=False), seen_at, seen_at)
+            for listing in listings[start:start + batch_size]
+        ]
+        with conn:
+            conn.executemany(sql, rows)
+    return len(listings)
+
+
+def ingest_files(conn, paths, batch_size=UPSERT_BATCH_SIZE):
+    counts = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        counts[path] = upsert_records(conn, records, region=region_of(path), batch_size=batch_size)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load listing JSON files into the SQLite listing store")
+    parser.add_argument("paths", nargs="*", help="compounds_*.json / property_listings_*.json files")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--query", help="run a SQL query against the store and print the rows")
+    args = parser.parse_args()
+
+    conn = open_store(args.db)
+    try:
+        if args.paths:
+            print(json.dumps(ingest_files(conn, args.paths), indent=2))
+        if args.query:
+            for row in conn.execute(args.query):
+                print(json.dumps(row, ensure_ascii=False))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import atexit
+import os
+import threading
+from collections import deque
+
+from card_extract import card_error_key, card_link_marker, get_html_parser, iter_card_scopes
+from instrument import count, span
+
+# ---------- MULTIPROCESS CARD EXTRACTION ----------
+# Card parsing is CPU-bound and, in-process, shares one core with the WebDriver
+# client. Here each batch of card fragments is cut into shards that go to a pool
+# of worker processes as UTF-8 bytes; the parent merges the shards back in their
+# original order and does the dedup (`seen`) and the carried-over card context
+# itself, so the records are exactly what extract_cards gives for the same input:
+#
+#   - workers extract every card of their shard, each with a fresh context, and
+#     hand back what the card set in it (a property card's own Area);
+#   - the parent walks the cards in order, skips URLs already seen, and fills in
+#     the carried Area of cards that have none from the cards before them.
+#
+# Batches are pipelined: iter_extracted() keeps `window` batches in flight, so the
+# browser scrolls to the next batch while the workers parse the previous one.
+#
+#   extractor = ParallelExtractor(workers=4)
+#   for records in extractor.iter_extracted(batches, card_selector, extract_property_card, seen, context):
+#       ...
+
+MIN_SHARD_CARDS = 8     # smaller shards cost more in IPC than they save
+CARRIED_FIELDS = {"area": "Area"}   # context key -> record field it fills when a card has none
+
+
+def _extract_shard(data, card_selector, extract_card, parser_name):
+    # Runs in a worker; get_html_parser builds each parser once per process.
+    # -> [(href, record or None, card context or failed field)] in document order
+    parser = get_html_parser(parser_name)
+    link_marker = card_link_marker(card_selector)
+    cards = []
+    for root in parser.parse_fragments(data.decode("utf-8")):
+        for href, found in iter_card_scopes(parser, root, link_marker):
+            if not href:
+                continue
+            card_context = {}
+            try:
+                cards.append((href, extract_card(parser, href, found, card_context), card_context))
+            except Exception as e:
+                cards.append((href, None, card_error_key(e)))
+    return cards
+
+
+def shard_fragments(fragments, workers):
+    # Contiguous, order-preserving shards, at most one per worker
+    size = max(MIN_SHARD_CARDS, -(-len(fragments) // workers))
+    return [fragments[i:i + size] for i in range(0, len(fragments), size)]
+
+
+class ParallelExtractor:
+    """Card extraction on a process pool; same records, in the same order, as extract_cards."""
+
+    def __init__(self, workers=None, parser=None):
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        self.workers = workers or os.cpu_count() or 1
+        self.parser_name = parser.name if parser is not None else get_html_parser().name
+        # spawn: the parent runs WebDriver and scheduler threads, which fork would copy mid-flight
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, fragments, card_selector, extract_card):
+        # -> pending shards for merge(); nothing is parsed in this process
+        shards = shard_fragments(fragments, self.workers) if fragments else []
+        count("shards", len(shards))
+        return [
+            self._pool.submit(_extract_shard, "".join(shard).encode("utf-8"), card_selector, extract_card, self.parser_name)
+            for shard in shards
+        ]
+
+    def merge(self, pending, seen, context, errors=None):
+        records = []
+        for future in pending:
+            with span("extract_wait"):
+                cards = future.result()
+            for href, record, card_context in cards:
+                if href in seen:
+                    continue
+                seen.add(href)
+                if record is None:
+                    if errors is not None:
+                        errors[card_context] = errors.get(card_context, 0) + 1
+                    continue
+                for key, field in CARRIED_FIELDS.items():
+                    if key in card_context:
+                        context[key] = card_context[key]
+                    elif context.get(key):
+                        record[field] = context[key]
+                records.append(record)
+        count("cards_parsed", len(records))
+        return records
+
+    def extract(self, fragments, card_selector, extract_card, seen, context, errors=None):
+        return self.merge(self.submit(fragments, card_selector, extract_card), seen, context, errors)
+
+    def iter_extracted(self, batches, card_selector, extract_card, seen, context, errors=None, window=1):
+        # One list of records per input batch, in order, with up to `window` batches
+        # parsing while the next one is pulled
+        in_flight = deque()
+        for fragments in batches:
+            in_flight.append(self.submit(fragments, card_selector, extract_card))
+            if len(in_flight) > window:
+                yield self.merge(in_flight.popleft(), seen, context, errors)
+        while in_flight:
+            yield self.merge(in_flight.popleft(), seen, context, errors)
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_extractors = {}
+_extractors_lock = threading.Lock()
+
+
+def get_parallel_extractor(workers):
+    # One pool per worker count, shared by concurrent jobs; shut down at interpreter exit
+    with _extractors_lock:
+        if workers not in _extractors:
+            _extractors[workers] = ParallelExtractor(workers)
+            atexit.register(_extractors[workers].close)
+        return _extractors[workers]
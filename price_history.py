@@ -0,0 +1,312 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+from bisect import bisect_right
+
+from listing_dedup import record_id
+from listing_model import parse_egp
+
+# ---------- PRICE HISTORY ----------
+# An append-only binary log of price *changes* per listing, so every snapshot can
+# be recorded without keeping the snapshot. A listing's series only gets an entry
+# when one of its prices moves. Listings are keyed by canonical ID (listing_dedup)
+# within the listing file they were recorded from ("compounds_west.json/c258"):
+# overlapping files such as nawy_compound_listings.json and compounds_west.json
+# can show the same compound at different prices, and one series fed by both
+# would flip between them on every run. Days are stored as deltas from the
+# previous day marker and prices as zigzag varint deltas from the series' previous
+# value, so a typical change costs 5-8 bytes and a day on which nothing moved
+# costs 2.
+#
+# Record types (varint = LEB128):
+#   0x01 KEY     varint len, series key, varint len, url     -> next listing index
+#   0x02 DAY     varint days since the previous DAY (first one: since 1970-01-01)
+#   0x03 CHANGE  varint listing index, field byte, zigzag varint delta
+#   0x04 CLEARED varint listing index, field byte              -> price no longer shown
+#
+#   python price_history.py record property_listings_*.json compounds_*.json --day 2026-10-18
+#   python price_history.py drops --field Price --days 30 --min-drop 0.05
+
+MAGIC = b"NPH1"
+KEY, DAY, CHANGE, CLEARED = 1, 2, 3, 4
+PRICE_FIELDS = ("Price", "Developer Start Price", "Resale Start Price")
+FIELD_CODES = {field: code for code, field in enumerate(PRICE_FIELDS)}
+EPOCH = datetime.date(1970, 1, 1)
+DEFAULT_HISTORY_PATH = "price_history.bin"
+
+
+def day_number(day=None):
+    # date, ISO string, day number or None (today) -> days since 1970-01-01
+    if isinstance(day, int):
+        return day
+    day = day or datetime.date.today()
+    if isinstance(day, str):
+        day = datetime.date.fromisoformat(day)
+    return (day - EPOCH).days
+
+
+def day_date(number):
+    return EPOCH + datetime.timedelta(days=number)
+
+
+def _varint(value, out):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def series_key(record, source=None):
+    return f"{source}/{record_id(record)}" if source else record_id(record)
+
+
+class PriceHistory:
+    """Replays the log into per-listing series on open; ``record`` appends changes.
+
+    ``series(key, field)`` is the list of (day, value) points, value None while the
+    price was not shown. Use ``open_history`` to share one instance across threads.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.ids = []          # listing index -> series key
+        self.urls = {}         # series key -> url
+        self.index = {}        # series key -> listing index
+        self.days = {}         # (listing index, field code) -> [day, ...]
+        self.values = {}       # (listing index, field code) -> [value or None, ...]
+        self._last = {}        # (listing index, field code) -> last non-null value (delta base)
+        self._day = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._replay()
+        else:
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+
+    def _replay(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{self.path} is not a price history file")
+        pos = good = 4
+        try:
+            while pos < len(data):
+                kind = data[pos]
+                pos += 1
+                if kind == KEY:
+                    size, pos = _read_varint(data, pos)
+                    key = data[pos:pos + size].decode("utf-8")
+                    pos += size
+                    size, pos = _read_varint(data, pos)
+                    url = data[pos:pos + size].decode("utf-8")
+                    pos += size
+                    if pos > len(data):
+                        raise IndexError
+                    self._add_key(key, url)
+                elif kind == DAY:
+                    delta, pos = _read_varint(data, pos)
+                    self._day += delta
+                elif kind in (CHANGE, CLEARED):
+                    listing, pos = _read_varint(data, pos)
+                    field = data[pos]
+                    pos += 1
+                    if kind == CHANGE:
+                        delta, pos = _read_varint(data, pos)
+                        value = self._last.get((listing, field), 0) + _unzigzag(delta)
+                    else:
+                        value = None
+                    self._apply(listing, field, value)
+                else:
+                    raise ValueError(f"Corrupt price history at byte {pos - 1}")
+                good = pos
+        except IndexError:
+            # A crash mid-append leaves a torn tail; drop it
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def _add_key(self, key, url):
+        self.index[key] = len(self.ids)
+        self.ids.append(key)
+        self.urls[key] = url
+        return self.index[key]
+
+    def _apply(self, listing, field, value):
+        series = (listing, field)
+        days = self.days.setdefault(series, [])
+        values = self.values.setdefault(series, [])
+        if days and days[-1] == self._day:
+            values[-1] = value
+        else:
+            days.append(self._day)
+            values.append(value)
+        if value is not None:
+            self._last[series] = value
+
+    def current(self, listing, field):
+        values = self.values.get((listing, field))
+        return values[-1] if values else None
+
+    def record(self, records, day=None, source=None):
+        # Appends only the prices that differ from each listing's latest value, in
+        # the series of `source` (the listing file name; None keys by bare ID).
+        # Returns the number of changes written.
+        day = day_number(day)
+        with self._lock:
+            if day < self._day:
+                raise ValueError(f"Cannot record {day_date(day)} after {day_date(self._day)}")
+            out = bytearray()
+            if day != self._day:
+                out.append(DAY)
+                _varint(day - self._day, out)
+                self._day = day
+            changes = 0
+            for record in records:
+                key = series_key(record, source)
+                listing = self.index.get(key)
+                for field, code in FIELD_CODES.items():
+                    if field not in record:
+                        continue
+                    value = parse_egp(record[field])
+                    series = (listing, code)
+                    known = listing is not None and series in self.values
+                    if (known and self.current(listing, code) == value) or (not known and value is None):
+                        continue
+                    if listing is None:
+                        listing = self._add_key(key, record["Detail Page URL"])
+                        out.append(KEY)
+                        for text in (key, record["Detail Page URL"]):
+                            encoded = text.encode("utf-8")
+                            _varint(len(encoded), out)
+                            out += encoded
+                        series = (listing, code)
+                    if value is None:
+                        out.append(CLEARED)
+                        _varint(listing, out)
+                        out.append(code)
+                    else:
+                        out.append(CHANGE)
+                        _varint(listing, out)
+                        out.append(code)
+                        _varint(_zigzag(value - self._last.get(series, 0)), out)
+                    self._apply(listing, code, value)
+                    changes += 1
+            with open(self.path, "ab") as f:
+                f.write(out)
+                f.flush()
+                os.fsync(f.fileno())
+            return changes
+
+    def record_file(self, path, day=None):
+        with open(path, encoding="utf-8") as f:
+            return self.record(json.load(f), day, source=os.path.basename(path))
+
+    # ---------- queries ----------
+    def series(self, key, field="Price"):
+        listing, code = self.index.get(key), FIELD_CODES[field]
+        if listing is None or (listing, code) not in self.days:
+            return []
+        return [(day_date(d), v) for d, v in zip(self.days[(listing, code)], self.values[(listing, code)])]
+
+    def value_at(self, key, field="Price", day=None):
+        listing, code = self.index.get(key), FIELD_CODES[field]
+        days = self.days.get((listing, code))
+        if not days:
+            return None
+        at = bisect_right(days, day_number(day)) - 1
+        return self.values[(listing, code)][at] if at >= 0 else None
+
+    def changes_between(self, field="Price", start=None, end=None):
+        # Yields (series key, value on `start`, value on `end`) for every series
+        # that changed in (start, end]
+        code = FIELD_CODES[field]
+        end = day_number(end)
+        start = day_number(start) if start is not None else end - 30
+        for (listing, series_code), days in self.days.items():
+            # A series whose last change predates the window did not move in it
+            if series_code != code or days[-1] <= start:
+                continue
+            values = self.values[(listing, code)]
+            before = bisect_right(days, start) - 1
+            after = bisect_right(days, end) - 1
+            if before < 0 or after <= before:
+                continue
+            yield self.ids[listing], values[before], values[after]
+
+    def drops(self, field="Price", days=30, min_drop=0.05, until=None):
+        # Listings whose price fell by more than min_drop over the last `days` days
+        end = day_number(until)
+        found = []
+        for key, old, new in self.changes_between(field, end - days, end):
+            if old and new is not None and (old - new) / old > min_drop:
+                source, _, id_ = key.rpartition("/")
+                found.append({
+                    "id": id_, "source": source or None, "url": self.urls[key],
+                    "from": old, "to": new, "change": round((new - old) / old, 4),
+                })
+        return sorted(found, key=lambda row: row["change"])
+
+
+_histories = {}
+_histories_lock = threading.Lock()
+
+
+def open_history(path=DEFAULT_HISTORY_PATH):
+    # One instance per file per process, so parallel jobs append through one lock
+    path = os.path.abspath(path)
+    with _histories_lock:
+        if path not in _histories:
+            _histories[path] = PriceHistory(path)
+        return _histories[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append-only listing price history")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record a snapshot of listing files")
+    record.add_argument("paths", nargs="+")
+    record.add_argument("--day", help="snapshot date (YYYY-MM-DD, default today)")
+    drops = commands.add_parser("drops", help="listings whose price dropped in a window")
+    drops.add_argument("--field", default="Price", choices=PRICE_FIELDS)
+    drops.add_argument("--days", type=int, default=30)
+    drops.add_argument("--min-drop", type=float, default=0.05)
+    drops.add_argument("--until", help="window end (YYYY-MM-DD, default today)")
+    args = parser.parse_args()
+
+    history = PriceHistory(args.history)
+    if args.command == "record":
+        changes = sum(history.record_file(path, args.day) for path in args.paths)
+        print(json.dumps({"changes": changes, "listings": len(history.ids), "bytes": os.path.getsize(args.history)}))
+    else:
+        for row in history.drops(args.field, args.days, args.min_drop, args.until):
+            print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+# ---------- ON-DISK RESPONSE CACHE ----------
+# Every page a crawl renders or fetches, kept so the extractors can be re-run
+# offline (backend="cache" in scrape_nawy) instead of re-crawling for 30 minutes.
+# Entries are keyed by (kind, url, position):
+#   "page"  - an http backend results page, position = page number
+#   "cards" - one scroll batch of card HTML from the browser, position = index of
+#             its first card on the page; a new browser crawl of a URL replaces
+#             all of that URL's batches, so a replay is always one crawl
+# Bodies are zlib-compressed and stored once per SHA-256 content hash, so a page
+# that did not change between runs costs no extra space. Entries older than the
+# TTL are not served to live crawls and are dropped by evict(), which also drops
+# least recently used entries until the cache fits in max_bytes; scrape_nawy
+# runs it at the end of every crawl that wrote to the cache.
+#
+#   python response_cache.py --cache nawy_responses.db stats
+#   python response_cache.py --cache nawy_responses.db evict --ttl 86400 --max-mb 256
+
+DEFAULT_CACHE_PATH = "nawy_responses.db"
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+PAGE, CARDS = "page", "cards"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (kind, url, position)
+);
+CREATE INDEX IF NOT EXISTS entries_hash ON entries (hash);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used_at);
+"""
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Compressed, content-addressed page cache in one SQLite file.
+
+    ``get`` returns None for missing entries and, unless ``stale=True``, for
+    entries past the TTL. One instance can be shared by the scheduler's threads.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def _fresh(self, fetched_at, now):
+        return self.ttl is None or now - fetched_at <= self.ttl
+
+    def get(self, kind, url, position=0, stale=False):
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT e.hash, e.fetched_at, b.data FROM entries e JOIN bodies b ON b.hash = e.hash "
+                "WHERE e.kind = ? AND e.url = ? AND e.position = ?", (kind, url, position)
+            ).fetchone()
+            if row is None or not (stale or self._fresh(row[1], now)):
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE entries SET used_at = ? WHERE kind = ? AND url = ? AND position = ?",
+                                  (now, kind, url, position))
+        return zlib.decompress(row[2]).decode("utf-8")
+
+    def put(self, kind, url, position, text):
+        digest = content_hash(text)
+        now = time.time()
+        with self._lock, self.conn:
+            if self.conn.execute("SELECT 1 FROM bodies WHERE hash = ?", (digest,)).fetchone() is None:
+                data = zlib.compress(text.encode("utf-8"), 6)
+                self.conn.execute("INSERT INTO bodies (hash, data, size) VALUES (?, ?, ?)", (digest, data, len(data)))
+            self.conn.execute(
+                "INSERT INTO entries (kind, url, position, hash, fetched_at, used_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, url, position) DO UPDATE SET hash = excluded.hash, "
+                "fetched_at = excluded.fetched_at, used_at = excluded.used_at",
+                (kind, url, position, digest, now, now)
+            )
+        return digest
+
+    def get_cards(self, url, position, stale=False):
+        text = self.get(CARDS, url, position, stale)
+        return json.loads(text) if text is not None else None
+
+    def put_cards(self, url, position, fragments):
+        return self.put(CARDS, url, position, json.dumps(fragments, ensure_ascii=False))
+
+    def clear(self, kind, url):
+        # Drops a URL's entries of one kind; their bodies go at the next evict()
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM entries WHERE kind = ? AND url = ?", (kind, url)).rowcount
+
+    def positions(self, kind, url, stale=True):
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT position, fetched_at FROM entries WHERE kind = ? AND url = ? ORDER BY position", (kind, url)
+            ).fetchall()
+        return [position for position, fetched_at in rows if stale or self._fresh(fetched_at, now)]
+
+    def evict(self, now=None):
+        # Expired entries first, then least recently used until the bodies fit
+        now = now or time.time()
+        with self._lock, self.conn:
+            expired = 0
+            if self.ttl is not None:
+                expired = self.conn.execute("DELETE FROM entries WHERE fetched_at < ?", (now - self.ttl,)).rowcount
+            self.conn.execute("DELETE FROM bodies WHERE hash NOT IN (SELECT hash FROM entries)")
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+            evicted = 0
+            while total > self.max_bytes:
+                row = self.conn.execute("SELECT kind, url, position, hash FROM entries ORDER BY used_at LIMIT 1").fetchone()
+                if row is None:
+                    break
+                self.conn.execute("DELETE FROM entries WHERE kind = ? AND url = ? AND position = ?", row[:3])
+                evicted += 1
+                if self.conn.execute("SELECT 1 FROM entries WHERE hash = ?", (row[3],)).fetchone() is None:
+                    total -= self.conn.execute("SELECT size FROM bodies WHERE hash = ?", (row[3],)).fetchone()[0]
+                    self.conn.execute("DELETE FROM bodies WHERE hash = ?", (row[3],))
+        return {"expired": expired, "evicted": evicted, "bytes": total}
+
+    def stats(self):
+        with self._lock:
+            entries = dict(self.conn.execute("SELECT kind, COUNT(*) FROM entries GROUP BY kind").fetchall())
+            bodies, stored = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM bodies").fetchone()
+            urls = self.conn.execute("SELECT COUNT(DISTINCT url) FROM entries").fetchone()[0]
+        return {"entries": entries, "urls": urls, "bodies": bodies, "bytes": stored}
+
+    def close(self):
+        self.conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def open_cache(cache):
+    # Accepts a ResponseCache or a path; one instance per path per process
+    if cache is None or isinstance(cache, ResponseCache):
+        return cache
+    with _caches_lock:
+        if cache not in _caches:
+            _caches[cache] = ResponseCache(cache)
+        return _caches[cache]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or trim the on-disk response cache")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="entries, distinct bodies and stored bytes")
+    evict = commands.add_parser("evict", help="drop expired entries, then LRU until under the size limit")
+    evict.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="seconds an entry stays fresh")
+    evict.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / 2 ** 20)
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        cache = ResponseCache(args.cache)
+        print(json.dumps(cache.stats()))
+    else:
+        cache = ResponseCache(args.cache, ttl=args.ttl, max_bytes=int(args.max_mb * 2 ** 20))
+        print(json.dumps(cache.evict()))
+    cache.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import threading
+import time
+
+# ---------- SCRAPE PROGRESS EVENTS ----------
+# A running scrape_nawy reports what it is doing as plain dicts, instead of one
+# JSON string at the end of a 30-minute crawl:
+#   {"event": "start" | "batch" | "stall" | "done", "job": ..., "elapsed_s": ...,
+#    "cards_seen": ..., "cards_parsed": ..., "written": ..., "cards_per_s": ...,
+#    "scroll_wait_s": ..., "card_errors": {field: n}, "field_failures": {field: n}}
+# "done" also carries the scrape's result. card_errors counts cards dropped because
+# extracting a field raised, by that field; field_failures counts parsed cards whose
+# field came out empty ("N/A"), for the fields every card is expected to have.
+#
+# Pass a callback (scrape_nawy(..., progress=print)); returning False from it
+# aborts the crawl, which then keeps what it parsed. With stall_timeout, a crawl
+# that sees no new card for that many seconds is aborted by a watchdog thread.
+# Cards a resumed or merge crawl skips still count: the backend's cards_seen (and
+# the browser's cards_loaded) growing is progress, not only newly parsed cards.
+# From async code, iterate the events instead:
+#
+#   async for event in stream_scrape("properties_east", backend="http", stall_timeout=120):
+#       print(event["event"], event["cards_parsed"], event["cards_per_s"])
+
+EMPTY_VALUES = ("N/A", None, "")
+
+# Backend metrics whose growth means the crawl is still moving
+PROGRESS_METRICS = ("cards_seen", "cards_loaded")
+
+# Fields a card of each category should always yield
+EXPECTED_FIELDS = {
+    "property": ("Area", "Property Type", "BUA", "Beds", "Bathrooms", "Price"),
+    "compound": ("Area", "Project Name", "Summary", "Developer Name", "Developer Start Price"),
+}
+
+
+class ScrapeProgress:
+    """Counts one scrape and hands event dicts to a callback.
+
+    The callback is called from the scraping thread, and for "stall" from the
+    watchdog thread. ``metrics`` is the backend's live metrics dict.
+    """
+
+    def __init__(self, job, category, callback=None, stall_timeout=None, stop_event=None, metrics=None):
+        self.job = job
+        self.callback = callback
+        self.stall_timeout = stall_timeout
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.metrics = metrics if metrics is not None else {}
+        self.expected_fields = EXPECTED_FIELDS[category]
+        self.started = time.time()
+        self.last_progress = self.started
+        self.last_seen = 0
+        self.cards_parsed = 0
+        self.written = 0
+        self.field_failures = {}
+        self.aborted = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        elapsed = time.time() - self.started
+        return {
+            "job": self.job,
+            "elapsed_s": round(elapsed, 2),
+            "cards_seen": self.metrics.get("cards_seen", 0),
+            "cards_parsed": self.cards_parsed,
+            "written": self.written,
+            "cards_per_s": round(self.cards_parsed / elapsed, 1) if elapsed else 0.0,
+            "scroll_wait_s": round(self.metrics.get("wait_s", 0.0), 2),
+            "card_errors": dict(self.metrics.get("card_errors", {})),
+            "field_failures": dict(self.field_failures),
+        }
+
+    def emit(self, event, **extra):
+        if self.callback is None:
+            return
+        with self._lock:
+            keep_going = self.callback({"event": event, **self.snapshot(), **extra})
+        if keep_going is False:
+            self.abort("callback")
+
+    def abort(self, reason):
+        if self.aborted is None:
+            self.aborted = reason
+        self.stop_event.set()
+
+    def start(self):
+        self.emit("start")
+        if self.stall_timeout:
+            threading.Thread(target=self._watch, name=f"stall-{self.job}", daemon=True).start()
+
+    def _moved(self):
+        # Advances last_progress when the backend has seen more cards since last asked
+        seen = sum(self.metrics.get(name, 0) for name in PROGRESS_METRICS)
+        if seen > self.last_seen:
+            self.last_seen = seen
+            self.last_progress = time.time()
+
+    def _watch(self):
+        while not self._done.wait(min(1.0, self.stall_timeout)):
+            self._moved()
+            idle = time.time() - self.last_progress
+            if idle > self.stall_timeout:
+                self.emit("stall", idle_s=round(idle, 1))
+                self.abort("stalled")
+                return
+
+    def batch(self, records, written):
+        for record in records:
+            for field in self.expected_fields:
+                if record.get(field) in EMPTY_VALUES:
+                    self.field_failures[field] = self.field_failures.get(field, 0) + 1
+        self.cards_parsed += len(records)
+        self.written += written
+        if records:
+            self.last_progress = time.time()
+        self._moved()
+        self.emit("batch", batch=len(records))
+
+    def finish(self, result):
+        # Emits "done" and returns the tool's JSON-ready result with the run's
+        # progress summary folded in
+        self._done.set()
+        summary = self.snapshot()
+        if self.aborted:
+            summary["aborted"] = self.aborted
+        result = {**result, "progress": summary}
+        self.emit("done", result=result)
+        return result
+
+
+async def stream_scrape(job, **options):
+    # Runs scrape_nawy in a worker thread and yields its progress events; the last
+    # one is "done" with the result. Leaving the loop early aborts the crawl.
+    import asyncio
+    from compound_scrape_agent import scrape_nawy
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop_event = options.pop("stop_event", None) or threading.Event()
+
+    def callback(event):
+        loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    future = loop.run_in_executor(None, lambda: scrape_nawy(job, stop_event=stop_event, progress=callback, **options))
+    try:
+        while True:
+            event = await queue.get()
+            yield event
+            if event["event"] == "done":
+                break
+    finally:
+        stop_event.set()
+        await future
@@ -0,0 +1,148 @@
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from compound_scrape_agent import NAWY_SEARCH_URL, REGION_AREAS, SCRAPE_BACKENDS, SCRAPE_JOBS, scrape_nawy
+from driver_pool import DriverPool
+from instrument import PROFILERS
+
+# ---------- PARALLEL SCRAPE SCHEDULER ----------
+# Runs region/category jobs side by side on a DriverPool of `max_workers` headless
+# Chrome sessions, so at most that many browsers are alive and each one is reused
+# by the next queued job. Every job still writes its own output file exactly like
+# the single-job tools do.
+#
+#   python scrape_scheduler.py properties_north properties_east properties_west --max-workers 3
+#   python scrape_scheduler.py --fixtures --output-dir /tmp/out   # against a local fixture server
+#   python scrape_scheduler.py properties_east --report-dir reports --profile cprofile
+#   python scrape_scheduler.py --max-workers 3 --extract-workers 4   # card parsing off the scraping threads
+
+
+def run_scrape_jobs(jobs, max_workers=3, job_timeout=1800, base_url=NAWY_SEARCH_URL, output_dir=None, scrape=scrape_nawy, driver_pool=None,
+                   diff=False, typed=False, columns=False, store=None, history=None, details=False,
+                   backend=None, cache=None, progress=None, stall_timeout=None, report_dir=None, profile=None,
+                   extract_workers=None):
+    # The job timeout bounds each job from the moment it starts, not from submission.
+    # A job past its deadline is asked to stop scrolling and keeps what it parsed.
+    pool = driver_pool or DriverPool(size=max_workers)
+    stop_events = {job: threading.Event() for job in jobs}
+    started, finished = {}, {}
+    results = {}
+
+    def run(job):
+        started[job] = time.time()
+        try:
+            return scrape(
+                job, base_url=base_url, max_total_time=job_timeout,
+                output_dir=output_dir, stop_event=stop_events[job], driver_pool=pool,
+                diff=diff, typed=typed, columns=columns, store=store, history=history, details=details,
+                backend=backend, cache=cache, progress=progress, stall_timeout=stall_timeout,
+                report_dir=report_dir, profile=profile, extract_workers=extract_workers
+            )
+        finally:
+            finished[job] = time.time()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape") as executor:
+            futures = {executor.submit(run, job): job for job in jobs}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=1)
+                for future in done:
+                    job = futures[future]
+                    elapsed = finished[job] - started[job]
+                    try:
+                        result = json.loads(future.result())
+                    except Exception as e:
+                        result = {"error": str(e)}
+                    # A progress abort sets the same stop event, so it is told apart first:
+                    # "stalled" from the watchdog, "aborted" when the callback asked to stop
+                    aborted = result.get("progress", {}).get("aborted")
+                    if aborted:
+                        status = "stalled" if aborted == "stalled" else "aborted"
+                    elif stop_events[job].is_set():
+                        status = "timeout"
+                    else:
+                        status = "error" if "error" in result else "ok"
+                    results[job] = {"status": status, "elapsed": round(elapsed, 1), **result}
+                now = time.time()
+                for future in pending:
+                    job = futures[future]
+                    if job in started and now - started[job] > job_timeout:
+                        stop_events[job].set()
+    finally:
+        if driver_pool is None:
+            pool.close()
+    return {job: results[job] for job in jobs}
+
+
+def fixture_datasets():
+    # Serves each job's checked-in output file back as its search results
+    datasets = {}
+    for spec in SCRAPE_JOBS.values():
+        areas = REGION_AREAS[spec["region"]] if spec.get("region") else None
+        with open(spec["output"], encoding="utf-8") as f:
+            datasets[(spec["category"], areas)] = json.load(f)
+    return datasets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Nawy scrape jobs in parallel")
+    parser.add_argument("jobs", nargs="*", help=f"jobs to run (default: all): {', '.join(SCRAPE_JOBS)}")
+    parser.add_argument("--max-workers", type=int, default=3, help="concurrent Chrome instances")
+    parser.add_argument("--job-timeout", type=float, default=1800, help="seconds per job")
+    parser.add_argument("--base-url", default=NAWY_SEARCH_URL)
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--diff", action="store_true", help="update each listing file in place and log only the changes")
+    parser.add_argument("--typed", action="store_true", help="also write a typed <stem>.typed.jsonl per listing file")
+    parser.add_argument("--columns", action="store_true", help="also write a columnar <stem>.columns/ snapshot")
+    parser.add_argument("--store", metavar="DB", help="also upsert every batch into this SQLite listing store")
+    parser.add_argument("--history", metavar="PATH", help="append price changes to this price history log")
+    parser.add_argument("--details", action="store_true", help="fill detail-page fields (Land Area, amenities, ...) after each job")
+    parser.add_argument("--backend", choices=SCRAPE_BACKENDS, help="override every job's backend")
+    parser.add_argument("--cache", metavar="DB", help="record loaded pages in this response cache (replay with --backend cache)")
+    parser.add_argument("--progress", action="store_true", help="print progress events as JSON lines to stderr")
+    parser.add_argument("--stall-timeout", type=float, help="abort a job that parses no new card for this many seconds")
+    parser.add_argument("--extract-workers", type=int, metavar="N", help="parse card HTML on N worker processes (shared by all jobs)")
+    parser.add_argument("--report-dir", metavar="DIR", help="write per-stage timings and peak memory per job (<job>.report.json, <job>.prom)")
+    parser.add_argument("--profile", choices=PROFILERS, help="also profile card extraction into the report directory")
+    parser.add_argument("--fixtures", action="store_true", help="scrape a local fixture server instead of nawy.com")
+    args = parser.parse_args()
+
+    jobs = args.jobs or list(SCRAPE_JOBS)
+    unknown = [job for job in jobs if job not in SCRAPE_JOBS]
+    if unknown:
+        parser.error(f"unknown jobs: {', '.join(unknown)}")
+
+    server = None
+    base_url, output_dir = args.base_url, args.output_dir
+    if args.fixtures:
+        from fixture_server import start_fixture_server
+        server, base_url = start_fixture_server(fixture_datasets())
+        # Never let a fixture run overwrite the checked-in listing files
+        output_dir = output_dir or tempfile.mkdtemp(prefix="nawy-fixtures-")
+    pool = DriverPool(size=args.max_workers)
+    try:
+        results = run_scrape_jobs(
+            jobs, args.max_workers, args.job_timeout, base_url, output_dir,
+            driver_pool=pool, diff=args.diff, typed=args.typed, columns=args.columns,
+            store=args.store, history=args.history, details=args.details,
+            backend=args.backend, cache=args.cache, stall_timeout=args.stall_timeout,
+            report_dir=args.report_dir, profile=args.profile, extract_workers=args.extract_workers,
+            progress=(lambda event: print(json.dumps(event), file=sys.stderr)) if args.progress else None
+        )
+    finally:
+        pool.close()
+        if server:
+            server.shutdown()
+
+    print(json.dumps({"jobs": results, "sessions": pool.report()}, indent=2))
+    sys.exit(0 if all(r["status"] == "ok" for r in results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+
+from listing_diff import apply_delta, diff_listings, read_delta_log, refresh_snapshot, write_delta_log
+
+BASE = "https://www.nawy.com/compound/258-mountain-view-icity/property/"
+
+
+def listing(n, price="10,000,000 EGP", **fields):
+    return {"Detail Page URL": f"{BASE}{n}-apartment", "Price": price, "Beds": "2Beds", **fields}
+
+
+def snapshot():
+    return [
+        listing(1, **{"Land Area": "300m2"}),
+        listing(2),
+        listing(3, **{"Land Area": "450m2"}),
+        listing(4),
+    ]
+
+
+def crawl():
+    # 1: price moved, detail field missing from the crawl; 2: unchanged; 3: beds moved;
+    # 4: gone; 5: new
+    return [
+        listing(1, price="9,500,000 EGP", **{"Land Area": "N/A"}),
+        listing(2),
+        listing(3, Beds="3Beds"),
+        listing(5),
+    ]
+
+
+def test_diff_classifies_each_listing():
+    events, counts = diff_listings(snapshot(), crawl(), carry=("Land Area",))
+    assert counts == {"new": 1, "removed": 1, "price_changed": 1, "updated": 1, "unchanged": 1}
+    by_url = {event["url"]: event for event in events}
+    assert by_url[listing(1)["Detail Page URL"]] == {
+        "op": "price_changed", "url": listing(1)["Detail Page URL"],
+        "fields": {"Price": "9,500,000 EGP"}, "was": {"Price": "10,000,000 EGP"},
+    }
+    assert by_url[listing(3)["Detail Page URL"]]["fields"] == {"Beds": "3Beds"}
+    assert by_url[listing(4)["Detail Page URL"]]["op"] == "removed"
+    assert by_url[listing(5)["Detail Page URL"]]["record"] == listing(5)
+
+
+def test_apply_round_trip_keeps_carried_fields():
+    previous, current = snapshot(), crawl()
+    events, _ = diff_listings(previous, current, carry=("Land Area",))
+    applied = apply_delta(previous, events)
+    # The crawl, in snapshot order with new listings last, plus the carried detail fields
+    assert applied == [
+        {**current[0], "Land Area": "300m2"},
+        current[1],
+        {**current[2], "Land Area": "450m2"},
+        current[3],
+    ]
+    # Diffing the crawl again against the result finds nothing to do
+    assert diff_listings(applied, current, carry=("Land Area",))[0] == []
+
+
+def test_apply_round_trip_without_carry_clears_detail_fields():
+    previous, current = snapshot(), crawl()
+    events, _ = diff_listings(previous, current)
+    # Without carry the crawl wins: its "N/A" is taken, a field it lacks becomes None
+    assert apply_delta(previous, events) == [current[0], current[1], {**current[2], "Land Area": None}, current[3]]
+
+
+def test_carried_field_with_a_new_value_is_an_update():
+    events, counts = diff_listings([listing(1, **{"Land Area": "300m2"})], [listing(1, **{"Land Area": "320m2"})],
+                                   carry=("Land Area",))
+    assert counts["updated"] == 1
+    assert events[0]["fields"] == {"Land Area": "320m2"}
+
+
+def test_partial_crawl_removes_nothing():
+    events, counts = diff_listings(snapshot(), crawl()[:1], complete=False, carry=("Land Area",))
+    assert counts["removed"] == 0
+    assert [event["op"] for event in events] == ["price_changed"]
+    assert len(apply_delta(snapshot(), events)) == len(snapshot())
+
+
+def test_refresh_snapshot_logs_and_replays(tmp_path):
+    snapshot_path, delta_path = str(tmp_path / "property_listings_east.json"), str(tmp_path / "east.delta.jsonl")
+    with open(snapshot_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f)
+
+    counts = refresh_snapshot(snapshot_path, crawl(), delta_path, run="2026-10-01T06:00:00", carry=("Land Area",))
+    assert counts["unchanged"] == 1
+    with open(snapshot_path, encoding="utf-8") as f:
+        refreshed = json.load(f)
+    assert apply_delta(snapshot(), read_delta_log(delta_path)) == refreshed
+
+    # An unchanged crawl leaves both files alone
+    with open(delta_path, encoding="utf-8") as f:
+        logged = f.read()
+    assert set(refresh_snapshot(snapshot_path, refreshed, delta_path, run="2026-10-02T06:00:00").values()) == {0, len(refreshed)}
+    with open(delta_path, encoding="utf-8") as f:
+        assert f.read() == logged
+
+
+def test_read_delta_log_since(tmp_path):
+    path = str(tmp_path / "delta.jsonl")
+    write_delta_log(path, [{"op": "removed", "url": "a"}], run="2026-10-01T06:00:00")
+    write_delta_log(path, [{"op": "removed", "url": "b"}, {"op": "removed", "url": "c"}], run="2026-10-02T06:00:00")
+    assert [event["url"] for event in read_delta_log(path)] == ["a", "b", "c"]
+    assert [event["url"] for event in read_delta_log(path, since="2026-10-01T06:00:00")] == ["b", "c"]
+    assert all(event["run"] == "2026-10-02T06:00:00" for event in read_delta_log(path, since="2026-10-01T23:59:59"))
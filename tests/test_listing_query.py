@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+import listing_query
+from listing_columns import encode_columns, read_columns, write_columns
+from listing_model import COMPOUND_LISTING_FILES, PROPERTY_LISTING_FILES, load_listings, region_of
+from listing_query import ListingIndex
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUERIES = [
+    {},
+    {"where": {"area": "Ras El Hekma"}},
+    {"where": {"area": ["Ras El Hekma", "El Sheikh Zayed"], "property_type": "Apartment"}, "order_by": "price_egp"},
+    {"where": {"property_type": "Villa"}, "ranges": {"beds": (4, None)}, "order_by": "price_egp", "descending": True},
+    {"ranges": {"price_egp": (None, 15_000_000), "beds": (2, None)}, "order_by": "price_egp", "limit": 50},
+    {"ranges": {"bua_m2": (100, 150)}, "order_by": "monthly_egp"},
+    {"where": {"region": "west", "sale_type": "Developer Sale"}, "ranges": {"baths": (3, None)}, "order_by": "bua_m2",
+     "descending": True, "limit": 5},
+    {"where": {"sale_type": "Resale"}},
+    {"where": {"area": "Nowhere"}, "order_by": "price_egp"},
+    {"ranges": {"price_egp": (5_000_000, 8_000_000)}, "order_by": "price_egp", "limit": 10_000},
+]
+
+
+def load_category(files):
+    sources = [(region_of(path), load_listings(os.path.join(ROOT, path))) for path in files]
+    rows = [(listing, region) for region, listings in sources for listing in listings]
+    return sources, rows
+
+
+@pytest.fixture(scope="module")
+def properties():
+    sources, rows = load_category(PROPERTY_LISTING_FILES)
+    category, arrays, dictionaries = encode_columns(sources)
+    listings = [listing for listing, _ in rows]
+    return ListingIndex(category, arrays, dictionaries, listings), rows
+
+
+def field_value(listing, region, field):
+    if field == "region":
+        return region
+    value = getattr(listing, field)
+    return value.value if field == "sale_type" else value
+
+
+def brute_force(rows, where=None, ranges=None, order_by=None, descending=False, limit=20):
+    hits = []
+    for row_id, (listing, region) in enumerate(rows):
+        if any(field_value(listing, region, field) not in ([wanted] if isinstance(wanted, str) else wanted)
+               for field, wanted in (where or {}).items()):
+            continue
+        values = [field_value(listing, region, field) for field in (ranges or {})]
+        if any(value is None or (low is not None and value < low) or (high is not None and value > high)
+               for value, (low, high) in zip(values, (ranges or {}).values())):
+            continue
+        hits.append(row_id)
+    if order_by is None:
+        return hits[:limit]
+    # Ties go by row id, in the direction of the sort
+    ranked = [row_id for row_id in hits if getattr(rows[row_id][0], order_by) is not None]
+    ranked.sort(key=lambda row_id: (getattr(rows[row_id][0], order_by), row_id), reverse=descending)
+    return ranked[:limit]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_brute_force(properties, query):
+    index, rows = properties
+    assert index.search_ids(**query) == brute_force(rows, **query)
+    assert index.count(query.get("where"), query.get("ranges")) == len(brute_force(rows, **{**query, "order_by": None, "limit": None}))
+
+
+@pytest.mark.parametrize("query", [query for query in QUERIES if "order_by" in query])
+def test_streamed_top_k_matches_heap(properties, query, monkeypatch):
+    # The checked-in files fit under HEAP_MAX; force the sort-order walk
+    index, rows = properties
+    monkeypatch.setattr(listing_query, "HEAP_MAX", 0)
+    monkeypatch.setattr(listing_query, "STREAM_CHUNK", 64)
+    assert index.search_ids(**query) == brute_force(rows, **query)
+
+
+def test_search_returns_listings(properties):
+    index, rows = properties
+    found = index.search(where={"property_type": "Apartment"}, order_by="price_egp", limit=3)
+    assert [listing.url for listing in found] == [rows[row_id][0].url for row_id in brute_force(
+        rows, where={"property_type": "Apartment"}, order_by="price_egp", limit=3)]
+
+
+def test_snapshot_index_matches_listing_index(properties, tmp_path):
+    index, rows = properties
+    sources, _ = load_category(PROPERTY_LISTING_FILES)
+    write_columns(sources, str(tmp_path / "properties.columns"))
+    snapshot_index = ListingIndex.from_snapshot(read_columns(str(tmp_path / "properties.columns")))
+    for query in QUERIES:
+        assert snapshot_index.search_ids(**query) == index.search_ids(**query)
+    row = snapshot_index.row(brute_force(rows, order_by="price_egp", limit=1)[0])
+    listing, region = rows[brute_force(rows, order_by="price_egp", limit=1)[0]]
+    assert row["url"] == listing.url and row["region"] == region and row["price_egp"] == listing.price_egp
+    assert row["bua_m2"] == listing.bua_m2 or (listing.bua_m2 is None and row["bua_m2"] is None)
+
+
+def test_multi_valued_property_types():
+    sources, rows = load_category(COMPOUND_LISTING_FILES)
+    category, arrays, dictionaries = encode_columns(sources)
+    index = ListingIndex(category, arrays, dictionaries)
+    for wanted in (["Villa"], ["Chalet", "Townhouse"]):
+        expected = [row_id for row_id, (listing, _) in enumerate(rows) if set(listing.property_types) & set(wanted)]
+        assert index.search_ids(where={"property_types": wanted}, limit=len(rows)) == expected
+    assert "Villa" in index.values("property_types")
+
+
+def test_unknown_fields_are_rejected(properties):
+    index, _ = properties
+    with pytest.raises(ValueError, match="Cannot filter on 'price_egp'"):
+        index.search_ids(where={"price_egp": 1})
+    with pytest.raises(ValueError, match="'area' is not numeric"):
+        index.search_ids(order_by="area")
@@ -0,0 +1,88 @@
+import json
+import os
+import sqlite3
+
+from listing_model import PROPERTY_LISTING_FILES
+from listing_store import ingest_files, open_store, upsert_records
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROPERTY_PATHS = [os.path.join(ROOT, path) for path in PROPERTY_LISTING_FILES]
+BASE = "https://www.nawy.com/compound/258-mountain-view-icity/property/"
+
+
+def listing(n, price="10,000,000 EGP", **fields):
+    return {
+        "Detail Page URL": f"{BASE}{n}-apartment", "Area": "New Cairo", "Property Type": "Apartment",
+        "Project Name": "Mountain View iCity", "Price": price, "BUA": "120m2", "Beds": "2Beds",
+        "Bathrooms": "2Baths", "Down Payment": None, "Sale Type": "Developer Sale", **fields,
+    }
+
+
+def compound(n, **fields):
+    return {
+        "Detail Page URL": f"https://www.nawy.com/compound/{n}-compound", "Area": "North Coast",
+        "Project Name": f"Compound {n}", "Developer Name": "N/A", "Summary": "N/A",
+        "Property Types": ["Chalet", "Villa"], "Developer Start Price": "5,000,000 EGP", **fields,
+    }
+
+
+def test_store_runs_in_wal_mode(tmp_path):
+    conn = open_store(str(tmp_path / "store.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_upsert_replaces_row_and_keeps_first_seen(tmp_path):
+    conn = open_store(str(tmp_path / "store.db"))
+    assert upsert_records(conn, [listing(1), listing(2)], region="east", seen_at=100.0) == 2
+    assert upsert_records(conn, [listing(1, price="9,500,000 EGP", Beds="3Beds")], region="east", seen_at=200.0) == 1
+
+    rows = conn.execute("SELECT url, price_egp, beds, first_seen, last_seen, raw FROM properties ORDER BY url").fetchall()
+    assert [row[:5] for row in rows] == [
+        (listing(1)["Detail Page URL"], 9_500_000, 3, 100.0, 200.0),
+        (listing(2)["Detail Page URL"], 10_000_000, 2, 100.0, 100.0),
+    ]
+    assert json.loads(rows[0][5])["Price"] == "9,500,000 EGP"
+    conn.close()
+
+
+def test_upsert_without_region_keeps_known_region(tmp_path):
+    conn = open_store(str(tmp_path / "store.db"))
+    upsert_records(conn, [compound(1)], region="north", seen_at=100.0)
+    upsert_records(conn, [compound(1), compound(2)], region=None, seen_at=200.0)
+    rows = conn.execute("SELECT name, region, property_types, last_seen FROM compounds ORDER BY name").fetchall()
+    assert rows == [("Compound 1", "north", '["Chalet", "Villa"]', 200.0), ("Compound 2", None, '["Chalet", "Villa"]', 200.0)]
+    conn.close()
+
+
+def test_reader_sees_last_commit_while_a_write_is_open(tmp_path):
+    path = str(tmp_path / "store.db")
+    writer = open_store(path)
+    upsert_records(writer, [listing(1)], region="east", seen_at=100.0)
+
+    # An open write transaction blocks neither a reader on another connection nor
+    # shows it the uncommitted rows
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("UPDATE properties SET price_egp = 1")
+    writer.execute("INSERT INTO properties (url, raw, first_seen, last_seen) VALUES ('x', '{}', 0, 0)")
+    reader = sqlite3.connect(path, timeout=0)
+    assert reader.execute("SELECT COUNT(*), MAX(price_egp) FROM properties").fetchone() == (1, 10_000_000)
+    writer.rollback()
+
+    upsert_records(writer, [listing(2)], region="east", seen_at=200.0)
+    assert reader.execute("SELECT COUNT(*) FROM properties").fetchone() == (2,)
+    reader.close()
+    writer.close()
+
+
+def test_ingest_files_is_idempotent(tmp_path):
+    conn = open_store(str(tmp_path / "store.db"))
+    urls = set()
+    for path in PROPERTY_PATHS:
+        with open(path, encoding="utf-8") as f:
+            urls.update(record["Detail Page URL"] for record in json.load(f))
+    first = ingest_files(conn, PROPERTY_PATHS, batch_size=64)
+    assert ingest_files(conn, PROPERTY_PATHS) == first
+    assert conn.execute("SELECT COUNT(*) FROM properties").fetchone() == (len(urls),)
+    assert conn.execute("SELECT COUNT(*) FROM properties WHERE region IS NULL").fetchone() == (0,)
+    conn.close()
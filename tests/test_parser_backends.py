@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from card_extract import HTML_PARSERS, extract_cards, extract_compound_card, extract_property_card, get_html_parser
+from card_fixtures import card_selector_for, golden_records, load_listing_records, render_cards
+from listing_model import COMPOUND_LISTING_FILES, PROPERTY_LISTING_FILES
+
+# Every parser backend, over cards rendered from the checked-in listing files, has
+# to give back exactly those files' records (one per URL, in file order).
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BATCH = 48
+CATEGORIES = {
+    "property": (PROPERTY_LISTING_FILES, extract_property_card),
+    "compound": (COMPOUND_LISTING_FILES, extract_compound_card),
+}
+BACKEND_MODULES = {"bs4": "bs4", "lxml": "lxml", "selectolax": "selectolax"}
+
+# The one checked-in value the extractor cannot derive from its own card; see
+# KNOWN_GOLDEN_DIFFS in benchmarks/replay_extract.py
+MARSA_BAGHUSH = "https://www.nawy.com/compound/789-marsa-baghush"
+
+
+def committed_records(files):
+    return load_listing_records([os.path.join(ROOT, path) for path in files])
+
+
+@pytest.mark.parametrize("category", sorted(CATEGORIES))
+@pytest.mark.parametrize("backend", sorted(HTML_PARSERS))
+def test_backend_gives_back_committed_records(backend, category):
+    pytest.importorskip(BACKEND_MODULES[backend])
+    files, extract_card = CATEGORIES[category]
+    records = committed_records(files)
+    cards = render_cards(records, category)
+    parser = get_html_parser(backend)
+    seen, context, errors, extracted = set(), {}, {}, []
+    for start in range(0, len(cards), BATCH):
+        extracted += extract_cards(cards[start:start + BATCH], card_selector_for(category), extract_card, seen, context, parser, errors)
+
+    expected = golden_records(records)
+    assert errors == {}
+    assert len(extracted) == len(expected)
+    for got, want in zip(extracted, expected):
+        if got["Detail Page URL"] == MARSA_BAGHUSH:
+            assert got["Developer Name"] == "shehab mazhar"
+            got = {**got, "Developer Name": want["Developer Name"]}
+        assert got == want
@@ -0,0 +1,119 @@
+import datetime
+import os
+
+import pytest
+
+from price_history import (
+    MAGIC,
+    PriceHistory,
+    _read_varint,
+    _unzigzag,
+    _varint,
+    _zigzag,
+    series_key,
+)
+
+URL = "https://www.nawy.com/compound/258-mountain-view-icity/property/41234-apartment"
+SOURCE = "property_listings_east.json"
+
+
+def listing(price, url=URL):
+    return {"Price": price, "Detail Page URL": url}
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 16383, 16384, 2**31, 2**40 + 7])
+def test_varint_round_trip(value):
+    out = bytearray(b"\xff")
+    _varint(value, out)
+    assert _read_varint(bytes(out) + b"\xff", 1) == (value, len(out))
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 2, -2, 63, -64, 2**31, -(2**31), 10**12, -(10**12)])
+def test_zigzag_round_trip(value):
+    assert _zigzag(value) >= 0
+    assert _unzigzag(_zigzag(value)) == value
+
+
+def test_zigzag_keeps_small_deltas_small():
+    assert [_zigzag(v) for v in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+
+
+def test_replay_gives_back_recorded_series(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = PriceHistory(path)
+    assert history.record([listing("10,000,000 EGP")], day="2026-10-01", source=SOURCE) == 1
+    assert history.record([listing("10,000,000 EGP")], day="2026-10-02", source=SOURCE) == 0
+    assert history.record([listing("9,250,000 EGP")], day="2026-10-05", source=SOURCE) == 1
+    assert history.record([listing("N/A")], day="2026-10-07", source=SOURCE) == 1
+    assert history.record([listing("9,900,000 EGP")], day="2026-10-09", source=SOURCE) == 1
+
+    key = series_key(listing(None), SOURCE)
+    expected = [
+        (datetime.date(2026, 10, 1), 10_000_000),
+        (datetime.date(2026, 10, 5), 9_250_000),
+        (datetime.date(2026, 10, 7), None),
+        (datetime.date(2026, 10, 9), 9_900_000),
+    ]
+    assert history.series(key) == expected
+    reopened = PriceHistory(path)
+    assert reopened.series(key) == expected
+    assert reopened.urls[key] == URL
+    assert reopened.value_at(key, day="2026-10-06") == 9_250_000
+
+
+def test_unchanged_day_costs_only_a_day_marker(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = PriceHistory(path)
+    history.record([listing("10,000,000 EGP")], day="2026-10-01", source=SOURCE)
+    size = os.path.getsize(path)
+    history.record([listing("10,000,000 EGP")], day="2026-10-02", source=SOURCE)
+    assert os.path.getsize(path) - size == 2
+
+
+def test_same_id_in_two_files_keeps_two_series(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.bin"))
+    for day in ("2026-10-01", "2026-10-02", "2026-10-03"):
+        assert history.record([listing("5,000,000 EGP")], day=day, source="a.json") in (0, 1)
+        assert history.record([listing("5,500,000 EGP")], day=day, source="b.json") in (0, 1)
+    assert len(history.series(series_key(listing(None), "a.json"))) == 1
+    assert len(history.series(series_key(listing(None), "b.json"))) == 1
+
+
+def test_torn_tail_is_dropped_on_replay(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = PriceHistory(path)
+    history.record([listing("10,000,000 EGP")], day="2026-10-01", source=SOURCE)
+    history.record([listing("9,000,000 EGP")], day="2026-10-02", source=SOURCE)
+    good = os.path.getsize(path)
+    # A CHANGE record cut off after its listing index, as a crash mid-append leaves it
+    with open(path, "ab") as f:
+        f.write(bytes([3, 0]))
+
+    reopened = PriceHistory(path)
+    assert os.path.getsize(path) == good
+    key = series_key(listing(None), SOURCE)
+    assert [value for _, value in reopened.series(key)] == [10_000_000, 9_000_000]
+    assert reopened.record([listing("8,000,000 EGP")], day="2026-10-03", source=SOURCE) == 1
+    assert [value for _, value in PriceHistory(path).series(key)] == [10_000_000, 9_000_000, 8_000_000]
+
+
+def test_rejects_foreign_file_and_past_days(tmp_path):
+    path = tmp_path / "history.bin"
+    path.write_bytes(b"NOPE")
+    with pytest.raises(ValueError):
+        PriceHistory(str(path))
+    history = PriceHistory(str(tmp_path / "other.bin"))
+    history.record([listing("1,000 EGP")], day="2026-10-02")
+    with pytest.raises(ValueError):
+        history.record([listing("1,000 EGP")], day="2026-10-01")
+    assert (tmp_path / "other.bin").read_bytes()[:4] == MAGIC
+
+
+def test_drops_reports_falls_past_the_threshold(tmp_path):
+    history = PriceHistory(str(tmp_path / "history.bin"))
+    other = URL.replace("41234", "41235")
+    history.record([listing("10,000,000 EGP"), listing("2,000,000 EGP", other)], day="2026-10-01", source=SOURCE)
+    history.record([listing("9,000,000 EGP"), listing("1,980,000 EGP", other)], day="2026-10-10", source=SOURCE)
+    # Both were first seen before the 10-day window, so each has a price at its start
+    drops = history.drops(days=10, min_drop=0.05, until="2026-10-18")
+    assert [(row["url"], row["from"], row["to"], row["source"]) for row in drops] == [(URL, 10_000_000, 9_000_000, SOURCE)]